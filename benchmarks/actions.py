@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+"""Measure the cost of generating the events of file actions.
+
+File actions of synthetic commits are converted into events with
+the dispatch tables used by `GitEventizer` and with the chain of
+conditions used before them, which is kept here as a reference.
+Regular, merge-heavy and rename-heavy commits are measured
+separately. Both implementations must generate the same events.
+
+    $ python benchmarks/actions.py --commits 5000
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+
+from chronicler.eventizer import Event, uuid
+from chronicler.events.core.git import (GIT_EVENT_ACTION_ADDED,
+                                        GIT_EVENT_ACTION_COPIED,
+                                        GIT_EVENT_ACTION_DELETED,
+                                        GIT_EVENT_ACTION_MODIFIED,
+                                        GIT_EVENT_ACTION_REPLACED,
+                                        GIT_EVENT_ACTION_TYPE_CHANGED,
+                                        GIT_EVENT_COMMIT,
+                                        GitEventizer)
+
+from synthetic import generate_commits
+
+
+SCENARIOS = {
+    'regular': {},
+    'merge_heavy': {'merge_ratio': 1.0},
+    'rename_heavy': {'rename_ratio': 0.5},
+}
+
+
+def commit_actions_chain(parent_event, raw_files_data):
+    """Get the actions of the files the way it was done before the tables"""
+
+    actions_data = []
+
+    for file_data in raw_files_data:
+        actions = file_data.get('action', None)
+
+        if not actions and parent_event.type == GIT_EVENT_COMMIT:
+            raise ValueError(f"No action for commit event {parent_event.id}")
+        elif not actions:
+            continue
+
+        if parent_event.type == GIT_EVENT_COMMIT:
+            actions_data.append((actions, file_data))
+        else:
+            prev_merge_action = None
+            for action in actions:
+                if action == prev_merge_action:
+                    continue
+
+                actions_data.append((action, file_data))
+                prev_merge_action = action
+    return actions_data
+
+
+def process_action_chain(source, time, event_uuid, action, file_data):
+    """Create the event of an action the way it was done before the tables"""
+
+    if action == 'A':
+        event_type = GIT_EVENT_ACTION_ADDED
+    elif action == 'M':
+        event_type = GIT_EVENT_ACTION_MODIFIED
+    elif action == 'D':
+        event_type = GIT_EVENT_ACTION_DELETED
+    elif action.startswith('R'):
+        event_type = GIT_EVENT_ACTION_REPLACED
+    elif action.startswith('C'):
+        event_type = GIT_EVENT_ACTION_COPIED
+    elif action.startswith('T'):
+        event_type = GIT_EVENT_ACTION_TYPE_CHANGED
+    else:
+        raise ValueError(f"No valid action: {action}")
+
+    id_args = [event_uuid, file_data['file'], action]
+    if 'newfile' in file_data:
+        id_args.append(file_data['newfile'])
+
+    event_id = uuid(*id_args)
+
+    data = {
+        "filename": file_data['file'],
+        "modes": file_data['modes'],
+        "indexes": file_data['indexes'],
+        "similarity": action[1:] if action in ('R', 'C') else None,
+        "new_filename": file_data.get('newfile', None),
+        "added_lines": file_data.get('added', None),
+        "deleted_lines": file_data.get('removed', None)
+    }
+
+    return Event(id=event_id,
+                 type=event_type,
+                 source=source,
+                 time=time,
+                 data=data,
+                 linked_event=event_uuid)
+
+
+def eventize_actions(commits, commit_actions, process_action):
+    """Generate the events of the file actions of the commits"""
+
+    events = []
+    append = events.append
+
+    for event, files in commits:
+        source, time, event_uuid = event.source, event.time, event.id
+        for action, file_data in commit_actions(event, files):
+            append(process_action(source, time, event_uuid, action, file_data))
+
+    return events
+
+
+def best_of(rounds, func, *args):
+    best = None
+    for _ in range(rounds):
+        gc.collect()
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chronicler file actions benchmark")
+    parser.add_argument('--commits', type=int, default=5000,
+                        help="number of synthetic commits of each scenario")
+    parser.add_argument('--files-per-commit', type=int, default=10,
+                        help="number of files changed by each commit")
+    parser.add_argument('--rounds', type=int, default=5,
+                        help="number of rounds; the fastest one is reported")
+    args = parser.parse_args()
+
+    eventizer = GitEventizer()
+    implementations = {
+        'chain': (commit_actions_chain, process_action_chain),
+        'table': (eventizer._commit_actions, eventizer._process_action),
+    }
+
+    results = []
+    for scenario, params in SCENARIOS.items():
+        items = generate_commits(args.commits, files_per_commit=args.files_per_commit, **params)
+        commits = [(eventizer._eventize_commit(item), item['data']['files']) for item in items]
+
+        expected = None
+        for name, (commit_actions, process_action) in implementations.items():
+            elapsed, events = best_of(args.rounds, eventize_actions, commits, commit_actions, process_action)
+
+            if expected is None:
+                expected = events
+            elif events != expected:
+                raise AssertionError(f"'{name}' events of '{scenario}' scenario are different")
+
+            results.append({
+                'scenario': scenario,
+                'implementation': name,
+                'events': len(events),
+                'seconds': elapsed,
+                'events_per_second': len(events) / elapsed,
+            })
+
+    json.dump(results, sys.stdout, indent=4)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
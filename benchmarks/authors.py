@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Measure the cost of parsing author strings.
+
+Author strings are parsed with the regular expression alone, with
+the cheap pre-check used by `GitEventizer` and with the pre-check
+and the authors cache. Realistic strings, pair programming strings
+and adversarial strings that make the regular expression backtrack
+are measured separately.
+
+    $ python benchmarks/authors.py --repeat 20000
+"""
+
+import argparse
+import functools
+import json
+import sys
+import time
+
+from chronicler.events.core.git import GIT_AUTHORS_REGEX, GitEventizer
+
+
+SAMPLES = {
+    'realistic': [
+        f"Developer {i} <developer{i}@example.com>" for i in range(100)
+    ],
+    'pair_programming': [
+        f"Developer {i}, Reviewer {i} and Tester {i} <team{i}@example.com>" for i in range(100)
+    ],
+    'adversarial': [
+        "Name" + " " * 3000 + "and",
+        "a & " * 500 + "b <c",
+        "a " * 1000 + "<a@example.com>",
+    ],
+}
+
+
+def parse_regex_only(authors):
+    """Parse the authors string the way it was done before the pre-check"""
+
+    m = GIT_AUTHORS_REGEX.match(authors)
+    if m:
+        authors = [author.strip() for author in m.group("first_authors").split(",")]
+        authors += [m.group("last_author"), f"<{m.group('email')}>"]
+        return authors
+    else:
+        return [authors]
+
+
+def measure(parse, strings, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for string in strings:
+            parse(string)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chronicler authors parsing benchmark")
+    parser.add_argument('--repeat', type=int, default=20000,
+                        help="number of times each realistic sample is parsed")
+    args = parser.parse_args()
+
+    results = []
+    for kind, strings in SAMPLES.items():
+        # Adversarial strings are expensive; parse them fewer times
+        repeat = args.repeat if kind != 'adversarial' else max(args.repeat // 1000, 1)
+        parsers = {
+            'regex': parse_regex_only,
+            'precheck': GitEventizer._parse_authors,
+            'precheck_cache': functools.lru_cache(maxsize=4096)(GitEventizer._parse_authors),
+        }
+        for name, parse in parsers.items():
+            elapsed = measure(parse, strings, repeat)
+            results.append({
+                'samples': kind,
+                'parser': name,
+                'calls': repeat * len(strings),
+                'calls_per_second': repeat * len(strings) / elapsed,
+            })
+
+    json.dump(results, sys.stdout, indent=4)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Compare `Eventizer.eventize` and `Eventizer.eventize_batch`.
+
+Synthetic commits are split in batches, like the pages received
+from a queue, and eventized with the per-item generator and with
+the batch API. For each mode, it measures the number of events
+generated per second.
+
+    $ python benchmarks/batch.py --commits 20000 --batch-size 1000
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from chronicler.eventizer import get_eventizer
+
+from synthetic import generate_commits
+
+
+def eventize_generator(eventizer, batch):
+    return list(eventizer.eventize(batch))
+
+
+def eventize_batch(eventizer, batch):
+    return eventizer.eventize_batch(batch)
+
+
+def measure(mode, items, batch_size, rounds):
+    eventizer = get_eventizer('git')
+    eventize = eventize_batch if mode == 'batch' else eventize_generator
+    batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        count = 0
+        for batch in batches:
+            count += len(eventize(eventizer, batch))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return {
+        'mode': mode,
+        'batch_size': batch_size,
+        'events': count,
+        'events_per_second': count / best,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chronicler batch eventization benchmark")
+    parser.add_argument('--commits', type=int, default=20000,
+                        help="number of synthetic commits")
+    parser.add_argument('--files-per-commit', type=int, default=10,
+                        help="number of files changed by each commit")
+    parser.add_argument('--batch-size', type=int, default=1000,
+                        help="number of commits on each batch")
+    parser.add_argument('--rounds', type=int, default=3,
+                        help="number of rounds; the fastest one is reported")
+    args = parser.parse_args()
+
+    items = list(generate_commits(args.commits, files_per_commit=args.files_per_commit))
+
+    results = [measure(mode, items, args.batch_size, args.rounds)
+               for mode in ('generator', 'batch')]
+
+    json.dump(results, sys.stdout, indent=4)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Compare the cost of `Event` and `CloudEvent` objects.
+
+Synthetic commits are eventized keeping the compact events produced
+by the eventizer (`Event`) and converting them into `CloudEvent`.
+For each representation, it measures the number of events generated
+per second and the memory held by each event.
+
+    $ python benchmarks/events.py --commits 2000 --files-per-commit 50
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+from chronicler.eventizer import eventize
+
+from synthetic import generate_commits
+
+
+def measure(items, compact):
+    start = time.perf_counter()
+    count = sum(1 for _ in eventize('git', items, compact=compact))
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    events = list(eventize('git', items, compact=compact))
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del events
+
+    return {
+        'representation': 'Event' if compact else 'CloudEvent',
+        'events': count,
+        'events_per_second': count / elapsed,
+        'bytes_per_event': memory / count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chronicler events benchmark")
+    parser.add_argument('--commits', type=int, default=2000,
+                        help="number of synthetic commits")
+    parser.add_argument('--files-per-commit', type=int, default=50,
+                        help="number of files changed by each commit")
+    args = parser.parse_args()
+
+    items = list(generate_commits(args.commits, files_per_commit=args.files_per_commit))
+
+    results = [measure(items, compact) for compact in (False, True)]
+
+    json.dump(results, sys.stdout, indent=4)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
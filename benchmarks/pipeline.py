@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Measure the performance of the eventization pipeline.
+
+Synthetic git items are encoded as JSON lines and processed like
+the command line does: the lines are decoded, eventized with
+`GitEventizer`, converted to dicts and encoded again.
+
+First, the items go through the whole pipeline one by one to get
+the number of events per second and the peak RSS of the process.
+Then, each stage runs on its own over the output of the previous
+one, so the time spent on each of them can be compared. For each
+measure, the fastest of several rounds is reported.
+
+Results are written as JSON, including the versions of Python and
+the chronicler, so runs of different versions can be compared with
+`--compare`, which adds the ratio of each measure to the results.
+
+    $ python benchmarks/pipeline.py --commits 20000 --trailers 2 \\
+        --merge-ratio 0.1 --output results.json
+    $ python benchmarks/pipeline.py --commits 20000 --trailers 2 \\
+        --merge-ratio 0.1 --compare results.json
+"""
+
+import argparse
+import gc
+import json
+import platform
+import resource
+import sys
+import time
+
+from chronicler._version import __version__
+from chronicler.codec import get_codec
+from chronicler.events.core.git import GitEventizer
+
+from synthetic import generate_commits
+
+
+STAGES = ('decode', 'eventize', 'to_dict', 'encode')
+
+
+def peak_rss():
+    """Return the peak resident set size of the process in bytes."""
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes; macOS, bytes
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def best_of(rounds, func, *args):
+    """Run a function several times and return the fastest time and its result."""
+
+    best = None
+    for _ in range(rounds):
+        gc.collect()
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, result
+
+
+def run_pipeline(lines, codec):
+    """Process each line through all the stages and return the number of events."""
+
+    eventizer = GitEventizer()
+    loads = codec.loads
+    dumps = codec.dumps
+    count = 0
+
+    for event in eventizer.eventize(map(loads, lines)):
+        dumps(event.to_dict(), json_line=True)
+        count += 1
+
+    return count
+
+
+def run_stages(lines, codec, rounds):
+    """Measure the time of each stage, one after the other.
+
+    A new eventizer is created on each round, so its identity
+    caches start empty like in the whole pipeline.
+    """
+
+    loads = codec.loads
+    dumps = codec.dumps
+
+    stages = {}
+
+    stages['decode'], items = best_of(rounds, lambda: [loads(line) for line in lines])
+    stages['eventize'], events = best_of(rounds, lambda: list(GitEventizer().eventize(items)))
+    stages['to_dict'], documents = best_of(rounds, lambda: [event.to_dict() for event in events])
+    stages['encode'], _ = best_of(rounds, lambda: [dumps(document, json_line=True)
+                                                   for document in documents])
+
+    return stages
+
+
+def compare(results, baseline):
+    """Return the ratios of the measures of the results to a baseline.
+
+    Ratios above 1 mean the results are faster (or use more
+    memory, in the case of `peak_rss_bytes`).
+    """
+    ratios = {
+        'events_per_second': results['events_per_second'] / baseline['events_per_second'],
+        'peak_rss_bytes': results['peak_rss_bytes'] / baseline['peak_rss_bytes'],
+    }
+    for stage in STAGES:
+        ratios[f"{stage}_speedup"] = baseline['stages'][stage] / results['stages'][stage]
+
+    return ratios
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chronicler eventization pipeline benchmark")
+    parser.add_argument('--commits', type=int, default=20000,
+                        help="number of synthetic commits")
+    parser.add_argument('--files-per-commit', type=int, default=10,
+                        help="number of files changed by each commit")
+    parser.add_argument('--trailers', type=int, default=0,
+                        help="number of trailers of each commit")
+    parser.add_argument('--merge-ratio', type=float, default=0.0,
+                        help="fraction of merge commits, from 0 to 1")
+    parser.add_argument('--identities', type=int, default=100,
+                        help="number of different identities")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="seed of the synthetic items generator")
+    parser.add_argument('--codec', default='auto',
+                        help="JSON codec used to decode and encode")
+    parser.add_argument('--rounds', type=int, default=3,
+                        help="number of rounds; the fastest one is reported")
+    parser.add_argument('--output', type=argparse.FileType('w'), default=sys.stdout,
+                        help="file where results are written")
+    parser.add_argument('--compare', type=argparse.FileType('r'), default=None,
+                        help="results of a previous run to compare with")
+    args = parser.parse_args()
+
+    params = {
+        'commits': args.commits,
+        'files_per_commit': args.files_per_commit,
+        'trailers': args.trailers,
+        'merge_ratio': args.merge_ratio,
+        'identities': args.identities,
+        'seed': args.seed,
+        'codec': args.codec,
+        'rounds': args.rounds,
+    }
+
+    codec = get_codec(args.codec)
+    lines = [json.dumps(item) for item in generate_commits(args.commits,
+                                                           files_per_commit=args.files_per_commit,
+                                                           identities=args.identities,
+                                                           seed=args.seed,
+                                                           trailers=args.trailers,
+                                                           merge_ratio=args.merge_ratio)]
+    input_rss = peak_rss()
+
+    best, events = best_of(args.rounds, run_pipeline, lines, codec)
+    pipeline_rss = peak_rss()
+
+    stages = run_stages(lines, codec, args.rounds)
+
+    results = {
+        'benchmark': 'pipeline',
+        'chronicler_version': __version__,
+        'python_version': platform.python_version(),
+        'python_implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'codec': type(codec).__name__,
+        'params': params,
+        'input_bytes': sum(len(line) for line in lines),
+        'events': events,
+        'seconds': best,
+        'events_per_second': events / best,
+        'items_per_second': args.commits / best,
+        'input_rss_bytes': input_rss,
+        'peak_rss_bytes': pipeline_rss,
+        'stages': stages,
+        'stages_events_per_second': {stage: events / seconds for stage, seconds in stages.items()},
+    }
+
+    if args.compare:
+        baseline = json.load(args.compare)
+        if baseline['params'] != params:
+            parser.error("parameters of the baseline don't match; "
+                         f"baseline: {baseline['params']}")
+        results['baseline_version'] = baseline['chronicler_version']
+        results['compared_to_baseline'] = compare(results, baseline)
+
+    json.dump(results, args.output, indent=4)
+    args.output.write('\n')
+
+
+if __name__ == '__main__':
+    main()
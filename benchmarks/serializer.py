@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Compare the serialization of events with `to_json` and `to_dict`.
+
+Events generated from synthetic commits are serialized with
+`chronicler.serializer.to_json` and with the former path,
+`cloudevents.conversion.to_dict` plus the codec. The output
+of both must be the same, byte for byte.
+
+    $ python benchmarks/serializer.py --commits 2000
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import cloudevents.conversion
+
+from chronicler.codec import available_codecs, get_codec
+from chronicler.eventizer import get_eventizer
+from chronicler.serializer import to_json
+
+from synthetic import generate_commits
+
+
+def time_it(func, events):
+    start = time.perf_counter()
+    output = [func(event) for event in events]
+    return time.perf_counter() - start, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chronicler serializer benchmark")
+    parser.add_argument('--commits', type=int, default=2000,
+                        help="number of synthetic commits")
+    parser.add_argument('--files-per-commit', type=int, default=10,
+                        help="number of files changed by each commit")
+    args = parser.parse_args()
+
+    items = generate_commits(args.commits, files_per_commit=args.files_per_commit)
+    events = list(get_eventizer('git').eventize(items))
+
+    results = []
+    for name in available_codecs():
+        codec = get_codec(name)
+
+        for json_line in (True, False):
+            to_dict_time, expected = time_it(
+                lambda e: codec.dumps(cloudevents.conversion.to_dict(e), json_line=json_line),
+                events
+            )
+            to_json_time, output = time_it(
+                lambda e: to_json(e, json_line=json_line, codec=codec),
+                events
+            )
+            results.append({
+                'codec': name,
+                'json_line': json_line,
+                'events': len(events),
+                'to_dict_seconds': to_dict_time,
+                'to_json_seconds': to_json_time,
+                'speedup': to_dict_time / to_json_time,
+                'same_output': output == expected,
+            })
+
+    json.dump(results, sys.stdout, indent=4)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Measure the start up time of the chronicler command.
+
+Two times are measured running the command in a new process:
+the time to print the version (`chronicler --version`) and the
+time until the first event is written when a commit is given
+as input.
+
+    $ python benchmarks/startup.py --runs 20
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         '..', 'tests', 'data', 'git_commits.txt')
+
+CHRONICLER_CMD = [sys.executable, '-c',
+                  'from chronicler.chronicler import chronicler; chronicler()']
+
+
+def time_version():
+    """Time to run `chronicler --version`"""
+
+    start = time.perf_counter()
+    subprocess.run(CHRONICLER_CMD + ['--version'],
+                   check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def time_first_event(item):
+    """Time until the first event is written to the output"""
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(CHRONICLER_CMD + ['--json-line', 'git'],
+                            stdin=subprocess.PIPE,
+                            stdout=subprocess.PIPE)
+    proc.stdin.write(item)
+    proc.stdin.close()
+    proc.stdout.readline()
+    elapsed = time.perf_counter() - start
+    proc.stdout.read()
+    proc.wait()
+
+    return elapsed
+
+
+def summary(timings):
+    return {
+        'runs': len(timings),
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'max': max(timings),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chronicler start up benchmark")
+    parser.add_argument('--runs', type=int, default=10,
+                        help="number of times each command is run")
+    args = parser.parse_args()
+
+    with open(DATA_FILE, 'rb') as fd:
+        item = fd.readline()
+
+    results = {
+        'version': summary([time_version() for _ in range(args.runs)]),
+        'first_event': summary([time_first_event(item) for _ in range(args.runs)]),
+    }
+
+    json.dump(results, sys.stdout, indent=4)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Generator of synthetic Perceval git items.
+
+The items follow the format produced by `perceval git`, so they
+can be eventized by `GitEventizer`.
+"""
+
+import hashlib
+import random
+
+
+ACTIONS = ['A', 'M', 'M', 'M', 'D']
+
+TRAILERS = [
+    'Signed-off-by',
+    'Reviewed-by',
+    'Acked-by',
+    'Co-authored-by',
+    'Tested-by',
+    'Reported-by',
+]
+
+
+def generate_commits(commits, files_per_commit=10, identities=100,
+                     origin='https://example.com/repo.git', seed=0,
+                     trailers=0, merge_ratio=0.0, rename_ratio=0.0):
+    """Generate synthetic Perceval git items.
+
+    Merge commits have two parents and two actions per file,
+    one for each parent, like the items `perceval git` returns.
+    Files of other commits can be renamed or copied, with their
+    similarity score in the action (e.g. 'R087') and a new name.
+
+    :param commits: number of commits to generate
+    :param files_per_commit: number of files changed by each commit
+    :param identities: number of different identities found in authors,
+        committers and trailers
+    :param origin: origin (repository URL) of the items
+    :param seed: seed of the random generator
+    :param trailers: number of trailers (e.g. 'Signed-off-by') of each commit
+    :param merge_ratio: fraction of merge commits, from 0 to 1
+    :param rename_ratio: fraction of files renamed or copied in
+        commits that are not merges, from 0 to 1
+
+    :returns: a generator of Perceval items
+    """
+    if not 0 <= merge_ratio <= 1:
+        raise ValueError("'merge_ratio' must be between 0 and 1")
+    if not 0 <= rename_ratio <= 1:
+        raise ValueError("'rename_ratio' must be between 0 and 1")
+
+    rnd = random.Random(seed)
+    people = [f"Developer {n} <developer{n}@example.com>" for n in range(identities)]
+
+    timestamp = 1344966351.0
+    parent = _sha1('root')
+
+    for n in range(commits):
+        commit_hash = _sha1(f"{origin}:{n}")
+        timestamp += rnd.randint(60, 86400)
+
+        # Random numbers are only drawn for merges when they are
+        # requested, so the default items don't change
+        is_merge = merge_ratio > 0 and rnd.random() < merge_ratio
+
+        files = []
+        for m in range(files_per_commit):
+            # Like merges, renames only draw random numbers when requested
+            is_rename = not is_merge and rename_ratio > 0 and rnd.random() < rename_ratio
+            if is_merge:
+                action = rnd.choice(ACTIONS) + rnd.choice(ACTIONS)
+                indexes = ["0000000...", "0000000...", commit_hash[:7] + "..."]
+                modes = ["000000", "000000", "100644"]
+            else:
+                action = rnd.choice(ACTIONS)
+                indexes = ["0000000...", commit_hash[:7] + "..."]
+                modes = ["000000", "100644"]
+
+            file_data = {
+                "action": action,
+                "added": str(rnd.randint(0, 500)),
+                "file": f"src/module{m % 50}/file{n}_{m}.py",
+                "indexes": indexes,
+                "modes": modes,
+                "removed": str(rnd.randint(0, 500))
+            }
+
+            if is_rename:
+                file_data["action"] = rnd.choice('RC') + f"{rnd.randint(50, 100):03d}"
+                file_data["newfile"] = f"src/module{(m + 1) % 50}/file{n}_{m}.py"
+
+            files.append(file_data)
+
+        data = {
+            "Author": rnd.choice(people),
+            "AuthorDate": "Tue Aug 14 14:45:51 2012 -0300",
+            "Commit": rnd.choice(people),
+            "CommitDate": "Tue Aug 14 14:45:51 2012 -0300",
+            "commit": commit_hash,
+            "files": files,
+            "message": f"Synthetic commit {n}",
+            "parents": [parent],
+            "refs": []
+        }
+
+        if is_merge:
+            branch = _sha1(f"{origin}:branch:{n}")
+            data["Merge"] = f"{parent[:7]} {branch[:7]}"
+            data["parents"].append(branch)
+            data["message"] = f"Merge branch 'synthetic-{n}'"
+
+        for m in range(trailers):
+            trailer = TRAILERS[m % len(TRAILERS)]
+            data.setdefault(trailer, []).append(rnd.choice(people))
+
+        yield {
+            "backend_name": "Git",
+            "backend_version": "1.0.0",
+            "category": "commit",
+            "classified_fields_filtered": None,
+            "data": data,
+            "offset": commit_hash,
+            "origin": origin,
+            "perceval_version": "1.0.0",
+            "search_fields": {
+                "item_id": commit_hash
+            },
+            "tag": origin,
+            "timestamp": timestamp,
+            "updated_on": timestamp,
+            "uuid": _sha1(f"{origin}:{commit_hash}")
+        }
+
+        parent = commit_hash
+
+
+def _sha1(value):
+    return hashlib.sha1(value.encode('utf-8')).hexdigest()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Measure how eventization scales with the number of processes.
+
+A synthetic stream of commits is eventized and serialized using
+from 1 to N worker processes. Results are written as JSON.
+
+    $ python benchmarks/workers.py --commits 20000 --max-workers 8
+"""
+
+import argparse
+import functools
+import json
+import os
+import sys
+import time
+
+from chronicler.parallel import eventize_parallel
+from chronicler.serializer import to_json
+
+from synthetic import generate_commits
+
+
+def run(lines, workers, chunk_size, ordered):
+    encode = functools.partial(to_json, json_line=True)
+
+    start = time.perf_counter()
+    nbytes = 0
+    for chunk in eventize_parallel('git', lines, json.loads, encode,
+                                   workers=workers,
+                                   chunk_size=chunk_size,
+                                   ordered=ordered):
+        nbytes += len(chunk)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'workers': workers,
+        'ordered': ordered,
+        'seconds': elapsed,
+        'items_per_second': len(lines) / elapsed,
+        'output_bytes': nbytes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chronicler workers benchmark")
+    parser.add_argument('--commits', type=int, default=10000,
+                        help="number of synthetic commits")
+    parser.add_argument('--files-per-commit', type=int, default=10,
+                        help="number of files changed by each commit")
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count(),
+                        help="maximum number of processes")
+    parser.add_argument('--chunk-size', type=int, default=500,
+                        help="number of items sent to a process at once")
+    parser.add_argument('--unordered', action='store_true',
+                        help="also measure unordered output")
+    args = parser.parse_args()
+
+    lines = [json.dumps(item) for item in generate_commits(args.commits,
+                                                           files_per_commit=args.files_per_commit)]
+
+    results = []
+    workers = 1
+    while workers <= args.max_workers:
+        results.append(run(lines, workers, args.chunk_size, True))
+        if args.unordered:
+            results.append(run(lines, workers, args.chunk_size, False))
+        workers *= 2
+
+    json.dump({'commits': args.commits, 'results': results}, sys.stdout, indent=4)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+import asyncio
+import concurrent.futures
+
+from collections.abc import AsyncIterable, AsyncGenerator
+from typing import Any, TYPE_CHECKING
+
+from .eventizer import Event, get_eventizer, to_cloudevent
+
+if TYPE_CHECKING:
+    from cloudevents.http import CloudEvent
+
+
+async def aeventize(
+    name: str,
+    async_items: AsyncIterable[dict[str, Any]],
+    compact: bool = False,
+    concurrency: int = 1,
+    chunk_size: int = 100,
+    max_pending: int | None = None,
+    executor: concurrent.futures.Executor | None = None,
+    **options
+) -> AsyncGenerator['Event | CloudEvent']:
+    """Eventize data of a given type from an asynchronous iterator.
+
+    Items are read from `async_items` and grouped in chunks of
+    `chunk_size` items. Each chunk is eventized calling to the
+    `eventize_batch` method of the eventizer in `executor`, so
+    the event loop is not blocked while events are generated.
+    Events are yielded in the same order as their items. The
+    last chunk may be smaller; it's sent when the iterator ends.
+
+    When no `executor` is given, a pool of `concurrency` threads
+    is created and shut down when the generator finishes. The
+    executor can also be a `ProcessPoolExecutor`; in that case,
+    the eventizer is created in each process.
+
+    At most `max_pending` chunks (`concurrency * 2` by default)
+    are waiting to be consumed. When that happens, `async_items`
+    is not read until the consumer takes the events of the
+    oldest chunk, so backpressure is kept end to end.
+
+    Events are returned as `CloudEvent` objects unless `compact`
+    is set, like in `eventize`.
+
+    :param name: name of the eventizer
+    :param async_items: asynchronous iterable of perceval items
+    :param compact: return events without converting them into `CloudEvent`
+    :param concurrency: number of threads of the default executor
+    :param chunk_size: number of items eventized at once
+    :param max_pending: maximum number of chunks waiting to be consumed
+    :param executor: executor where chunks are eventized
+    :param options: options passed to the eventizer constructor
+
+    :returns: an asynchronous generator of events
+
+    :raises ValueError: when any of the parameters is not valid
+        or the eventizer is unknown
+    """
+    if concurrency < 1:
+        raise ValueError("'concurrency' must be greater than 0")
+    if chunk_size < 1:
+        raise ValueError("'chunk_size' must be greater than 0")
+    if max_pending is None:
+        max_pending = concurrency * 2
+    elif max_pending < 1:
+        raise ValueError("'max_pending' must be greater than 0")
+
+    # Check the eventizer exists before reading any item
+    get_eventizer(name, **options)
+
+    loop = asyncio.get_running_loop()
+
+    own_executor = executor is None
+    if own_executor:
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=concurrency,
+                                                         thread_name_prefix='chronicler')
+
+    # Futures of the chunks, in the order of the input. `None`
+    # marks the end of the input.
+    pending = asyncio.Queue(maxsize=max_pending)
+
+    async def produce():
+        chunk = []
+        try:
+            async for item in async_items:
+                chunk.append(item)
+                if len(chunk) >= chunk_size:
+                    await pending.put(loop.run_in_executor(executor, _eventize_chunk,
+                                                           name, options, compact, chunk))
+                    chunk = []
+            if chunk:
+                await pending.put(loop.run_in_executor(executor, _eventize_chunk,
+                                                       name, options, compact, chunk))
+        except Exception as e:
+            # Errors reading the input are raised to the consumer
+            # once the events of the previous chunks are yielded
+            failed = loop.create_future()
+            failed.set_exception(e)
+            await pending.put(failed)
+        else:
+            await pending.put(None)
+
+    producer = asyncio.create_task(produce())
+
+    try:
+        while True:
+            future = await pending.get()
+            if future is None:
+                break
+            for event in await future:
+                yield event
+    finally:
+        producer.cancel()
+        while not pending.empty():
+            future = pending.get_nowait()
+            if future is not None and not future.cancel() and not future.cancelled():
+                # Retrieve the error so it's not reported as never retrieved
+                future.exception()
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _eventize_chunk(name, options, compact, items):
+    events = get_eventizer(name, **options).eventize_batch(items)
+
+    if not compact:
+        events = [to_cloudevent(event) for event in events]
+
+    return events
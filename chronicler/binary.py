@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import struct
+
+from collections.abc import Generator
+from typing import TYPE_CHECKING, Any, BinaryIO
+
+from .eventizer import Event
+from .reader import DEFAULT_READ_SIZE
+
+# `msgpack` is optional; it's imported when binary records are
+# first used, so the command line doesn't load it for JSON
+msgpack = None
+
+if TYPE_CHECKING:
+    from cloudevents.abstract import CloudEvent
+
+
+BINARY_FORMATS = ['msgpack']
+
+BINARY_EXTENSIONS = {
+    'msgpack': '.msgpack',
+}
+
+# Records start with the size of their payload as a
+# 32-bit unsigned integer in network byte order
+_HEADER = struct.Struct('>I')
+
+MAX_RECORD_SIZE = 2 ** 32 - 1
+
+# Perceval writes lone surrogates for text that is not valid UTF-8;
+# they are packed back to the original bytes, like `uuid` does
+_UNICODE_ERRORS = 'surrogateescape'
+
+
+def available_binary_formats() -> list[str]:
+    """Return the names of the binary formats that can be used."""
+
+    return list(BINARY_FORMATS) if _import_msgpack() else []
+
+
+def pack_record(obj: Any) -> bytes:
+    """Serialize an object to a length-prefixed MessagePack record.
+
+    The record is the size of the MessagePack payload, as a 4-byte
+    big-endian unsigned integer, followed by the payload. Records
+    can be concatenated in a stream and read with `read_records`.
+
+    :param obj: object to serialize
+
+    :returns: the record as bytes
+
+    :raises ValueError: when MessagePack is not available, the
+        object has integers larger than 64 bits, or the payload
+        is too large for a record
+    """
+    _check_msgpack()
+
+    try:
+        payload = msgpack.packb(obj, unicode_errors=_UNICODE_ERRORS)
+    except OverflowError:
+        raise ValueError("MessagePack records can't have integers larger than 64 bits")
+    if len(payload) > MAX_RECORD_SIZE:
+        raise ValueError(f"record of {len(payload)} bytes is larger than {MAX_RECORD_SIZE}")
+
+    return _HEADER.pack(len(payload)) + payload
+
+
+def pack_event(event: 'Event | CloudEvent') -> bytes:
+    """Serialize an event to a length-prefixed MessagePack record.
+
+    The payload is the event in CloudEvents structured mode, like
+    the documents written by `to_json`.
+
+    :param event: event to serialize
+
+    :returns: the record as bytes
+    """
+    if isinstance(event, Event):
+        document = event.to_dict()
+    else:
+        document = dict(event._get_attributes())
+        document['data'] = event.get_data()
+
+    return pack_record(document)
+
+
+def unpack_record(payload: bytes) -> Any:
+    """Deserialize the payload of a record returned by `read_records`."""
+
+    _check_msgpack()
+
+    return msgpack.unpackb(payload, unicode_errors=_UNICODE_ERRORS)
+
+
+def read_records(fd: BinaryIO, read_size: int = DEFAULT_READ_SIZE) -> Generator[bytes]:
+    """Read the payloads of the length-prefixed records of a binary file.
+
+    Payloads are returned without being decoded, so they can be
+    passed to `unpack_record` in another process, like the lines
+    returned by `read_lines`.
+
+    :param fd: binary file to read
+    :param read_size: number of bytes read at once
+
+    :returns: a generator of payloads
+
+    :raises ValueError: when the file ends in the middle of a record
+    """
+    if read_size < 1:
+        raise ValueError("'read_size' must be greater than 0")
+
+    # `read1` returns the data available without waiting for the
+    # whole block, so records coming from a pipe are not delayed
+    read = getattr(fd, 'read1', fd.read)
+    header_size = _HEADER.size
+    unpack_header = _HEADER.unpack_from
+    buffer = b''
+    pos = 0
+
+    while True:
+        # Return the complete records of the buffer
+        missing = 0
+        while len(buffer) - pos >= header_size:
+            end = pos + header_size + unpack_header(buffer, pos)[0]
+            if end > len(buffer):
+                missing = end - len(buffer)
+                break
+            yield buffer[pos + header_size:end]
+            pos = end
+
+        # Read until the next record is complete; the blocks of
+        # large records are joined once, when all of them are read
+        blocks = [buffer[pos:]]
+        while True:
+            block = read(max(read_size, missing))
+            blocks.append(block)
+            missing -= len(block)
+            if not block or missing <= 0:
+                break
+
+        buffer = b''.join(blocks)
+        pos = 0
+
+        if not block:
+            break
+
+    if pos < len(buffer):
+        raise ValueError(f"truncated record; {len(buffer) - pos} bytes after the last record")
+
+
+def read_events(fd: BinaryIO, read_size: int = DEFAULT_READ_SIZE) -> Generator['CloudEvent']:
+    """Read the events of a binary file written with `pack_event`.
+
+    :param fd: binary file to read
+    :param read_size: number of bytes read at once
+
+    :returns: a generator of `CloudEvent` objects
+
+    :raises ValueError: when MessagePack is not available or the
+        file ends in the middle of a record
+    """
+    from cloudevents.http import CloudEvent
+
+    _check_msgpack()
+
+    unpackb = msgpack.unpackb
+
+    for payload in read_records(fd, read_size=read_size):
+        document = unpackb(payload, unicode_errors=_UNICODE_ERRORS)
+        data = document.pop('data', None)
+        yield CloudEvent(document, data)
+
+
+def _import_msgpack() -> bool:
+    """Import `msgpack`; return whether it's installed."""
+
+    global msgpack
+
+    if msgpack is None:
+        try:
+            import msgpack
+        except ImportError:
+            return False
+
+    return True
+
+
+def _check_msgpack() -> None:
+    if msgpack is None and not _import_msgpack():
+        raise ValueError("Format 'msgpack' is not available; install 'msgpack' package")
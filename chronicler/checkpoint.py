@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+import sqlite3
+
+from collections.abc import Callable, Generator, Iterable
+from typing import Any
+
+
+DEFAULT_COMMIT_INTERVAL = 1000
+
+
+class CheckpointStore:
+    """Persistent record of the items already eventized.
+
+    The store keeps the `uuid` and `offset` of the items that
+    were eventized, grouped by their `origin`, in a SQLite
+    database. Later runs can skip these items, so only new
+    items are eventized.
+
+    Items are recorded with `add` and saved when `commit` is
+    called; items added but not committed are lost if the process
+    is interrupted, so they will be eventized again on the next run.
+
+    :param path: path to the SQLite database; it's created
+        if it doesn't exist
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS items ("
+            "origin TEXT NOT NULL, "
+            "uuid TEXT NOT NULL, "
+            "offset, "
+            "PRIMARY KEY (origin, uuid))"
+        )
+        self._conn.commit()
+        self._pending = []
+
+    def contains(self, origin: str, uuid: str) -> bool:
+        """Check if an item was already committed.
+
+        :param origin: origin of the item
+        :param uuid: UUID of the item
+
+        :returns: `True` when the item is in the store
+        """
+        cursor = self._conn.execute("SELECT 1 FROM items WHERE origin = ? AND uuid = ?",
+                                    (origin, uuid))
+        return cursor.fetchone() is not None
+
+    def add(self, origin: str, uuid: str, offset: Any = None) -> None:
+        """Record an item; it will be saved on the next commit.
+
+        :param origin: origin of the item
+        :param uuid: UUID of the item
+        :param offset: offset of the item in its origin
+        """
+        self._pending.append((origin, uuid, offset))
+
+    def commit(self) -> None:
+        """Save the items recorded since the last commit."""
+
+        if not self._pending:
+            return
+
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO items (origin, uuid, offset) VALUES (?, ?, ?)",
+                                   self._pending)
+        self._pending = []
+
+    def last_offset(self, origin: str) -> Any:
+        """Return the offset of the last item committed for an origin.
+
+        :param origin: origin of the items
+
+        :returns: the offset or `None` when there are no items
+            for that origin
+        """
+        cursor = self._conn.execute("SELECT offset FROM items WHERE origin = ? "
+                                    "ORDER BY rowid DESC LIMIT 1",
+                                    (origin,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def count(self, origin: str | None = None) -> int:
+        """Return the number of items committed.
+
+        :param origin: count only the items of this origin
+        """
+        if origin is None:
+            cursor = self._conn.execute("SELECT COUNT(*) FROM items")
+        else:
+            cursor = self._conn.execute("SELECT COUNT(*) FROM items WHERE origin = ?", (origin,))
+        return cursor.fetchone()[0]
+
+    def track(
+        self,
+        raw_items: Iterable[dict[str, Any]],
+        skip_processed: bool = True,
+        commit_interval: int = DEFAULT_COMMIT_INTERVAL,
+        before_commit: Callable[[], None] | None = None
+    ) -> Generator[dict[str, Any]]:
+        """Record the items of a stream as they are processed.
+
+        Items are returned as they are read, except those already
+        in the store when `skip_processed` is set. An item is added
+        to the store when the next one is requested, so the consumer
+        must have finished with it by then (e.g. after all its events
+        were generated by `Eventizer.eventize`).
+
+        Every `commit_interval` items, and when the stream ends,
+        `before_commit` is called and the store is committed. Use
+        it to flush the events to their destination, so an item is
+        never committed before its events are written.
+
+        Items without `origin` or `uuid` are returned but not recorded.
+
+        :param raw_items: perceval items
+        :param skip_processed: skip the items found in the store
+        :param commit_interval: number of items recorded between commits
+        :param before_commit: function called before each commit
+
+        :returns: a generator of items
+        """
+        if commit_interval < 1:
+            raise ValueError("'commit_interval' must be greater than 0")
+
+        for raw_item in raw_items:
+            origin = raw_item.get('origin', None)
+            uuid = raw_item.get('uuid', None)
+
+            if not origin or not uuid:
+                yield raw_item
+                continue
+            if skip_processed and self.contains(origin, uuid):
+                continue
+
+            yield raw_item
+
+            self.add(origin, uuid, raw_item.get('offset', None))
+            if len(self._pending) >= commit_interval:
+                self._commit(before_commit)
+
+        self._commit(before_commit)
+
+    def close(self) -> None:
+        """Close the database; items not committed are discarded."""
+
+        self._conn.close()
+
+    def __enter__(self) -> 'CheckpointStore':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _commit(self, before_commit):
+        if before_commit:
+            before_commit()
+        self.commit()
@@ -16,28 +16,122 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 #
 
-import json
-import sys
+import functools
+import time
 
 import click
-import cloudevents.conversion
 
 from ._version import __version__
+from .binary import (BINARY_EXTENSIONS,
+                     BINARY_FORMATS,
+                     available_binary_formats,
+                     pack_event,
+                     read_records,
+                     unpack_record)
+from .codec import CODECS, get_codec
+from .columnar import COLUMNAR_FORMATS, DEFAULT_BATCH_SIZE, ColumnarWriter
+from .compression import COMPRESSIONS, BackgroundReader, open_input, open_output
+from .dedup import (DEFAULT_BLOOM_CAPACITY,
+                    DEFAULT_BLOOM_ERROR_RATE,
+                    DEFAULT_EXACT_SIZE,
+                    DuplicateFilter)
 from .eventizer import eventize
+from .reader import read_lines
+from .serializer import to_json
+from .sharding import SHARD_KEYS, ShardAssigner, ShardedWriter
+from .stats import EventizerStats, StatsReporter
+from .writer import DEFAULT_BUFFER_SIZE, DEFAULT_FLUSH_INTERVAL, EventWriter
 
 
 @click.command
 @click.option(
     "--input",
     help="File with perceval items",
-    type=click.File("r"),
-    default=sys.stdin
+    type=click.File("rb"),
+    default="-"
+)
+@click.option(
+    "--input-format",
+    help="Format of the input items",
+    type=click.Choice(['json'] + BINARY_FORMATS),
+    show_default=True,
+    default='json'
 )
 @click.option(
     "--output",
     help="File where events will be written",
-    type=click.File("w"),
-    default=sys.stdout
+    type=click.File("wb"),
+    default="-"
+)
+@click.option(
+    "--output-compression",
+    help="Compression of the output; 'auto' chooses it from the file extension",
+    type=click.Choice(['auto', 'none'] + COMPRESSIONS),
+    show_default=True,
+    default='auto'
+)
+@click.option(
+    "--compression-level",
+    help="Compression level of the output; by default, it depends on the compression",
+    type=click.IntRange(min=0),
+    default=None
+)
+@click.option(
+    "--output-buffer",
+    help="Number of bytes of events kept in memory before writing them",
+    type=click.IntRange(min=0),
+    show_default=True,
+    default=DEFAULT_BUFFER_SIZE
+)
+@click.option(
+    "--flush-interval",
+    help="Maximum number of seconds events are kept in memory (0 to disable)",
+    type=click.FloatRange(min=0),
+    show_default=True,
+    default=DEFAULT_FLUSH_INTERVAL
+)
+@click.option(
+    "--output-dir",
+    help="Directory where events are written split in shards, instead of --output",
+    type=click.Path(file_okay=False, dir_okay=True, writable=True),
+    default=None
+)
+@click.option(
+    "--shard-by",
+    help="Event attribute whose hash assigns the shard of each event",
+    type=click.Choice(SHARD_KEYS),
+    show_default=True,
+    default='id-hash'
+)
+@click.option(
+    "--shards",
+    help="Number of shards written to --output-dir",
+    type=click.IntRange(min=1),
+    show_default=True,
+    default=1
+)
+@click.option(
+    "--shard-size",
+    help="Start a new file for a shard when it reaches this number of bytes (0 to disable)",
+    type=click.IntRange(min=0),
+    metavar="BYTES",
+    show_default=True,
+    default=0
+)
+@click.option(
+    "--format",
+    "output_format",
+    help="Format of the output; columnar formats need --output-dir and 'pyarrow'",
+    type=click.Choice(['json'] + BINARY_FORMATS + COLUMNAR_FORMATS),
+    show_default=True,
+    default='json'
+)
+@click.option(
+    "--batch-size",
+    help="Number of events of each row group or record batch of columnar formats",
+    type=click.IntRange(min=1),
+    show_default=True,
+    default=DEFAULT_BATCH_SIZE
 )
 @click.option(
     "--json-line",
@@ -46,9 +140,107 @@ from .eventizer import eventize
     show_default=True,
     default=False
 )
+@click.option(
+    "--codec",
+    help="JSON library used to read items and write events",
+    type=click.Choice(['auto'] + list(CODECS)),
+    show_default=True,
+    default='auto'
+)
+@click.option(
+    "--workers",
+    help="Number of processes eventizing items",
+    type=click.IntRange(min=1),
+    show_default=True,
+    default=1
+)
+@click.option(
+    "--chunk-size",
+    help="Number of items sent at once to each process",
+    type=click.IntRange(min=1),
+    show_default=True,
+    default=1000
+)
+@click.option(
+    "--unordered",
+    help="Write events as soon as they are ready, not in input order (requires --workers)",
+    is_flag=True,
+    show_default=True,
+    default=False
+)
+@click.option(
+    "--since-checkpoint",
+    help="Checkpoint database; items already recorded there are skipped and new ones recorded",
+    type=click.Path(dir_okay=False),
+    default=None
+)
+@click.option(
+    "--dedup",
+    help="Drop items with the same uuid of a previous item of the input",
+    is_flag=True,
+    show_default=True,
+    default=False
+)
+@click.option(
+    "--dedup-exact-size",
+    help="Number of uuids kept in memory before using a Bloom filter",
+    type=click.IntRange(min=0),
+    show_default=True,
+    default=DEFAULT_EXACT_SIZE
+)
+@click.option(
+    "--dedup-bloom-capacity",
+    help="Number of uuids the Bloom filter is sized for",
+    type=click.IntRange(min=1),
+    show_default=True,
+    default=DEFAULT_BLOOM_CAPACITY
+)
+@click.option(
+    "--dedup-error-rate",
+    help="Probability of taking a new item as a duplicate once the Bloom filter is used",
+    type=click.FloatRange(min=0, max=1, min_open=True, max_open=True),
+    show_default=True,
+    default=DEFAULT_BLOOM_ERROR_RATE
+)
+@click.option(
+    "--types",
+    help="Glob pattern of the types of the events to generate; prefix it with '!' to exclude them",
+    metavar="PATTERN",
+    multiple=True,
+    default=()
+)
+@click.option(
+    "--identity-cache-size",
+    help="Number of parsed identities kept in memory by the git eventizer",
+    type=click.IntRange(min=0),
+    default=None
+)
+@click.option(
+    "--payload",
+    help="Payload profile of the commit events generated by the git eventizer",
+    type=click.Choice(['full', 'slim', 'minimal']),
+    default=None
+)
+@click.option(
+    "--stats",
+    help="Print statistics of the run to stderr when it ends",
+    is_flag=True,
+    default=False
+)
+@click.option(
+    "--stats-interval",
+    help="Also print the statistics every N seconds; 0 disables it",
+    type=click.FloatRange(min=0),
+    metavar="SECONDS",
+    default=0
+)
 @click.argument('datasource')
 @click.version_option(__version__, message="%(prog)s %(version)s")
-def chronicler(datasource, input, output, json_line):
+def chronicler(datasource, input, input_format, output, output_compression, compression_level, output_buffer,
+               flush_interval, output_dir, shard_by, shards, shard_size, output_format, batch_size,
+               json_line, codec, workers, chunk_size, unordered,
+               since_checkpoint, dedup, dedup_exact_size, dedup_bloom_capacity, dedup_error_rate,
+               types, identity_cache_size, payload, stats, stats_interval):
     """Generates GrimoireLab events from the items fetched by Perceval.
 
     The chronicler is a command line tool and a library that converts
@@ -60,17 +252,270 @@ def chronicler(datasource, input, output, json_line):
 
     Output is produced using JSON format. Use the option <json_line>
     to generate JSON object per line.
+
+    By default, the fastest JSON library installed is used. Choose
+    a different one with <codec>. All of them produce the same output.
+
+    Items can be eventized by several processes with the option
+    <workers>. Events are written in the same order as the input
+    unless <unordered> is set.
+
+    Regular input files are memory-mapped; items are passed
+    to the JSON library without decoding the lines first.
+
+    Input compressed with gzip, bz2, xz or zstd is detected and
+    decompressed in the background. Output is compressed when
+    its file extension is '.gz', '.bz2', '.xz' or '.zst', or
+    when <output_compression> is set.
+
+    Events are written in blocks of <output_buffer> bytes. Pending
+    events are also written every <flush_interval> seconds.
+
+    With <output_dir>, events are split in <shards> files instead,
+    using the hash of their id, source or type (<shard_by>). The
+    shard of an event is the same in every run. Files are named
+    'events-<shard>-<part>.jsonl' ('.json' without <json_line>).
+    A shard continues in a new part once its file has <shard_size>
+    bytes, before compression.
+
+    Events and items can be exchanged with other tools in a binary
+    format with <output_format> and <input_format> set to 'msgpack'.
+    Each event or item is a MessagePack document preceded by its
+    size as a 4-byte big-endian integer. It needs 'msgpack'.
+
+    Events can be written in Parquet or Arrow IPC files instead of
+    JSON with <output_format>. Commits, file actions and identities
+    are written to different files of <output_dir>, with typed
+    columns, in groups of <batch_size> events. They can't be split
+    in shards nor be written by several workers.
+
+    With <since_checkpoint>, the items eventized are recorded in
+    a database, by origin, and skipped in later runs. If a run is
+    interrupted, the next one resumes after the last items whose
+    events were written. It can't be used with several workers.
+
+    With <dedup>, items with the same uuid of a previous item
+    are dropped and their number is reported at the end. The
+    first <dedup_exact_size> uuids are kept in memory; after
+    that, a Bloom filter is used so memory stays bounded. It
+    can't be used with several workers either.
+
+    Events can be selected by type with <types> glob patterns
+    (e.g. '*.authored_by' or 'org.grimoirelab.events.git.file.*').
+    Patterns starting with '!' exclude the types they match.
+    Eventizers skip the work of the events not selected.
+
+    The git eventizer can make commit events smaller with
+    <payload>. 'slim' drops the files and trailers, already
+    found in the events linked to the commit; 'minimal' only
+    keeps the hash, parents, authors, committers and dates.
+
+    With <stats>, the time spent reading items, eventizing them,
+    encoding and writing events is measured. It's printed to
+    stderr at the end, with the number of items and events, the
+    events by type and the slowest items; <stats_interval> prints
+    it periodically too. It can't be used with several workers.
     """
-    def _read_input(input):
-        for line in input:
-            yield json.loads(line)
-
-    for item in eventize(datasource, _read_input(input)):
-        if json_line:
-            obj = json.dumps(cloudevents.conversion.to_dict(item),
-                             separators=(',', ':'), sort_keys=True)
+    try:
+        codec = get_codec(codec)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'--codec'")
+
+    if since_checkpoint and workers > 1:
+        raise click.UsageError("--since-checkpoint can't be used with --workers")
+    if dedup and workers > 1:
+        raise click.UsageError("--dedup can't be used with --workers")
+    if (stats or stats_interval) and workers > 1:
+        raise click.UsageError("--stats can't be used with --workers")
+    if unordered and workers == 1:
+        raise click.UsageError("--unordered needs --workers")
+
+    if 'msgpack' in (input_format, output_format) and not available_binary_formats():
+        raise click.UsageError("msgpack format is not available; install 'msgpack' package")
+
+    ctx = click.get_current_context()
+    if output_dir and ctx.get_parameter_source('output') != click.core.ParameterSource.DEFAULT:
+        raise click.UsageError("--output can't be used with --output-dir")
+
+    columnar = output_format in COLUMNAR_FORMATS
+    if columnar:
+        if not output_dir:
+            raise click.UsageError(f"--format {output_format} needs --output-dir")
+        if shards > 1 or shard_size:
+            raise click.UsageError(f"--format {output_format} can't be used with --shards or --shard-size")
+        if output_compression not in ('auto', 'none'):
+            raise click.UsageError(f"--format {output_format} can't be used with --output-compression")
+        if workers > 1:
+            raise click.UsageError(f"--format {output_format} can't be used with --workers")
+        if since_checkpoint:
+            raise click.UsageError(f"--format {output_format} can't be used with --since-checkpoint")
+
+    options = {}
+    if identity_cache_size is not None:
+        options['identity_cache_size'] = identity_cache_size
+    if types:
+        options['types'] = tuple(types)
+    if payload is not None:
+        options['payload'] = payload
+
+    try:
+        input = open_input(input)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'--input'")
+
+    if input_format in BINARY_FORMATS:
+        lines = read_records(input)
+        decode = unpack_record
+    else:
+        lines = read_lines(input)
+        decode = codec.loads
+
+    if output_format in BINARY_FORMATS:
+        encode = pack_event
+        terminator = b''
+    else:
+        encode = functools.partial(to_json, json_line=json_line, codec=codec)
+        terminator = '\n'
+    checkpoint = None
+    reporter = None
+    shard = None
+    compressed_output = output
+
+    try:
+        if columnar:
+            writer = ColumnarWriter(output_dir, format=output_format, batch_size=batch_size)
+        elif output_dir:
+            # Shards have no name to guess the compression from
+            writer = ShardedWriter(output_dir,
+                                   shards=shards,
+                                   extension=BINARY_EXTENSIONS.get(output_format,
+                                                                   '.jsonl' if json_line else '.json'),
+                                   compression=None if output_compression in ('auto', 'none') else output_compression,
+                                   level=compression_level,
+                                   buffer_size=output_buffer,
+                                   flush_interval=flush_interval,
+                                   max_size=shard_size)
+            shard = ShardAssigner(shard_by, shards)
         else:
-            obj = json.dumps(cloudevents.conversion.to_dict(item),
-                             indent=4, sort_keys=True)
-        output.write(obj)
-        output.write('\n')
+            compressed_output = open_output(output,
+                                            compression=None if output_compression == 'none' else output_compression,
+                                            level=compression_level)
+            writer = EventWriter(compressed_output,
+                                 buffer_size=output_buffer,
+                                 flush_interval=flush_interval)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+    if dedup:
+        dedup = DuplicateFilter(exact_size=dedup_exact_size,
+                                bloom_capacity=dedup_bloom_capacity,
+                                bloom_error_rate=dedup_error_rate)
+    else:
+        dedup = None
+
+    # Binary records don't need a line break
+    if columnar or not terminator:
+        write = writer.write
+    else:
+        write = writer.writeline
+
+    try:
+        with writer:
+            if workers > 1:
+                # Processes are only needed with several workers
+                from .parallel import eventize_parallel
+
+                chunks = eventize_parallel(datasource, lines, decode, encode,
+                                           workers=workers,
+                                           chunk_size=chunk_size,
+                                           ordered=not unordered,
+                                           options=options,
+                                           shard=shard,
+                                           terminator=terminator)
+                if shard is None:
+                    for chunk in chunks:
+                        writer.write(chunk)
+                else:
+                    for chunk in chunks:
+                        for number, data in chunk.items():
+                            writer.write(number, data)
+                return
+
+            items = map(decode, lines)
+
+            if stats or stats_interval:
+                stats = EventizerStats()
+                reporter = StatsReporter(stats,
+                                         lambda text: click.echo(text, err=True),
+                                         interval=stats_interval)
+                items = stats.timed('read', items)
+            else:
+                stats = None
+
+            if since_checkpoint:
+                from .checkpoint import CheckpointStore
+
+                checkpoint = CheckpointStore(since_checkpoint)
+                items = checkpoint.track(items, before_commit=writer.flush)
+
+            events = eventize(datasource, items, compact=True, dedup=dedup, stats=stats, **options)
+
+            if columnar:
+                _write_columnar(events, writer, stats)
+            elif stats is not None:
+                _write_with_stats(events, write, encode, stats, shard)
+            elif shard is None:
+                for item in events:
+                    write(encode(item))
+            else:
+                for item in events:
+                    write(shard(item), encode(item))
+
+        if dedup:
+            click.echo(f"{dedup.duplicates} duplicated items dropped", err=True)
+    finally:
+        if reporter:
+            reporter.close()
+        if checkpoint:
+            checkpoint.close()
+        # Files are closed by click; only the streams
+        # that decompress and compress them are closed here
+        if isinstance(input, BackgroundReader):
+            input.close()
+        if compressed_output is not output:
+            compressed_output.close()
+
+
+def _write_with_stats(events, write, encode, stats, shard=None):
+    """Encode and write events, adding the time of each stage to the statistics."""
+
+    perf_counter = time.perf_counter
+    add_time = stats.add_time
+
+    for event in events:
+        start = perf_counter()
+        data = encode(event)
+        encoded = perf_counter()
+        if shard is None:
+            write(data)
+        else:
+            write(shard(event), data)
+        add_time('encode', encoded - start)
+        add_time('write', perf_counter() - encoded)
+
+
+def _write_columnar(events, writer, stats=None):
+    """Add events to a columnar writer, timing it when there are statistics."""
+
+    if stats is None:
+        for event in events:
+            writer.write(event)
+        return
+
+    perf_counter = time.perf_counter
+    add_time = stats.add_time
+
+    for event in events:
+        start = perf_counter()
+        writer.write(event)
+        add_time('write', perf_counter() - start)
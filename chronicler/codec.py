@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import json
+import math
+import re
+
+from typing import Any
+
+# `orjson` and `ujson` are optional and take a few milliseconds
+# to import, so they are imported when a codec that uses them is
+# created
+orjson = None
+ujson = None
+
+
+# Characters that the standard library escapes when `ensure_ascii` is set
+_NON_ASCII_REGEX = re.compile(r'[^\x00-\x7e]')
+
+# Floats formatted differently than `repr` are written in exponent
+# notation or, in the case of `orjson`, as `0.0000x`. These are quick
+# checks to find them; strings might match too.
+_FLOAT_HINT_REGEX = re.compile(r'e-?\d+(?:[,}\]\n]|$)')
+_FLOAT_HINT_FIXED = '0.0000'
+
+# JSON strings or floats to format; strings are matched first
+# so numbers inside them are never taken into account
+_FLOAT_REGEX = re.compile(r'"(?:[^"\\]|\\.)*"|(?<![\d.])-?(?:\d+(?:\.\d+)?[eE][-+]?\d+|0\.0000\d+)')
+
+
+class JSONCodec:
+    """JSON codec based on the standard library.
+
+    Codecs decode perceval items and encode events. Encoded
+    documents have their keys sorted. When `json_line` is set,
+    documents are encoded in a single line without whitespaces;
+    otherwise, they are indented with 4 spaces.
+
+    Other codecs must produce the same output of this class,
+    byte for byte.
+    """
+    name = 'stdlib'
+
+    _line_encoder = json.JSONEncoder(separators=(',', ':'), sort_keys=True)
+    _indent_encoder = json.JSONEncoder(indent=4, sort_keys=True)
+
+    def __reduce__(self):
+        # Codecs are created again when they are unpickled (e.g. in
+        # worker processes), so they import their libraries there too
+        return type(self), ()
+
+    def loads(self, data: str | bytes) -> Any:
+        """Decode a JSON document."""
+
+        return json.loads(data)
+
+    def dumps(self, obj: Any, json_line: bool = False) -> str:
+        """Encode an object into a JSON document."""
+
+        if json_line:
+            return self._line_encoder.encode(obj)
+        else:
+            return self._indent_encoder.encode(obj)
+
+
+class OrjsonCodec(JSONCodec):
+    """JSON codec based on `orjson`.
+
+    `orjson` is only used to encode. It converts integers larger
+    than 64 bits into floats and rejects lone surrogates (e.g.
+    `"\\udcff"`), which Perceval writes for text that is not valid
+    UTF-8, so items are decoded with `ujson`, when it's installed,
+    or with the standard library.
+
+    Indented documents, and objects that `orjson` can't encode like
+    the standard library does (e.g. `NaN` is encoded as `null`), are
+    encoded with the standard library. `orjson` only supports
+    indentation of 2 spaces.
+    """
+    name = 'orjson'
+
+    def __init__(self):
+        if not _import_orjson():
+            raise ValueError("Codec 'orjson' is not available; install 'orjson' package")
+        _import_ujson()
+
+    def loads(self, data: str | bytes) -> Any:
+        if ujson:
+            return ujson.loads(data)
+        return json.loads(data)
+
+    def dumps(self, obj: Any, json_line: bool = False) -> str:
+        if not json_line:
+            return super().dumps(obj, json_line=json_line)
+
+        try:
+            s = orjson.dumps(obj, option=orjson.OPT_SORT_KEYS).decode('utf-8')
+        except orjson.JSONEncodeError:
+            return super().dumps(obj, json_line=json_line)
+
+        # Non-finite floats are encoded as null; only documents
+        # with nulls are checked, to not walk every object
+        if 'null' in s and _has_non_finite_floats(obj):
+            return super().dumps(obj, json_line=json_line)
+
+        return _normalize(s)
+
+
+class UjsonCodec(JSONCodec):
+    """JSON codec based on `ujson`.
+
+    Objects that `ujson` can't encode (e.g. integers larger than
+    64 bits, or `NaN` in old versions) are encoded with the standard
+    library.
+    """
+    name = 'ujson'
+
+    def __init__(self):
+        if not _import_ujson():
+            raise ValueError("Codec 'ujson' is not available; install 'ujson' package")
+
+    def loads(self, data: str | bytes) -> Any:
+        return ujson.loads(data)
+
+    def dumps(self, obj: Any, json_line: bool = False) -> str:
+        try:
+            if json_line:
+                s = ujson.dumps(obj, ensure_ascii=True, escape_forward_slashes=False,
+                                sort_keys=True)
+            else:
+                s = ujson.dumps(obj, ensure_ascii=True, escape_forward_slashes=False,
+                                sort_keys=True, indent=4)
+        except OverflowError:
+            return super().dumps(obj, json_line=json_line)
+
+        return _normalize(s)
+
+
+CODECS = {
+    'orjson': OrjsonCodec,
+    'ujson': UjsonCodec,
+    'stdlib': JSONCodec,
+}
+
+
+def available_codecs() -> list[str]:
+    """List the codecs that can be used, the fastest first."""
+
+    codecs = []
+    if _import_orjson():
+        codecs.append('orjson')
+    if _import_ujson():
+        codecs.append('ujson')
+    codecs.append('stdlib')
+
+    return codecs
+
+
+def get_codec(name: str = 'auto') -> JSONCodec:
+    """Get a JSON codec by name.
+
+    When `name` is `auto`, the fastest codec available is returned.
+
+    :param name: name of the codec (`auto`, `orjson`, `ujson` or `stdlib`)
+
+    :returns: a `JSONCodec` instance
+
+    :raises ValueError: when the codec does not exist or it is not
+        available because its library is not installed
+    """
+    if name == 'auto':
+        name = available_codecs()[0]
+
+    if name not in CODECS:
+        raise ValueError(f"Unknown codec '{name}'")
+
+    return CODECS[name]()
+
+
+def _import_orjson() -> bool:
+    """Import `orjson`; return whether it's installed."""
+
+    global orjson
+
+    if orjson is None:
+        try:
+            import orjson
+        except ImportError:
+            return False
+
+    return True
+
+
+def _import_ujson() -> bool:
+    """Import `ujson`; return whether it's installed."""
+
+    global ujson
+
+    if ujson is None:
+        try:
+            import ujson
+        except ImportError:
+            return False
+
+    return True
+
+
+def _normalize(s: str) -> str:
+    """Make a JSON document equal to the output of the standard library.
+
+    Escape non-ASCII characters and format floats like `repr`
+    does (e.g. `1e+16` instead of `1e16`).
+    """
+    if not s.isascii() or '\x7f' in s:
+        s = _NON_ASCII_REGEX.sub(_escape_char, s)
+    if _FLOAT_HINT_FIXED in s or _FLOAT_HINT_REGEX.search(s):
+        s = _FLOAT_REGEX.sub(_format_float, s)
+    return s
+
+
+def _has_non_finite_floats(obj: Any) -> bool:
+    """Check if an object has `NaN` or infinite floats at any level."""
+
+    pending = [obj]
+    isfinite = math.isfinite
+
+    while pending:
+        value = pending.pop()
+        # Most values are strings; they are skipped first
+        if value.__class__ is str:
+            continue
+        elif isinstance(value, dict):
+            pending.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            pending.extend(value)
+        elif isinstance(value, float) and not isfinite(value):
+            return True
+
+    return False
+
+
+def _escape_char(match: re.Match) -> str:
+    n = ord(match.group(0))
+
+    if n < 0x10000:
+        return f'\\u{n:04x}'
+
+    n -= 0x10000
+    high = 0xd800 | ((n >> 10) & 0x3ff)
+    low = 0xdc00 | (n & 0x3ff)
+
+    return f'\\u{high:04x}\\u{low:04x}'
+
+
+def _format_float(match: re.Match) -> str:
+    token = match.group(0)
+
+    if token[0] == '"':
+        return token
+
+    return repr(float(token))
@@ -0,0 +1,460 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import datetime
+import functools
+import importlib.util
+import json
+import os
+
+from collections.abc import Callable
+from typing import Any
+
+from .eventizer import Event
+
+# `pyarrow` is optional and takes longer to import than the rest
+# of the package, so it's imported when the first writer is created
+pyarrow = None
+
+
+COLUMNAR_FORMATS = ['parquet', 'arrow']
+
+COLUMNAR_EXTENSIONS = {
+    'parquet': '.parquet',
+    'arrow': '.arrow',
+}
+
+DEFAULT_BATCH_SIZE = 10000
+
+# Families of events written to the same table. Events of other
+# types go to the 'other' table, with their data encoded as JSON.
+FAMILY_COMMIT = 'commit'
+FAMILY_FILE_ACTION = 'file_action'
+FAMILY_IDENTITY = 'identity'
+FAMILY_OTHER = 'other'
+
+
+@functools.cache
+def event_families() -> dict[str, str]:
+    """Return the family of each type of event that has its own table.
+
+    The types are defined by the git eventizer, which is imported
+    here so the command line doesn't load it when it isn't needed.
+    """
+    from .events.core.git import (COMMIT_TRAILERS,
+                                  GIT_ACTION_EVENT_TYPES,
+                                  GIT_EVENT_COMMIT,
+                                  GIT_EVENT_COMMIT_AUTHORED_BY,
+                                  GIT_EVENT_COMMIT_COMMITTED_BY,
+                                  GIT_EVENT_MERGE_COMMIT)
+
+    return {
+        GIT_EVENT_COMMIT: FAMILY_COMMIT,
+        GIT_EVENT_MERGE_COMMIT: FAMILY_COMMIT,
+        **{event_type: FAMILY_FILE_ACTION for event_type in GIT_ACTION_EVENT_TYPES},
+        GIT_EVENT_COMMIT_AUTHORED_BY: FAMILY_IDENTITY,
+        GIT_EVENT_COMMIT_COMMITTED_BY: FAMILY_IDENTITY,
+        **{event_type: FAMILY_IDENTITY for event_type in COMMIT_TRAILERS.values()},
+    }
+
+
+def available_columnar_formats() -> list[str]:
+    """Return the names of the columnar formats that can be used."""
+
+    if pyarrow or importlib.util.find_spec('pyarrow'):
+        return list(COLUMNAR_FORMATS)
+    return []
+
+
+def _import_pyarrow() -> bool:
+    """Import `pyarrow`; return whether it's installed."""
+
+    global pyarrow
+
+    if pyarrow is None:
+        try:
+            import pyarrow.ipc
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            return False
+
+    return True
+
+
+class ColumnarWriter:
+    """Write events to Parquet or Arrow IPC files.
+
+    Events are split by family: commits, file actions and identities
+    have their own file (e.g. `commit.parquet`), with a column for
+    each attribute of the event and each field of their data. Numbers
+    of lines are integers and times are UTC timestamps, so consumers
+    don't have to parse them. Events of other types are written to
+    the file of the 'other' family, with their data as a JSON string.
+
+    Events can be `Event` or `CloudEvent` objects. They are kept in
+    memory until a family has `batch_size` events; then, they are
+    written as a row group (Parquet) or a record batch (Arrow).
+    Files are only complete once the writer is closed.
+
+    It requires `pyarrow`.
+
+    :param directory: directory where files are created
+    :param format: 'parquet' or 'arrow'
+    :param batch_size: number of events of each row group or batch
+
+    :raises ValueError: when the format is unknown or not available,
+        the batch size is not valid, or the directory already has
+        files of the format
+    """
+    def __init__(
+        self,
+        directory: str,
+        format: str = 'parquet',
+        batch_size: int = DEFAULT_BATCH_SIZE
+    ):
+        if format not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unknown columnar format '{format}'")
+        if not _import_pyarrow():
+            raise ValueError(f"Format '{format}' is not available; install 'pyarrow' package")
+        if batch_size < 1:
+            raise ValueError("'batch_size' must be greater than 0")
+
+        extension = COLUMNAR_EXTENSIONS[format]
+
+        os.makedirs(directory, exist_ok=True)
+        existing = [name for name in os.listdir(directory) if name.endswith(extension)]
+        if existing:
+            raise ValueError(f"'{directory}' already has '{extension}' files")
+
+        self.directory = directory
+        self.format = format
+        self.batch_size = batch_size
+        self.extension = extension
+        self.paths = []
+
+        self._families = event_families()
+        self._pending = {}
+        self._writers = {}
+
+    def write(self, event: Any) -> None:
+        """Add an event to the table of its family.
+
+        :param event: `Event` or `CloudEvent` to write
+        """
+        if not isinstance(event, Event):
+            # Columns are built from the attributes of `Event`
+            event = Event(event['id'], event['type'], event['source'], event.get('time'),
+                          data=event.get_data(), linked_event=event.get('linked_event'))
+
+        family = self._families.get(event.type, FAMILY_OTHER)
+
+        try:
+            pending = self._pending[family]
+        except KeyError:
+            pending = self._pending[family] = []
+
+        pending.append(event)
+        if len(pending) >= self.batch_size:
+            self._write_batch(family)
+
+    def flush(self) -> None:
+        """Write the pending events of all the families."""
+
+        for family in list(self._pending):
+            self._write_batch(family)
+
+    def close(self) -> None:
+        """Write the pending events and close the files."""
+
+        try:
+            self.flush()
+        finally:
+            for writer in self._writers.values():
+                writer.close()
+            self._writers.clear()
+
+    def __enter__(self) -> 'ColumnarWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _write_batch(self, family: str) -> None:
+        events = self._pending.pop(family, None)
+        if not events:
+            return
+
+        schema, columns = _table_schema(family)
+        batch = pyarrow.RecordBatch.from_pydict(columns(events, schema), schema=schema)
+
+        writer = self._writers.get(family)
+        if writer is None:
+            writer = self._writers[family] = self._open(family, schema)
+        writer.write_batch(batch)
+
+    def _open(self, family: str, schema: 'pyarrow.Schema') -> Any:
+        path = os.path.join(self.directory, family + self.extension)
+        self.paths.append(path)
+
+        if self.format == 'parquet':
+            return pyarrow.parquet.ParquetWriter(path, schema)
+        else:
+            return pyarrow.ipc.new_file(path, schema)
+
+
+def _to_int(value: Any) -> int | None:
+    """Convert a number found in a string to int; `None` if it isn't a number.
+
+    Git reports '-' as the number of lines of binary files.
+    """
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_timestamp(value: Any) -> int | datetime.datetime | None:
+    """Convert the time of an event to a value of a timestamp column.
+
+    Seconds since the epoch are converted to microseconds; strings
+    are parsed as ISO 8601 dates.
+    """
+    if value is None:
+        return None
+    elif isinstance(value, str):
+        return datetime.datetime.fromisoformat(value)
+    return round(value * 1_000_000)
+
+
+# Columns are built from lists of events, one list per column,
+# which is faster than building a dict for each row.
+
+def _attribute_columns(events: list[Any]) -> dict[str, Any]:
+    return {
+        'id': [event.id for event in events],
+        'type': [event.type for event in events],
+        'source': [event.source for event in events],
+        'time': [_to_timestamp(event.time) for event in events],
+    }
+
+
+def _commit_columns(events: list[Any], schema: 'pyarrow.Schema') -> dict[str, Any]:
+    columns = _attribute_columns(events)
+    datas = [event.data for event in events]
+
+    for column, field in _commit_fields().items():
+        columns[column] = [data.get(field) for data in datas]
+
+    columns['files'] = _files_array(datas, schema.field('files').type)
+
+    return columns
+
+
+def _files_array(datas: list[dict[str, Any]], files_type: 'pyarrow.DataType') -> 'pyarrow.ListArray':
+    """Build the array of the files of the commits.
+
+    The values of each field of the files are collected in flat
+    lists and the arrays are built from them, which is faster than
+    converting a dict for each file.
+    """
+    pa = pyarrow
+
+    offsets = [0]
+    nulls = []
+    fields = {name: [] for name in ('action', 'file', 'newfile', 'added', 'removed', 'modes', 'indexes')}
+    actions, filenames, new_filenames = fields['action'], fields['file'], fields['newfile']
+    added, removed, modes, indexes = fields['added'], fields['removed'], fields['modes'], fields['indexes']
+    count = 0
+
+    for data in datas:
+        files = data.get('files')
+
+        nulls.append(files is None)
+        if files is None:
+            offsets.append(count)
+            continue
+
+        for file_data in files:
+            actions.append(file_data.get('action'))
+            filenames.append(file_data.get('file'))
+            new_filenames.append(file_data.get('newfile'))
+            added.append(_to_int(file_data.get('added')))
+            removed.append(_to_int(file_data.get('removed')))
+            modes.append(file_data.get('modes'))
+            indexes.append(file_data.get('indexes'))
+
+        count += len(files)
+        offsets.append(count)
+
+    struct_type = files_type.value_type
+    values = pa.StructArray.from_arrays(
+        [pa.array(column, type=struct_type.field(n).type) for n, column in enumerate(fields.values())],
+        fields=list(struct_type)
+    )
+    mask = pa.array(nulls, type=pa.bool_()) if any(nulls) else None
+
+    return pa.ListArray.from_arrays(pa.array(offsets, type=pa.int32()), values,
+                                    type=files_type, mask=mask)
+
+
+def _file_action_columns(events: list[Any], schema: 'pyarrow.Schema') -> dict[str, Any]:
+    columns = _attribute_columns(events)
+    datas = [event.data for event in events]
+
+    columns['linked_event'] = [event.linked_event for event in events]
+    columns['filename'] = [data['filename'] for data in datas]
+    columns['new_filename'] = [data['new_filename'] for data in datas]
+    columns['modes'] = [data['modes'] for data in datas]
+    columns['indexes'] = [data['indexes'] for data in datas]
+    columns['similarity'] = [_to_int(data['similarity']) for data in datas]
+    columns['added_lines'] = [_to_int(data['added_lines']) for data in datas]
+    columns['deleted_lines'] = [_to_int(data['deleted_lines']) for data in datas]
+
+    return columns
+
+
+def _identity_columns(events: list[Any], schema: 'pyarrow.Schema') -> dict[str, Any]:
+    columns = _attribute_columns(events)
+    datas = [event.data for event in events]
+
+    columns['linked_event'] = [event.linked_event for event in events]
+    columns['uuid'] = [data['uuid'] for data in datas]
+    columns['name'] = [data['name'] for data in datas]
+    columns['email'] = [data['email'] for data in datas]
+    columns['username'] = [data['username'] for data in datas]
+    columns['role'] = [data['role'] for data in datas]
+    columns['identity_source'] = [data['source'] for data in datas]
+
+    return columns
+
+
+def _other_columns(events: list[Any], schema: 'pyarrow.Schema') -> dict[str, Any]:
+    columns = _attribute_columns(events)
+
+    columns['linked_event'] = [event.linked_event for event in events]
+    columns['data'] = [None if event.data is None else json.dumps(event.data, sort_keys=True)
+                       for event in events]
+
+    return columns
+
+
+@functools.cache
+def _trailer_columns() -> dict[str, str]:
+    """Return the columns of the trailers (e.g. 'Signed-off-by' -> 'signed_off_by')."""
+
+    from .events.core.git import COMMIT_TRAILERS
+
+    return {trailer.lower().replace('-', '_'): trailer for trailer in COMMIT_TRAILERS}
+
+
+@functools.cache
+def _commit_fields() -> dict[str, str]:
+    """Return the columns of the fields of commits, except files."""
+
+    return {
+        'commit': 'commit',
+        'parents': 'parents',
+        'merge': 'Merge',
+        'author': 'Author',
+        'author_date': 'AuthorDate',
+        'committer': 'Commit',
+        'commit_date': 'CommitDate',
+        'message': 'message',
+        'refs': 'refs',
+        **_trailer_columns(),
+    }
+
+
+_schemas = {}
+
+
+def _table_schema(family: str) -> tuple['pyarrow.Schema', Callable[[list[Any], 'pyarrow.Schema'], dict[str, Any]]]:
+    """Return the schema of the table of a family and the function to build its columns."""
+
+    try:
+        return _schemas[family]
+    except KeyError:
+        pass
+
+    pa = pyarrow
+    strings = pa.list_(pa.string())
+    attributes = [
+        pa.field('id', pa.string(), nullable=False),
+        pa.field('type', pa.string(), nullable=False),
+        pa.field('source', pa.string()),
+        pa.field('time', pa.timestamp('us', tz='UTC')),
+    ]
+
+    if family == FAMILY_COMMIT:
+        file_type = pa.struct([
+            ('action', pa.string()),
+            ('file', pa.string()),
+            ('new_file', pa.string()),
+            ('added_lines', pa.int64()),
+            ('deleted_lines', pa.int64()),
+            ('modes', strings),
+            ('indexes', strings),
+        ])
+        fields = [
+            ('commit', pa.string()),
+            ('parents', strings),
+            ('merge', pa.string()),
+            ('author', pa.string()),
+            ('author_date', pa.string()),
+            ('committer', pa.string()),
+            ('commit_date', pa.string()),
+            ('message', pa.string()),
+            ('refs', strings),
+            *[(column, strings) for column in _trailer_columns()],
+            ('files', pa.list_(file_type)),
+        ]
+        columns = _commit_columns
+    elif family == FAMILY_FILE_ACTION:
+        fields = [
+            ('linked_event', pa.string()),
+            ('filename', pa.string()),
+            ('new_filename', pa.string()),
+            ('modes', strings),
+            ('indexes', strings),
+            ('similarity', pa.int32()),
+            ('added_lines', pa.int64()),
+            ('deleted_lines', pa.int64()),
+        ]
+        columns = _file_action_columns
+    elif family == FAMILY_IDENTITY:
+        fields = [
+            ('linked_event', pa.string()),
+            ('uuid', pa.string()),
+            ('name', pa.string()),
+            ('email', pa.string()),
+            ('username', pa.string()),
+            ('role', pa.string()),
+            ('identity_source', pa.string()),
+        ]
+        columns = _identity_columns
+    else:
+        fields = [
+            ('linked_event', pa.string()),
+            ('data', pa.string()),
+        ]
+        columns = _other_columns
+
+    schema = pa.schema(attributes + [pa.field(name, field_type) for name, field_type in fields])
+    _schemas[family] = schema, columns
+
+    return schema, columns
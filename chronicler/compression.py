@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+import io
+import queue
+import threading
+
+from typing import BinaryIO
+
+# Compression libraries are imported when a stream that uses them
+# is opened, so the command line doesn't load them for plain files.
+# `zstandard` is optional.
+zstandard = None
+
+
+DEFAULT_DECOMPRESS_BLOCK_SIZE = 1024 * 1024
+DEFAULT_DECOMPRESS_QUEUE_SIZE = 8
+
+# Signatures at the beginning of compressed streams
+COMPRESSION_MAGIC = {
+    'gzip': b'\x1f\x8b',
+    'bz2': b'BZh',
+    'xz': b'\xfd7zXZ\x00',
+    'zstd': b'\x28\xb5\x2f\xfd',
+}
+
+COMPRESSION_EXTENSIONS = {
+    '.gz': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'xz',
+    '.zst': 'zstd',
+}
+
+# Levels used when none is given and valid range of levels
+COMPRESSION_LEVELS = {
+    'gzip': (6, 0, 9),
+    'bz2': (9, 1, 9),
+    'xz': (6, 0, 9),
+    'zstd': (3, 1, 22),
+}
+
+COMPRESSIONS = list(COMPRESSION_LEVELS)
+
+
+def available_compressions() -> list[str]:
+    """Return the names of the compression formats that can be used."""
+
+    return [name for name in COMPRESSIONS if name != 'zstd' or _import_zstandard()]
+
+
+def detect_compression(fd: BinaryIO) -> str | None:
+    """Detect the compression format of a stream.
+
+    The first bytes of the stream are peeked, so they can
+    still be read afterwards.
+
+    :param fd: buffered binary stream with a `peek` method
+
+    :returns: the name of the compression format or `None`
+        when the stream is not compressed
+    """
+    head = fd.peek(max(len(magic) for magic in COMPRESSION_MAGIC.values()))
+
+    for name, magic in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def open_input(fd: BinaryIO) -> BinaryIO:
+    """Open a binary stream decompressing its data if needed.
+
+    The compression format is detected from the first bytes of
+    the stream. When the stream is not compressed, the same
+    stream is returned, so regular files can still be mapped
+    in memory. Otherwise, data is decompressed in a background
+    thread, overlapping with the processing of the data already
+    decompressed, and a stream with `read` and `read1` methods
+    is returned.
+
+    :param fd: binary stream to read
+
+    :returns: a binary stream with uncompressed data
+
+    :raises ValueError: when the stream is compressed with
+        a format that is not available
+    """
+    if not hasattr(fd, 'peek'):
+        fd = io.BufferedReader(fd)
+
+    compression = detect_compression(fd)
+
+    if compression is None:
+        return fd
+    elif compression not in available_compressions():
+        raise ValueError(f"Input is compressed with '{compression}'; install 'zstandard' package")
+
+    if compression == 'gzip':
+        import gzip
+        decompressed = gzip.GzipFile(fileobj=fd, mode='rb')
+    elif compression == 'bz2':
+        import bz2
+        decompressed = bz2.BZ2File(fd, mode='rb')
+    elif compression == 'xz':
+        import lzma
+        decompressed = lzma.LZMAFile(fd, mode='rb')
+    else:
+        dctx = zstandard.ZstdDecompressor()
+        decompressed = dctx.stream_reader(fd, read_across_frames=True, closefd=False)
+
+    return BackgroundReader(decompressed)
+
+
+def open_output(
+    fd: BinaryIO,
+    compression: str | None = 'auto',
+    level: int | None = None
+) -> BinaryIO:
+    """Open a binary stream compressing the data written to it.
+
+    When `compression` is `auto`, the format is chosen using the
+    extension of the name of the stream (e.g. `.gz` for gzip);
+    streams without a known extension are not compressed. When
+    the data is not compressed, the same stream is returned.
+
+    Closing the compressed stream writes the end of the
+    compressed data but it does not close `fd`.
+
+    :param fd: binary stream where data will be written
+    :param compression: name of the compression format, `auto`
+        or `None` to write uncompressed data
+    :param level: compression level; by default, a level that
+        balances speed and size is used
+
+    :returns: a binary stream
+
+    :raises ValueError: when the compression format is unknown or
+        not available, or the level is out of the range of the format
+    """
+    if compression == 'auto':
+        name = getattr(fd, 'name', None)
+        compression = None
+        if isinstance(name, str):
+            for extension, format_name in COMPRESSION_EXTENSIONS.items():
+                if name.endswith(extension):
+                    compression = format_name
+                    break
+
+    if compression is None:
+        return fd
+    elif compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression '{compression}'")
+    elif compression not in available_compressions():
+        raise ValueError(f"Compression '{compression}' is not available; install 'zstandard' package")
+
+    default_level, min_level, max_level = COMPRESSION_LEVELS[compression]
+    if level is None:
+        level = default_level
+    elif not min_level <= level <= max_level:
+        raise ValueError(f"'{compression}' compression level must be between {min_level} and {max_level}")
+
+    if compression == 'gzip':
+        import gzip
+        return gzip.GzipFile(fileobj=fd, mode='wb', compresslevel=level)
+    elif compression == 'bz2':
+        import bz2
+        return bz2.BZ2File(fd, mode='wb', compresslevel=level)
+    elif compression == 'xz':
+        import lzma
+        return lzma.LZMAFile(fd, mode='wb', preset=level)
+    else:
+        cctx = zstandard.ZstdCompressor(level=level)
+        return cctx.stream_writer(fd, closefd=False)
+
+
+def _import_zstandard() -> bool:
+    """Import `zstandard`; return whether it's installed."""
+
+    global zstandard
+
+    if zstandard is None:
+        try:
+            import zstandard
+        except ImportError:
+            return False
+
+    return True
+
+
+class BackgroundReader:
+    """Read a stream from a background thread.
+
+    Blocks of `block_size` bytes are read by a thread and kept in
+    a queue of `queue_size` blocks, so the cost of reading the
+    stream, like decompressing it, overlaps with the processing of
+    the data already read. Errors reading the stream are raised
+    by `read` and `read1` once the previous data is consumed.
+
+    :param fd: binary stream to read
+    :param block_size: number of bytes read at once
+    :param queue_size: maximum number of blocks read in advance
+    """
+    def __init__(
+        self,
+        fd: BinaryIO,
+        block_size: int = DEFAULT_DECOMPRESS_BLOCK_SIZE,
+        queue_size: int = DEFAULT_DECOMPRESS_QUEUE_SIZE
+    ):
+        self.fd = fd
+        self.block_size = block_size
+
+        self._blocks = queue.Queue(maxsize=queue_size)
+        self._pending = b''
+        self._eof = False
+        self._closed = threading.Event()
+
+        self._thread = threading.Thread(target=self._run,
+                                        name='chronicler-reader',
+                                        daemon=True)
+        self._thread.start()
+
+    def read1(self, size: int = -1) -> bytes:
+        """Read up to `size` bytes, waiting only for the next block."""
+
+        if not self._pending:
+            self._pending = self._next_block()
+
+        if size < 0 or size >= len(self._pending):
+            data, self._pending = self._pending, b''
+        else:
+            data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+    def read(self, size: int = -1) -> bytes:
+        """Read `size` bytes or until the end of the stream when it's negative."""
+
+        chunks = []
+        while size < 0 or size > 0:
+            data = self.read1(size)
+            if not data:
+                break
+            chunks.append(data)
+            if size > 0:
+                size -= len(data)
+        return b''.join(chunks)
+
+    def close(self) -> None:
+        """Stop the background thread and close the stream."""
+
+        self._closed.set()
+        self._thread.join()
+        self.fd.close()
+
+    def __enter__(self) -> 'BackgroundReader':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _next_block(self):
+        if self._eof:
+            return b''
+
+        block = self._blocks.get()
+        if isinstance(block, BaseException):
+            self._eof = True
+            raise block
+        elif not block:
+            self._eof = True
+        return block
+
+    def _run(self):
+        try:
+            while not self._closed.is_set():
+                block = self.fd.read(self.block_size)
+                self._put(block)
+                if not block:
+                    break
+        except Exception as e:
+            self._put(e)
+
+    def _put(self, item):
+        while not self._closed.is_set():
+            try:
+                self._blocks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+import hashlib
+import math
+
+from collections.abc import Generator, Iterable
+from typing import Any
+
+
+DEFAULT_EXACT_SIZE = 100_000
+DEFAULT_BLOOM_CAPACITY = 10_000_000
+DEFAULT_BLOOM_ERROR_RATE = 1e-6
+
+
+class BloomFilter:
+    """Probabilistic set of strings.
+
+    The filter can tell if a string was never added, but it may
+    report a string as added when it wasn't (a false positive).
+    Its size is fixed and it's computed to keep the probability
+    of false positives under `error_rate` while the number of
+    strings added is below `capacity`.
+
+    :param capacity: expected number of strings
+    :param error_rate: probability of false positives
+    """
+    def __init__(self, capacity: int, error_rate: float):
+        if capacity < 1:
+            raise ValueError("'capacity' must be greater than 0")
+        if not 0 < error_rate < 1:
+            raise ValueError("'error_rate' must be between 0 and 1")
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+
+        n_bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.n_hashes = max(1, round(n_bits / capacity * math.log(2)))
+        self.n_bits = n_bits
+        self._bits = bytearray((n_bits + 7) // 8)
+        self._count = 0
+
+    def add(self, value: str) -> bool:
+        """Add a string to the filter.
+
+        :param value: string to add
+
+        :returns: `True` when the string was already in the
+            filter, or it's a false positive
+        """
+        found = True
+        bits = self._bits
+        n_bits = self.n_bits
+        h1, h2 = self._hashes(value)
+
+        for _ in range(self.n_hashes):
+            position = h1 % n_bits
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                found = False
+            h1 += h2
+
+        if not found:
+            self._count += 1
+        return found
+
+    def __contains__(self, value: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(value))
+
+    def __len__(self) -> int:
+        """Approximate number of strings added."""
+
+        return self._count
+
+    def _positions(self, value):
+        h1, h2 = self._hashes(value)
+        n_bits = self.n_bits
+
+        for _ in range(self.n_hashes):
+            yield h1 % n_bits
+            h1 += h2
+
+    @staticmethod
+    def _hashes(value):
+        # Double hashing: the k positions of a value are
+        # generated from two 64 bits hashes, h1 + i * h2
+        digest = hashlib.blake2b(value.encode('utf-8', 'surrogateescape'), digest_size=16).digest()
+        h = int.from_bytes(digest, 'little')
+
+        return h & 0xFFFFFFFFFFFFFFFF, (h >> 64) | 1
+
+
+class DuplicateFilter:
+    """Drop the items already seen in a stream.
+
+    Items are identified by their `uuid`. The first `exact_size`
+    UUIDs are kept in a set. When that number is exceeded, they
+    are moved to a Bloom filter with room for `bloom_capacity`
+    UUIDs, so the memory used is bounded. From then on, a new item
+    might be taken as a duplicate with a probability lower than
+    `bloom_error_rate`, as long as the number of items is below
+    the capacity of the filter.
+
+    The number of items dropped is available in `duplicates`.
+
+    :param exact_size: maximum number of UUIDs kept in a set
+    :param bloom_capacity: expected number of UUIDs of the stream
+    :param bloom_error_rate: probability of taking a new item as
+        a duplicate once the Bloom filter is used
+    """
+    def __init__(
+        self,
+        exact_size: int = DEFAULT_EXACT_SIZE,
+        bloom_capacity: int = DEFAULT_BLOOM_CAPACITY,
+        bloom_error_rate: float = DEFAULT_BLOOM_ERROR_RATE
+    ):
+        if exact_size < 0:
+            raise ValueError("'exact_size' must be greater than or equal to 0")
+        if bloom_capacity < 1:
+            raise ValueError("'bloom_capacity' must be greater than 0")
+        if not 0 < bloom_error_rate < 1:
+            raise ValueError("'bloom_error_rate' must be between 0 and 1")
+
+        self.exact_size = exact_size
+        self.bloom_capacity = bloom_capacity
+        self.bloom_error_rate = bloom_error_rate
+        self.duplicates = 0
+
+        self._seen = set()
+        self._bloom = None
+
+    @property
+    def is_exact(self) -> bool:
+        """`False` once the UUIDs were moved to the Bloom filter."""
+
+        return self._bloom is None
+
+    def seen(self, uuid: str) -> bool:
+        """Record a UUID and check if it was recorded before.
+
+        :param uuid: UUID of an item
+
+        :returns: `True` when the UUID was already recorded
+        """
+        if self._bloom is not None:
+            found = self._bloom.add(uuid)
+        elif uuid in self._seen:
+            found = True
+        else:
+            found = False
+            self._seen.add(uuid)
+            if len(self._seen) > self.exact_size:
+                self._switch_to_bloom()
+
+        if found:
+            self.duplicates += 1
+        return found
+
+    def filter(self, raw_items: Iterable[dict[str, Any]]) -> Generator[dict[str, Any]]:
+        """Return the items of a stream that were not seen before.
+
+        Items without `uuid` are always returned.
+
+        :param raw_items: perceval items
+
+        :returns: a generator of items
+        """
+        seen = self.seen
+
+        for raw_item in raw_items:
+            uuid = raw_item.get('uuid', None)
+            if uuid and seen(uuid):
+                continue
+            yield raw_item
+
+    def _switch_to_bloom(self):
+        self._bloom = BloomFilter(self.bloom_capacity, self.bloom_error_rate)
+        for uuid in self._seen:
+            self._bloom.add(uuid)
+        self._seen = None
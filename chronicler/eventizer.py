@@ -16,15 +16,25 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 #
 
+import fnmatch
+import hashlib
 import importlib
+import json
 import pkgutil
 import os
+import threading
+import time
 
-from collections import namedtuple
-from collections.abc import Iterator, Generator
-from typing import Any
+from collections import Counter, namedtuple
+from collections.abc import Generator, Iterable, Iterator, Sequence
+from types import MappingProxyType
+from typing import Any, TYPE_CHECKING
 
-from cloudevents.http import CloudEvent
+if TYPE_CHECKING:
+    from cloudevents.http import CloudEvent
+
+    from .dedup import DuplicateFilter
+    from .stats import EventizerStats
 
 
 Identity = namedtuple('Identity',
@@ -32,6 +42,132 @@ Identity = namedtuple('Identity',
                       defaults=(None, None, None))
 
 
+# Attributes that are always part of an `Event`
+_EVENT_ATTRIBUTES = frozenset(('id', 'source', 'specversion', 'time', 'type'))
+
+
+class Event:
+    """Lightweight GrimoireLab event.
+
+    Compact representation of an event used by the eventizers.
+    It has the same attributes and data as the CloudEvent it
+    represents, but it doesn't validate them nor set any default
+    value, so it's cheaper to create and smaller in memory.
+
+    Attributes can be read like in a `CloudEvent`, using the
+    name of the attribute as a key (e.g. `event['id']`), or
+    as an attribute of the object (e.g. `event.id`). The payload
+    is available in `data`. When a real `CloudEvent` is needed,
+    call `to_cloudevent`.
+
+    The `linked_event` attribute is only part of the event when
+    it's set.
+
+    :param id: identifier of the event
+    :param type: type of the event
+    :param source: source of the event
+    :param time: time of the event
+    :param data: payload of the event
+    :param linked_event: identifier of the parent event
+    """
+    __slots__ = ('id', 'type', 'source', 'time', 'linked_event', 'data')
+
+    specversion = '1.0'
+
+    def __init__(self, id, type, source, time, data=None, linked_event=None):
+        self.id = id
+        self.type = type
+        self.source = source
+        self.time = time
+        self.data = data
+        self.linked_event = linked_event
+
+    def _get_attributes(self) -> dict[str, Any]:
+        attributes = {
+            'id': self.id,
+            'source': self.source,
+            'specversion': self.specversion,
+            'time': self.time,
+            'type': self.type,
+        }
+        if self.linked_event is not None:
+            attributes['linked_event'] = self.linked_event
+
+        return attributes
+
+    def get_attributes(self) -> MappingProxyType:
+        """Return a read-only view of the attributes of the event."""
+
+        return MappingProxyType(self._get_attributes())
+
+    def get_data(self) -> Any:
+        """Return the data of the event."""
+
+        return self.data
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the structured-mode dict of the event.
+
+        The result is the same as calling `cloudevents.conversion.to_dict`
+        on the `CloudEvent` version of the event.
+        """
+        document = self._get_attributes()
+        document['data'] = self.data
+
+        return document
+
+    def to_cloudevent(self) -> 'CloudEvent':
+        """Convert the event into a `CloudEvent`."""
+
+        from cloudevents.http import CloudEvent
+
+        return CloudEvent(self._get_attributes(), self.data)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in _EVENT_ATTRIBUTES:
+            return getattr(self, key)
+        elif key == 'linked_event' and self.linked_event is not None:
+            return self.linked_event
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _EVENT_ATTRIBUTES:
+            return getattr(self, key)
+        elif key == 'linked_event' and self.linked_event is not None:
+            return self.linked_event
+        raise KeyError(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in _EVENT_ATTRIBUTES or (key == 'linked_event' and self.linked_event is not None)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._get_attributes())
+
+    def __len__(self) -> int:
+        return len(self._get_attributes())
+
+    def __eq__(self, other: Any) -> bool:
+        try:
+            return (self._get_attributes() == other._get_attributes() and
+                    self.data == other.get_data())
+        except AttributeError:
+            return False
+
+    def __repr__(self) -> str:
+        return str({"attributes": self._get_attributes(), "data": self.data})
+
+
+def to_cloudevent(event: 'Event | CloudEvent') -> 'CloudEvent':
+    """Convert an event into a `CloudEvent`.
+
+    Instances of `CloudEvent` are returned unchanged.
+    """
+    if isinstance(event, Event):
+        return event.to_cloudevent()
+    else:
+        return event
+
+
 class Eventizer:
     """Abstract class to eventize data.
 
@@ -48,39 +184,399 @@ class Eventizer:
     To create your own eventizer, sub-class this class by implementing
     the method `eventize_item`. This method should have the
     logic to given a perceval item, produce the events associated to
-    that item.
+    that item. Events can be `Event` or `CloudEvent` objects; `Event`
+    is preferred because it's cheaper to create. `eventize_item` can
+    also return a generator for items with many events, so `eventize`
+    passes them on one by one without keeping all of them in memory.
+
+    Events can be selected by type with `types`, a list of glob
+    patterns (see `EventTypeFilter`). Events of other types are
+    dropped by `eventize` and `eventize_batch`. Sub-classes can
+    use `type_filter` to avoid generating them in `eventize_item`.
+
+    :param types: glob patterns of the types of the events to generate
     """
-    def eventize(self, raw_items: Iterator[dict[str, Any]]) -> Generator[CloudEvent]:
+    type_filter: 'EventTypeFilter | None' = None
+
+    def __init__(self, types: Iterable[str] | None = None):
+        self.type_filter = EventTypeFilter(types) if types else None
+
+    def eventize(
+        self,
+        raw_items: Iterator[dict[str, Any]],
+        dedup: 'DuplicateFilter | None' = None,
+        stats: 'EventizerStats | None' = None
+    ) -> Generator['Event | CloudEvent']:
         """Generate GrimoireLab events.
 
         Produce events from the given list of perceval items.
-        The items must be of the same type.
+        The items must be of the same type. Events are returned
+        as they were produced by `eventize_item`.
+
+        When `dedup` is given, items whose `uuid` was already
+        seen by the filter are dropped before eventizing them.
+
+        When `stats` is given, the time spent eventizing each item
+        and the events generated are added to the statistics.
+
+        :param raw_items: perceval items to eventize
+        :param dedup: filter of duplicated items
+        :param stats: statistics where the items are added
         """
+        if dedup is not None:
+            raw_items = dedup.filter(raw_items)
+
+        if stats is not None:
+            yield from self._eventize_with_stats(raw_items, stats)
+            return
+
+        type_filter = self.type_filter
+
         for raw_item in raw_items:
-            yield from self.eventize_item(raw_item)
+            if type_filter is None:
+                yield from self.eventize_item(raw_item)
+            else:
+                for event in self.eventize_item(raw_item):
+                    if type_filter(event.type if isinstance(event, Event) else event['type']):
+                        yield event
+
+    def eventize_batch(self, raw_items: Iterable[dict[str, Any]]) -> list['Event | CloudEvent']:
+        """Generate the GrimoireLab events of a batch of items.
+
+        Produce the same events as `eventize`, in the same order,
+        but all of them at once in a list. Sub-classes can override
+        this method to share work among the items of the batch.
+
+        :param raw_items: perceval items to eventize
 
-    def eventize_item(self, raw_item: dict[str, Any]) -> list[CloudEvent]:
+        :returns: list of events
+        """
+        events = []
+        for raw_item in raw_items:
+            events.extend(self.eventize_item(raw_item))
+
+        return self._filter_types(events)
+
+    def eventize_item(self, raw_item: dict[str, Any]) -> list['Event | CloudEvent']:
         """Eventize a item."""
         raise NotImplementedError
 
+    def _eventize_with_stats(
+        self,
+        raw_items: Iterable[dict[str, Any]],
+        stats: 'EventizerStats'
+    ) -> Generator['Event | CloudEvent']:
+        """Generate the events of the items and add them to the statistics."""
+
+        perf_counter = time.perf_counter
+        eventize_item = self.eventize_item
+        type_filter = self.type_filter
+
+        for raw_item in raw_items:
+            start = perf_counter()
+            events = eventize_item(raw_item)
+            if not isinstance(events, list):
+                yield from self._stream_with_stats(raw_item, events, stats, perf_counter() - start)
+                continue
+            if type_filter is not None:
+                events = [event for event in events
+                          if type_filter(event.type if isinstance(event, Event) else event['type'])]
+            stats.add_item(raw_item.get('uuid', None), events, perf_counter() - start)
+
+            yield from events
+
+    def _stream_with_stats(
+        self,
+        raw_item: dict[str, Any],
+        events: Iterable['Event | CloudEvent'],
+        stats: 'EventizerStats',
+        seconds: float
+    ) -> Generator['Event | CloudEvent']:
+        """Generate the events of an item produced lazily and add it to the statistics.
+
+        Only the time spent generating the events is added to the
+        time of the item, not the time spent by the consumer.
+        """
+        perf_counter = time.perf_counter
+        type_filter = self.type_filter
+        events_by_type = Counter()
+        events = iter(events)
+
+        while True:
+            start = perf_counter()
+            event = next(events, None)
+            seconds += perf_counter() - start
+
+            if event is None:
+                break
+
+            event_type = event.type if isinstance(event, Event) else event['type']
+            if type_filter is None or type_filter(event_type):
+                events_by_type[event_type] += 1
+                yield event
+
+        stats.add_item_counts(raw_item.get('uuid', None), events_by_type, seconds)
+
+    def _filter_types(self, events: list['Event | CloudEvent']) -> list['Event | CloudEvent']:
+        """Remove the events whose types were not selected."""
+
+        type_filter = self.type_filter
+        if type_filter is None:
+            return events
+
+        return [event for event in events
+                if type_filter(event.type if isinstance(event, Event) else event['type'])]
+
+
+class EventTypeFilter:
+    """Select event types using glob patterns.
+
+    Patterns follow `fnmatch` rules and match the whole type
+    (e.g. `*.authored_by` or `org.grimoirelab.events.git.file.*`).
+    Patterns starting with `!` exclude the types they match. A
+    type is selected when it matches any of the include patterns,
+    or there are none, and it doesn't match any exclude pattern.
+
+    :param patterns: list of glob patterns
+    """
+    def __init__(self, patterns: Iterable[str]):
+        patterns = list(patterns)
+
+        self.include = tuple(p for p in patterns if not p.startswith('!'))
+        self.exclude = tuple(p[1:] for p in patterns if p.startswith('!'))
+        self._selected = {}
+
+    def __call__(self, event_type: str) -> bool:
+        """Check if an event type is selected."""
+
+        try:
+            return self._selected[event_type]
+        except KeyError:
+            pass
+
+        included = not self.include or any(fnmatch.fnmatchcase(event_type, p) for p in self.include)
+        excluded = any(fnmatch.fnmatchcase(event_type, p) for p in self.exclude)
+        selected = included and not excluded
+        self._selected[event_type] = selected
+
+        return selected
+
+    def any(self, event_types: Iterable[str]) -> bool:
+        """Check if any of the event types is selected."""
+
+        return any(self(event_type) for event_type in event_types)
+
 
-def eventize(name: str, raw_items: Iterator[dict[str, Any]]) -> Generator[CloudEvent]:
+DEFAULT_EVENTIZERS_PACKAGE = 'chronicler.events'
+EVENTIZERS_MANIFEST = 'eventizers.json'
+
+# Process-wide registry of eventizers. Classes are stored by top
+# package name and instances by (top package name, eventizer name,
+# eventizer options).
+_eventizers_registry: dict[str, dict[str, type[Eventizer]]] = {}
+_eventizers_instances: dict[tuple[str, str, frozenset], Eventizer] = {}
+_registry_lock = threading.Lock()
+
+
+def eventize(
+    name: str,
+    raw_items: Iterator[dict[str, Any]],
+    compact: bool = False,
+    dedup: 'DuplicateFilter | None' = None,
+    stats: 'EventizerStats | None' = None,
+    **options
+) -> Generator['Event | CloudEvent']:
     """Eventize data of a given type.
 
     Handy function to produce events from a set of perceval items
-    of given type.
+    of given type. Events are returned as `CloudEvent` objects
+    unless `compact` is set; in that case, they are returned as
+    they were produced by the eventizer, usually as `Event` objects.
+
+    :param name: name of the eventizer
+    :param raw_items: perceval items to eventize
+    :param compact: return events without converting them into `CloudEvent`
+    :param dedup: filter to drop duplicated items (see `Eventizer.eventize`)
+    :param stats: statistics of the run (see `Eventizer.eventize`); the
+        time converting events into `CloudEvent` is added to its
+        'convert' stage
+    :param options: options passed to the eventizer constructor
     """
-    top_package_name = os.environ.get('CHRONICLER_EVENTIZERS',
-                                      'chronicler.events')
+    eventizer = get_eventizer(name, **options)
+    events = eventizer.eventize(raw_items, dedup=dedup, stats=stats)
+
+    if compact:
+        yield from events
+    elif stats is None:
+        for event in events:
+            yield to_cloudevent(event)
+    else:
+        perf_counter = time.perf_counter
+        for event in events:
+            start = perf_counter()
+            cloudevent = to_cloudevent(event)
+            stats.add_time('convert', perf_counter() - start)
+            yield cloudevent
+
+
+def get_eventizer(name: str, **options) -> Eventizer:
+    """Get the eventizer registered with the given name.
+
+    Eventizers are looked up under the package defined by the
+    environment variable `CHRONICLER_EVENTIZERS` (`chronicler.events`
+    by default). The manifest of eventizers of the package is checked
+    first, so only the module of the requested eventizer is imported.
+    When the manifest is missing or the eventizer is not declared
+    there, the package is walked looking for it. Packages are only
+    walked the first time they are requested; after that, the
+    eventizer is taken from a process-wide registry. Instances are
+    created once for each set of `options` and reused in later calls,
+    so eventizers must not keep state between calls to `eventize`,
+    other than caches.
+
+    :param name: name of the eventizer (e.g. `git`)
+    :param options: options passed to the eventizer constructor;
+        their values must be hashable, or lists or sets of hashable
+        values
+
+    :returns: an `Eventizer` instance
+
+    :raises ValueError: when the eventizer is not found
+    """
+    top_package_name = _get_top_package_name()
+    key = (top_package_name, name, _options_key(options))
 
-    eventizers = _find_eventizers(top_package_name)
+    try:
+        return _eventizers_instances[key]
+    except KeyError:
+        pass
+
+    with _registry_lock:
+        if key in _eventizers_instances:
+            return _eventizers_instances[key]
+
+        kls = _find_eventizer_in_manifest(top_package_name, name)
+
+        if not kls:
+            eventizers = _get_registered_eventizers(top_package_name)
+            kls = eventizers.get(name, None)
+
+        if not kls:
+            raise ValueError(f"Unknown eventizer '{name}'")
+
+        eventizer = kls(**options)
+
+        _eventizers_instances[key] = eventizer
+
+    return eventizer
+
+
+def _options_key(options: dict[str, Any]) -> frozenset:
+    """Return the key of the options of an eventizer in the registry.
+
+    Lists (e.g. the patterns of `types`) and sets are not hashable,
+    so they are converted to tuples and frozensets.
+    """
+    return frozenset(
+        (option, tuple(value) if isinstance(value, list) else frozenset(value) if isinstance(value, set) else value)
+        for option, value in options.items()
+    )
+
+
+def clear_eventizers_registry(top_package_name: str | None = None) -> None:
+    """Invalidate the registry of eventizers.
 
+    Remove the eventizer classes and instances registered under
+    `top_package_name`, so the package will be walked again the next
+    time one of its eventizers is requested. When no package is
+    given, the whole registry is cleared.
+
+    :param top_package_name: package storing eventizer classes
+    """
+    with _registry_lock:
+        if top_package_name is None:
+            _eventizers_registry.clear()
+            _eventizers_instances.clear()
+            return
+
+        _eventizers_registry.pop(top_package_name, None)
+
+        for key in [k for k in _eventizers_instances if k[0] == top_package_name]:
+            del _eventizers_instances[key]
+
+
+def _get_top_package_name() -> str:
+    return os.environ.get('CHRONICLER_EVENTIZERS',
+                          DEFAULT_EVENTIZERS_PACKAGE)
+
+
+def _get_registered_eventizers(top_package_name: str) -> dict[str, type[Eventizer]]:
+    """Return the eventizer classes of a package, finding them if needed.
+
+    The caller must hold the registry lock.
+    """
     try:
-        eventizer = eventizers[name]()
+        return _eventizers_registry[top_package_name]
     except KeyError:
-        raise ValueError(f"Unknown eventizer '{name}'")
+        eventizers = _find_eventizers(top_package_name)
+        _eventizers_registry[top_package_name] = eventizers
+        return eventizers
+
+
+def _find_eventizer_in_manifest(top_package_name: str, name: str) -> type[Eventizer] | None:
+    """Find an eventizer in the manifests of a package.
 
-    yield from eventizer.eventize(raw_items)
+    A manifest is a JSON file named `eventizers.json`, stored in the
+    directory of the package, which maps names of eventizers to their
+    classes (e.g. `{"git": "chronicler.events.core.git:GitEventizer"}`).
+    When the package is a namespace, each of its portions can have
+    its own manifest. Loading the class imports its module and
+    nothing else.
+
+    :param top_package_name: package storing eventizer classes
+    :param name: name of the eventizer
+
+    :returns: the `Eventizer` class or `None` when it is not found
+    """
+    top_package = importlib.import_module(top_package_name)
+
+    for path in top_package.__path__:
+        try:
+            with open(os.path.join(path, EVENTIZERS_MANIFEST), 'r') as fd:
+                manifest = json.load(fd)
+        except FileNotFoundError:
+            continue
+
+        if name not in manifest:
+            continue
+
+        module_name, _, class_name = manifest[name].partition(':')
+        module = importlib.import_module(module_name)
+        kls = getattr(module, class_name, None)
+
+        if isinstance(kls, type) and issubclass(kls, Eventizer):
+            return kls
+
+    return None
+
+
+def build_eventizers_manifest(top_package_name: str) -> dict[str, str]:
+    """Build the manifest of eventizers of a package.
+
+    Walk `top_package_name` looking for eventizers and return
+    the entries of its manifest. The result must be stored as
+    JSON in the file `eventizers.json` of the package directory.
+
+    :param top_package_name: package storing eventizer classes
+
+    :returns: a dict mapping names of eventizers to their classes
+    """
+    eventizers = _find_eventizers(top_package_name)
+
+    return {
+        name: f"{kls.__module__}:{kls.__qualname__}"
+        for name, kls in sorted(eventizers.items())
+    }
 
 
 def _find_eventizers(top_package_name: str) -> dict[str, type[Eventizer]]:
@@ -132,7 +628,10 @@ def _find_classes(parent, modules):
         yield name, kls
 
 
-def uuid(*args):
+_sha1 = hashlib.sha1
+
+
+def uuid(*args: str) -> str:
     """Generate a UUID based on the given parameters.
 
     The UUID will be the SHA1 of the concatenation of the values
@@ -147,19 +646,55 @@ def uuid(*args):
     :raises ValueError: when anyone of the values is not a string,
         is empty or `None`.
     """
-    import hashlib
+    # Values are only checked one by one when joining them fails
+    # or any of them is empty, so valid values are not walked twice.
+    try:
+        s = ':'.join(args)
+    except TypeError:
+        s = None
+
+    if s is None or '' in args:
+        _check_uuid_values(args)
+
+    return _sha1(s.encode('utf-8', 'surrogateescape')).hexdigest()
+
+
+def uuids(args_list: Iterable[Sequence[str]]) -> list[str]:
+    """Generate a UUID for each sequence of parameters.
+
+    It is equivalent to calling `uuid` for each sequence, but it
+    is cheaper when an item generates many events at once.
+
+    :param args_list: iterable of sequences of arguments
+
+    :returns: list of universal unique identifiers, in the same order
+
+    :raises ValueError: when anyone of the values is not a string,
+        is empty or `None`.
+    """
+    sha1 = _sha1
+    join = ':'.join
 
-    def check_value(v):
+    ids = []
+    for args in args_list:
+        try:
+            s = join(args)
+        except TypeError:
+            s = None
+
+        if s is None or '' in args:
+            _check_uuid_values(args)
+
+        ids.append(sha1(s.encode('utf-8', 'surrogateescape')).hexdigest())
+
+    return ids
+
+
+def _check_uuid_values(args: Iterable[Any]) -> None:
+    """Raise an error for the first value that can't be part of a UUID."""
+
+    for v in args:
         if not isinstance(v, str):
             raise ValueError("%s value is not a string instance" % str(v))
         elif not v:
             raise ValueError("value cannot be None or empty")
-        else:
-            return v
-
-    s = ':'.join(map(check_value, args))
-
-    sha1 = hashlib.sha1(s.encode('utf-8', errors='surrogateescape'))
-    uuid_sha1 = sha1.hexdigest()
-
-    return uuid_sha1
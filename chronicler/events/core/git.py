@@ -16,15 +16,17 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 #
 
+import functools
+import itertools
 import logging
 import re
 
-from typing import Any, Generator
+from collections.abc import Generator, Iterable
+from typing import Any
 
-from cloudevents.http import CloudEvent
 from grimoirelab_toolkit.identities import generate_uuid
 
-from ...eventizer import Eventizer, uuid, Identity
+from ...eventizer import Event, Eventizer, uuid, Identity
 
 GIT_EVENT_COMMIT = "org.grimoirelab.events.git.commit"
 GIT_EVENT_MERGE_COMMIT = "org.grimoirelab.events.git.merge"
@@ -67,14 +69,214 @@ GIT_AUTHORS_REGEX = re.compile(
     r"(?P<first_authors>.+?)\s+(?:[aA][nN][dD]|&|\+)\s+(?P<last_author>.+?)\s+<(?P<email>[^>]+)>"
 )
 
+# Separators of pair programming authors. `GIT_AUTHORS_REGEX` can
+# backtrack a lot on long strings, so this cheaper regex is checked
+# first to discard strings without any separator.
+GIT_AUTHORS_SEPARATOR_REGEX = re.compile(r"\s(?:[aA][nN][dD]|&|\+)\s")
+
+GIT_ACTION_EVENT_TYPES = (
+    GIT_EVENT_ACTION_ADDED,
+    GIT_EVENT_ACTION_MODIFIED,
+    GIT_EVENT_ACTION_DELETED,
+    GIT_EVENT_ACTION_REPLACED,
+    GIT_EVENT_ACTION_COPIED,
+    GIT_EVENT_ACTION_TYPE_CHANGED,
+)
+
+# Event type and similarity of each action code. Codes of renames,
+# copies and type changes can have a score (e.g. 'R100'); those
+# with a numeric score are added when they are first seen, from
+# `_ACTION_PREFIXES`.
+_ACTION_CODES = {
+    'A': (GIT_EVENT_ACTION_ADDED, None),
+    'M': (GIT_EVENT_ACTION_MODIFIED, None),
+    'D': (GIT_EVENT_ACTION_DELETED, None),
+    'R': (GIT_EVENT_ACTION_REPLACED, ''),
+    'C': (GIT_EVENT_ACTION_COPIED, ''),
+    'T': (GIT_EVENT_ACTION_TYPE_CHANGED, None),
+}
+_ACTION_PREFIXES = {
+    'R': GIT_EVENT_ACTION_REPLACED,
+    'C': GIT_EVENT_ACTION_COPIED,
+    'T': GIT_EVENT_ACTION_TYPE_CHANGED,
+}
+
+# Actions of merge commits without consecutive duplicates,
+# by the action string of the file (e.g. 'MM' -> ('M',))
+_MERGE_ACTIONS = {}
+_MERGE_ACTIONS_CACHE_SIZE = 1024
+
+# Payload profiles of commit events. 'full' keeps the data of the
+# item; 'slim' drops the files and the trailers, which are already
+# in the file action and identity events linked to the commit;
+# 'minimal' only keeps the fields that identify the commit.
+GIT_PAYLOAD_FULL = 'full'
+GIT_PAYLOAD_SLIM = 'slim'
+GIT_PAYLOAD_MINIMAL = 'minimal'
+GIT_PAYLOAD_PROFILES = (GIT_PAYLOAD_FULL, GIT_PAYLOAD_SLIM, GIT_PAYLOAD_MINIMAL)
+
+GIT_PAYLOAD_SLIM_EXCLUDED_FIELDS = frozenset(['files', *COMMIT_TRAILERS])
+GIT_PAYLOAD_MINIMAL_FIELDS = (
+    'commit', 'parents', 'Merge',
+    'Author', 'AuthorDate', 'Commit', 'CommitDate',
+)
+
+DEFAULT_IDENTITY_CACHE_SIZE = 4096
+DEFAULT_LARGE_COMMIT_FILES = 10000
+
 logger = logging.getLogger(__name__)
 
 
 class GitEventizer(Eventizer):
-    """Eventize git commits"""
+    """Eventize git commits
+
+    Identities found in commits are parsed and their UUIDs generated
+    only the first time they are seen. Results are kept in a LRU cache
+    keyed by the identity string; set `identity_cache_size` to 0 to
+    disable it. Warnings for invalid identities are logged once while
+    they are in the cache. Author and committer strings are split into
+    identities once too, using a second cache of the same size.
+
+    When `types` is given, file actions and identities are only
+    processed if any of their event types is selected.
+
+    The data of commit events depends on the `payload` profile.
+    With 'full', it's the data of the item. 'slim' removes the
+    list of files and the trailers, available in the file action
+    and identity events of the commit. 'minimal' only keeps the
+    hash, parents, merge tips, authors, committers and dates.
+
+    Commits with more than `large_commit_files` files (e.g. imports
+    of whole repositories) are eventized lazily: `eventize_item`
+    returns a generator instead of a list, so the events of their
+    files are created one by one, while they are consumed, and
+    memory doesn't grow with the number of files. Errors in the
+    files of these commits are raised while their events are
+    generated.
+
+    :param identity_cache_size: maximum number of identities in the cache
+    :param types: glob patterns of the types of the events to generate
+    :param payload: payload profile of commit events; one of
+        'full', 'slim' or 'minimal'
+    :param large_commit_files: number of files of a commit above
+        which its events are generated lazily
+    """
+    def __init__(
+        self,
+        identity_cache_size: int = DEFAULT_IDENTITY_CACHE_SIZE,
+        types: Iterable[str] | None = None,
+        payload: str = GIT_PAYLOAD_FULL,
+        large_commit_files: int = DEFAULT_LARGE_COMMIT_FILES
+    ):
+        super().__init__(types=types)
+
+        if identity_cache_size < 0:
+            raise ValueError("'identity_cache_size' must be greater than or equal to 0")
+        if large_commit_files < 0:
+            raise ValueError("'large_commit_files' must be greater than or equal to 0")
+        if payload not in GIT_PAYLOAD_PROFILES:
+            raise ValueError(f"Invalid payload profile '{payload}'; "
+                             f"valid profiles are: {', '.join(GIT_PAYLOAD_PROFILES)}")
+
+        self.payload = payload
+        self.large_commit_files = large_commit_files
+
+        selected = self.type_filter or (lambda event_type: True)
+        self._actions_selected = any(selected(event_type) for event_type in GIT_ACTION_EVENT_TYPES)
+        self._authors_selected = selected(GIT_EVENT_COMMIT_AUTHORED_BY)
+        self._committers_selected = selected(GIT_EVENT_COMMIT_COMMITTED_BY)
+        self._trailers_selected = {
+            trailer: event_type for trailer, event_type in COMMIT_TRAILERS.items()
+            if selected(event_type)
+        }
+
+        self._resolve_identity_cached = functools.lru_cache(maxsize=identity_cache_size)(self._resolve_identity)
+        self._parse_authors_cached = functools.lru_cache(maxsize=identity_cache_size)(self._parse_authors)
+
+    def identity_cache_info(self) -> functools._CacheInfo:
+        """Return the statistics of the identity cache.
+
+        :returns: a named tuple with the number of `hits` and `misses`,
+            the `maxsize` of the cache and its current size (`currsize`)
+        """
+        return self._resolve_identity_cached.cache_info()
+
+    def authors_cache_info(self) -> functools._CacheInfo:
+        """Return the statistics of the authors cache.
+
+        :returns: a named tuple with the number of `hits` and `misses`,
+            the `maxsize` of the cache and its current size (`currsize`)
+        """
+        return self._parse_authors_cached.cache_info()
+
+    def clear_identity_cache(self) -> None:
+        """Empty the identity and authors caches and reset their statistics."""
+
+        self._resolve_identity_cached.cache_clear()
+        self._parse_authors_cached.cache_clear()
+
+    def eventize_item(self, raw_item: dict[str, Any]) -> list[Event] | Generator[Event]:
+        event = self._eventize_commit(raw_item)
+
+        if self._actions_selected and len(raw_item['data']['files']) > self.large_commit_files:
+            return self._eventize_large_commit(event, raw_item)
+
+        events = [event]
+        events.extend(self._eventize_commit_children(event, raw_item))
+
+        return events
+
+    def eventize_batch(self, raw_items: Iterable[dict[str, Any]]) -> list[Event]:
+        """Eventize a batch of git commits.
 
-    def eventize_item(self, raw_item: dict[str, Any]) -> list[CloudEvent]:
+        Events of all the commits are appended to a single list,
+        in the same order `eventize` would generate them, instead
+        of creating intermediate lists for each commit.
+
+        :param raw_items: git commits to eventize
+
+        :returns: list of events
+        """
         events = []
+        append = events.append
+        extend = events.extend
+
+        eventize_commit = self._eventize_commit
+        eventize_commit_children = self._eventize_commit_children
+
+        for raw_item in raw_items:
+            event = eventize_commit(raw_item)
+            append(event)
+            extend(eventize_commit_children(event, raw_item))
+
+        return self._filter_types(events)
+
+    def _eventize_large_commit(self, event: Event, raw_item: dict[str, Any]) -> Generator[Event]:
+        """Generate the events of a git commit item one by one."""
+
+        yield event
+        yield from self._eventize_commit_children(event, raw_item)
+
+    def _eventize_commit_children(self, event: Event, raw_item: dict[str, Any]) -> Generator[Event]:
+        """Generate the file action and identity events of a git commit item.
+
+        File action events, when they are selected, are generated
+        before the identity events. All of them are linked to the
+        commit event.
+        """
+        source, time, event_uuid = event.source, event.time, event.id
+
+        if self._actions_selected:
+            process_action = self._process_action
+            for action, file_data in self._commit_actions(event, raw_item['data']['files']):
+                yield process_action(source, time, event_uuid, action, file_data)
+
+        process_identity = self._process_identity
+        for event_type, identity, identity_id in self._commit_identities(raw_item):
+            yield process_identity(source, time, event_uuid, event_type, identity, identity_id)
+
+    def _eventize_commit(self, raw_item: dict[str, Any]) -> Event:
+        """Check a git commit item and create its commit event."""
 
         item_uuid = raw_item.get('uuid', None)
 
@@ -90,199 +292,206 @@ class GitEventizer(Eventizer):
         else:
             event_type = GIT_EVENT_COMMIT
 
-        attributes = {
-            "id": item_uuid,
-            "type": event_type,
-            "source": raw_item['origin'],
-            "time": raw_item['updated_on'],
-        }
-
-        event = CloudEvent(attributes, raw_item['data'])
-        events.append(event)
+        data = raw_item['data']
 
-        action_events = self._eventize_commit_actions(event,
-                                                      raw_item['data']['files'])
-
-        events.extend(action_events)
+        if self.payload == GIT_PAYLOAD_SLIM:
+            data = {
+                field: value for field, value in data.items()
+                if field not in GIT_PAYLOAD_SLIM_EXCLUDED_FIELDS
+            }
+        elif self.payload == GIT_PAYLOAD_MINIMAL:
+            data = {
+                field: data[field] for field in GIT_PAYLOAD_MINIMAL_FIELDS
+                if field in data
+            }
 
-        identities_events = self._eventize_commit_identities(event,
-                                                             raw_item)
+        return Event(id=item_uuid,
+                     type=event_type,
+                     source=raw_item['origin'],
+                     time=raw_item['updated_on'],
+                     data=data)
 
-        events.extend(identities_events)
+    @staticmethod
+    def _commit_actions(parent_event: Event, raw_files_data) -> Generator[tuple[str, dict[str, Any]]]:
+        """Generate the pairs of action and file data that generate events.
 
-        return events
+        Merge commits can have several actions for a file, one
+        for each parent; consecutive duplicated actions are only
+        returned once.
+        """
+        if parent_event.type == GIT_EVENT_COMMIT:
+            for file_data in raw_files_data:
+                actions = file_data.get('action', None)
+                if not actions:
+                    raise ValueError(f"No action for commit event {parent_event.id}")
 
-    def _eventize_commit_actions(self, parent_event: CloudEvent, raw_files_data):
+                yield actions, file_data
+            return
 
-        events = []
+        merge_actions = _MERGE_ACTIONS
 
         for file_data in raw_files_data:
             actions = file_data.get('action', None)
-
-            if not actions and parent_event['type'] == GIT_EVENT_COMMIT:
-                raise ValueError(f"No action for commit event {parent_event['id']}")
-            elif not actions:
+            if not actions:
                 continue
 
-            if parent_event['type'] == GIT_EVENT_COMMIT:
-                action_event = self._process_action(parent_event['source'],
-                                                    parent_event['time'],
-                                                    parent_event['id'], actions, file_data)
-                events.append(action_event)
-            else:
-                prev_merge_action = None
-                for action in actions:
-                    if action == prev_merge_action:
-                        continue
-
-                    action_event = self._process_action(parent_event['source'],
-                                                        parent_event['time'],
-                                                        parent_event['id'], action, file_data)
-                    events.append(action_event)
-                    prev_merge_action = action
-        return events
+            try:
+                unique_actions = merge_actions[actions]
+            except KeyError:
+                unique_actions = _unique_merge_actions(actions)
+
+            for action in unique_actions:
+                yield action, file_data
 
     def _process_action(self, source, time, event_uuid, action, file_data):
-        if action == 'A':
-            event_type = GIT_EVENT_ACTION_ADDED
-        elif action == 'M':
-            event_type = GIT_EVENT_ACTION_MODIFIED
-        elif action == 'D':
-            event_type = GIT_EVENT_ACTION_DELETED
-        elif action.startswith('R'):
-            event_type = GIT_EVENT_ACTION_REPLACED
-        elif action.startswith('C'):
-            event_type = GIT_EVENT_ACTION_COPIED
-        elif action.startswith('T'):
-            event_type = GIT_EVENT_ACTION_TYPE_CHANGED
-        else:
-            raise ValueError(f"No valid action: {action}")
+        try:
+            event_type, similarity = _ACTION_CODES[action]
+        except KeyError:
+            event_type, similarity = _action_code(action)
 
-        id_args = [event_uuid, file_data['file'], action]
-        if 'newfile' in file_data:
-            id_args.append(file_data['newfile'])
+        filename = file_data['file']
 
-        event_id = uuid(*id_args)
+        if 'newfile' in file_data:
+            new_filename = file_data['newfile']
+            event_id = uuid(event_uuid, filename, action, new_filename)
+        else:
+            new_filename = None
+            event_id = uuid(event_uuid, filename, action)
 
         data = {
-            "filename": file_data['file'],
+            "filename": filename,
             "modes": file_data['modes'],
             "indexes": file_data['indexes'],
-            "similarity": action[1:] if action in ('R', 'C') else None,
-            "new_filename": file_data.get('newfile', None),
+            "similarity": similarity,
+            "new_filename": new_filename,
             "added_lines": file_data.get('added', None),
             "deleted_lines": file_data.get('removed', None)
         }
 
-        attributes = {
-            "id": event_id,
-            "linked_event": event_uuid,
-            "type": event_type,
-            "source": source,
-            "time": time,
-        }
+        return Event(event_id, event_type, source, time, data, event_uuid)
 
-        event = CloudEvent(attributes, data)
+    def _commit_identities(self, raw_item: dict[str, Any]) -> list[tuple[str, Identity, str]]:
+        """Get the identities of a git commit item.
 
-        return event
+        Authors, committers and the identities found in the trailers
+        are returned, in this order, as tuples of event type, identity
+        and identity UUID. Identities whose UUID can't be generated
+        are skipped, like those whose event type is not selected.
+        """
+        identities = []
 
-    def _eventize_commit_identities(self, parent_event: CloudEvent, raw_item: dict[str, Any]) -> list[CloudEvent]:
-        """Eventize commit identities from a git commit item."""
+        if self._authors_selected:
+            authors = self._parse_authors_cached(raw_item["data"]["Author"])
+            identities.extend(self._process_identities(GIT_EVENT_COMMIT_AUTHORED_BY,
+                                                       authors))
 
-        events = []
+        if self._committers_selected:
+            committers = self._parse_authors_cached(raw_item["data"]["Commit"])
+            identities.extend(self._process_identities(GIT_EVENT_COMMIT_COMMITTED_BY,
+                                                       committers))
 
-        authors = self._parse_authors(raw_item["data"]["Author"])
-        identity_events = self._process_identities(parent_event['source'],
-                                                   parent_event['time'],
-                                                   parent_event['id'],
-                                                   GIT_EVENT_COMMIT_AUTHORED_BY,
-                                                   authors)
-        events.extend(identity_events)
-
-        committers = self._parse_authors(raw_item["data"]["Commit"])
-        identity_events = self._process_identities(parent_event['source'],
-                                                   parent_event['time'],
-                                                   parent_event['id'],
-                                                   GIT_EVENT_COMMIT_COMMITTED_BY,
-                                                   committers)
-        events.extend(identity_events)
-
-        for trailer, event_type in COMMIT_TRAILERS.items():
+        for trailer, event_type in self._trailers_selected.items():
             signers = raw_item["data"].get(trailer, [])
-            identity_events = self._process_identities(parent_event['source'],
-                                                       parent_event['time'],
-                                                       parent_event['id'],
-                                                       event_type,
-                                                       signers)
-            events.extend(identity_events)
+            identities.extend(self._process_identities(event_type,
+                                                       signers))
 
-        return events
+        return identities
 
     def _process_identities(
+        self,
+        event_type: str,
+        raw_identities: list[str]
+    ) -> Generator[tuple[str, Identity, str], None, None]:
+        """Resolve a list of identities.
+
+        :param event_type: type of the identity event
+        :param raw_identities: list of strings with the identities information
+
+        :returns: generator of tuples with the event type, the identity
+            and its UUID
+        """
+        for raw_identity in raw_identities:
+            identity, identity_id = self._resolve_identity_cached(raw_identity)
+
+            if not identity_id:
+                continue
+
+            yield event_type, identity, identity_id
+
+    def _process_identity(
         self,
         source: str,
         time: str,
         event_uuid: str,
         event_type: str,
-        raw_identities: list[str]
-    ) -> Generator[CloudEvent, None, None]:
-        """Obtain identity events from a list of identities.
+        identity: Identity,
+        identity_id: str
+    ) -> Event:
+        """Create an identity event.
 
         :param source: data source of the event
         :param time: time of the event
         :param event_uuid: UUID of the parent event
         :param event_type: type of the identity event
-        :param raw_identities: list of strings with the identities information
+        :param identity: identity information
+        :param identity_id: UUID of the identity
 
-        :returns: generator of CloudEvent with the identity information
+        :returns: event with the identity information
         """
-        for raw_identity in raw_identities:
-            try:
-                identity = self._parse_identity(raw_identity)
-                identity_id = generate_uuid(source="git",
-                                            email=identity.email,
-                                            name=identity.name,
-                                            username=identity.username)
-            except ValueError as e:
-                logger.warning(f"Cannot generate UUID for identity '{raw_identity}' "
-                               f"in event '{event_uuid}': {e}. Skipping.")
-                continue
+        role = event_type.split('.')[-1]
+        event_id = uuid(event_uuid, role, identity_id)
 
-            role = event_type.split('.')[-1]
-            event_id = uuid(event_uuid, role, identity_id)
+        data = {
+            "source": "git",
+            "name": identity.name,
+            "username": identity.username,
+            "email": identity.email,
+            "role": role,
+            "uuid": identity_id,
+        }
 
-            data = {
-                "source": "git",
-                "name": identity.name,
-                "username": identity.username,
-                "email": identity.email,
-                "role": role,
-                "uuid": identity_id,
-            }
+        return Event(id=event_id,
+                     type=event_type,
+                     source=source,
+                     time=time,
+                     data=data,
+                     linked_event=event_uuid)
 
-            attributes = {
-                "id": event_id,
-                "linked_event": event_uuid,
-                "type": event_type,
-                "source": source,
-                "time": time,
-            }
+    def _resolve_identity(self, raw_identity: str) -> tuple[Identity | None, str | None]:
+        """Parse an identity and generate its UUID.
 
-            yield CloudEvent(attributes, data)
+        When the UUID can't be generated, a warning is logged
+        and `(None, None)` is returned.
+        """
+        try:
+            identity = self._parse_identity(raw_identity)
+            identity_id = generate_uuid(source="git",
+                                        email=identity.email,
+                                        name=identity.name,
+                                        username=identity.username)
+        except ValueError as e:
+            logger.warning(f"Cannot generate UUID for identity '{raw_identity}': {e}. Skipping.")
+            return None, None
+
+        return identity, identity_id
 
     @staticmethod
-    def _parse_authors(authors: str) -> list[str]:
+    def _parse_authors(authors: str) -> tuple[str, ...]:
         """Parse a list of authors from a string."""
 
+        if ('<' not in authors or '>' not in authors or
+                not GIT_AUTHORS_SEPARATOR_REGEX.search(authors)):
+            return (authors,)
+
         m = GIT_AUTHORS_REGEX.match(authors)
         if m:
             authors = m.group("first_authors").split(",")
             authors = [author.strip() for author in authors]
             authors += [m.group("last_author")]
             authors += [f"<{m.group('email')}>"]
-            return authors
+            return tuple(authors)
         else:
-            return [authors]
+            return (authors,)
 
     @staticmethod
     def _parse_identity(git_author: str) -> Identity:
@@ -298,3 +507,37 @@ class GitEventizer(Eventizer):
             email = git_author.split("<")[1][:-1]
 
         return Identity(email=email, name=name)
+
+
+def _action_code(action: str) -> tuple[str, str | None]:
+    """Return the event type and the similarity of an action code.
+
+    :raises ValueError: when the action code is not valid
+    """
+    try:
+        return _ACTION_CODES[action]
+    except KeyError:
+        pass
+
+    event_type = _ACTION_PREFIXES.get(action[:1], None)
+    if event_type is None:
+        raise ValueError(f"No valid action: {action}")
+
+    code = (event_type, None)
+
+    # Only codes with a score are kept, so the table stays small
+    if action[1:].isdigit():
+        _ACTION_CODES[action] = code
+
+    return code
+
+
+def _unique_merge_actions(actions: str) -> tuple[str, ...]:
+    """Return the actions of a file of a merge commit, without consecutive duplicates."""
+
+    unique_actions = tuple(action for action, _ in itertools.groupby(actions))
+
+    if len(_MERGE_ACTIONS) < _MERGE_ACTIONS_CACHE_SIZE:
+        _MERGE_ACTIONS[actions] = unique_actions
+
+    return unique_actions
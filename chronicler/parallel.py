@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import collections
+import concurrent.futures
+import itertools
+import multiprocessing
+import os
+
+from collections.abc import Callable, Iterable, Generator
+from typing import Any
+
+from .eventizer import _get_top_package_name, get_eventizer
+
+
+# State of the worker processes; set by `_init_worker`
+_worker_eventizer = None
+_worker_decode = None
+_worker_encode = None
+_worker_shard = None
+_worker_terminator = None
+
+
+def eventize_parallel(
+    name: str,
+    lines: Iterable[str | bytes],
+    decode: Callable[[str | bytes], dict[str, Any]],
+    encode: Callable[[Any], str | bytes],
+    workers: int | None = None,
+    chunk_size: int = 1000,
+    ordered: bool = True,
+    options: dict[str, Any] | None = None,
+    shard: Callable[[Any], int] | None = None,
+    terminator: str | bytes = '\n'
+) -> Generator[str | bytes | dict[int, str | bytes]]:
+    """Eventize serialized items using a pool of processes.
+
+    Input lines are split in chunks of `chunk_size` items that are
+    sent to the worker processes. Each worker decodes the items of
+    the chunk with `decode`, eventizes them and serializes the events
+    with `encode`. Both functions must be picklable (e.g. functions
+    defined at module level).
+
+    The result of each chunk is a string with one serialized event
+    per line. Events can also be serialized to bytes (e.g. binary
+    records); `terminator`, which is added after each event, must
+    then be bytes too, and so will be the result. By default, chunks
+    are returned in the same order they were read. When `ordered` is
+    `False`, chunks are returned as soon as they are ready, so the
+    order of the events is not kept.
+
+    When `shard` is given, the events of each chunk are grouped by
+    the shard that function assigns to them; the result of each chunk
+    is then a dict with the serialized events of each shard. It must
+    be picklable too.
+
+    The number of chunks in flight is bounded, so the input is read
+    as fast as the workers consume it.
+
+    Workers are not forked from the calling process, which might be
+    running other threads (e.g. the flusher of an `EventWriter`);
+    forking it could leave locks held by those threads locked in
+    the workers. They are started by a fork server or spawned, so
+    the eventizers package must be importable by a new process.
+
+    :param name: name of the eventizer
+    :param lines: serialized perceval items, one per line
+    :param decode: function to convert a line into an item
+    :param encode: function to convert an event into a string or bytes
+    :param workers: number of processes; defaults to the number of CPUs
+    :param chunk_size: number of items sent to a worker at once
+    :param ordered: keep the order of the input
+    :param options: options passed to the eventizer constructor
+    :param shard: function to assign an event to a shard
+    :param terminator: string or bytes added after each event
+
+    :returns: a generator of strings or bytes with the serialized events, or
+        of dicts of shard and serialized events when `shard` is given
+    """
+    if chunk_size < 1:
+        raise ValueError("'chunk_size' must be greater than 0")
+
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 2
+    options = options or {}
+
+    # Check the eventizer exists before starting the processes
+    get_eventizer(name, **options)
+
+    lines = iter(lines)
+    chunks = iter(lambda: list(itertools.islice(lines, chunk_size)), [])
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers,
+                                                mp_context=_get_mp_context(),
+                                                initializer=_init_worker,
+                                                initargs=(_get_top_package_name(), name, options,
+                                                          decode, encode, shard, terminator)) as executor:
+        if ordered:
+            yield from _run_ordered(executor, chunks, max_pending)
+        else:
+            yield from _run_unordered(executor, chunks, max_pending)
+
+
+def _run_ordered(executor, chunks, max_pending):
+    pending = collections.deque()
+
+    for chunk in chunks:
+        pending.append(executor.submit(_eventize_chunk, chunk))
+
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+
+    while pending:
+        yield pending.popleft().result()
+
+
+def _run_unordered(executor, chunks, max_pending):
+    pending = set()
+
+    for chunk in chunks:
+        pending.add(executor.submit(_eventize_chunk, chunk))
+
+        if len(pending) >= max_pending:
+            done, pending = concurrent.futures.wait(pending,
+                                                    return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+    for future in concurrent.futures.as_completed(pending):
+        yield future.result()
+
+
+def _get_mp_context():
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        # Workers are forked from a server that already imported this
+        # module, instead of importing the package on their own
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+def _init_worker(top_package_name, name, options, decode, encode, shard, terminator):
+    global _worker_eventizer, _worker_decode, _worker_encode, _worker_shard, _worker_terminator
+
+    # The fork server keeps the environment it was started with
+    os.environ['CHRONICLER_EVENTIZERS'] = top_package_name
+
+    _worker_eventizer = get_eventizer(name, **options)
+    _worker_decode = decode
+    _worker_encode = encode
+    _worker_shard = shard
+    _worker_terminator = terminator
+
+
+def _eventize_chunk(lines):
+    items = map(_worker_decode, lines)
+    events = _worker_eventizer.eventize_batch(items)
+    terminator = _worker_terminator
+    empty = terminator[:0]
+
+    if _worker_shard is None:
+        return empty.join([_worker_encode(event) + terminator for event in events])
+
+    shards = collections.defaultdict(list)
+    for event in events:
+        shards[_worker_shard(event)].append(_worker_encode(event) + terminator)
+
+    return {shard: empty.join(data) for shard, data in shards.items()}
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+import io
+import mmap
+import os
+import stat
+
+from collections.abc import Generator
+from typing import BinaryIO
+
+
+DEFAULT_READ_SIZE = 1024 * 1024
+
+
+def read_lines(
+    fd: BinaryIO,
+    start: int = 0,
+    end: int | None = None,
+    read_size: int = DEFAULT_READ_SIZE
+) -> Generator[bytes]:
+    """Read the lines of a binary file as bytes.
+
+    Lines are returned without the line break and without
+    being decoded, so they can be passed directly to a JSON
+    decoder. Empty lines are skipped.
+
+    Regular files are memory-mapped and split in place. Any
+    other kind of file (e.g. the standard input or a pipe) is
+    read in blocks of `read_size` bytes.
+
+    For regular files, only the lines that start in the byte
+    range [`start`, `end`) are returned, so the ranges returned
+    by `split_offsets` can be read independently. `start` must
+    be the offset of the beginning of a line.
+
+    :param fd: binary file to read
+    :param start: offset of the first byte to read
+    :param end: offset where the last line starts before; by
+        default, the end of the file
+    :param read_size: number of bytes read at once from
+        streams that are not regular files
+
+    :returns: a generator of lines
+    """
+    if read_size < 1:
+        raise ValueError("'read_size' must be greater than 0")
+
+    size = _regular_file_size(fd)
+
+    if size is None:
+        if start or end is not None:
+            raise ValueError("byte ranges can only be read from regular files")
+        yield from _read_stream(fd, read_size)
+    elif size > 0:
+        yield from _read_mmap(fd, start, size if end is None else min(end, size))
+
+
+def split_offsets(fd: BinaryIO, parts: int) -> list[tuple[int, int]]:
+    """Split a regular file in byte ranges of complete lines.
+
+    The file is divided in `parts` ranges of similar size whose
+    limits are moved forward to the next line break, so every
+    range starts at the beginning of a line. Ranges can be read
+    with `read_lines`. Fewer ranges are returned when the file
+    doesn't have enough lines.
+
+    :param fd: binary regular file
+    :param parts: number of ranges
+
+    :returns: list of (start, end) tuples
+
+    :raises ValueError: when the file is not a regular file
+        or `parts` is not a positive number
+    """
+    if parts < 1:
+        raise ValueError("'parts' must be greater than 0")
+
+    size = _regular_file_size(fd)
+    if size is None:
+        raise ValueError("only regular files can be split")
+    if size == 0:
+        return []
+
+    with mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        offsets = [0]
+        for i in range(1, parts):
+            pos = max(size * i // parts, offsets[-1])
+            pos = mm.find(b'\n', pos)
+            if pos < 0:
+                break
+            if pos + 1 < size and pos + 1 > offsets[-1]:
+                offsets.append(pos + 1)
+
+    offsets.append(size)
+
+    return list(zip(offsets[:-1], offsets[1:]))
+
+
+def _regular_file_size(fd):
+    """Return the size of the file or `None` when it's not a regular file"""
+
+    try:
+        st = os.fstat(fd.fileno())
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+
+    if not stat.S_ISREG(st.st_mode):
+        return None
+
+    return st.st_size
+
+
+def _read_mmap(fd, start, end):
+    with mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+
+        find = mm.find
+        size = len(mm)
+        pos = start
+
+        while pos < end:
+            eol = find(b'\n', pos)
+            if eol < 0:
+                eol = size
+            if eol > pos:
+                yield mm[pos:eol]
+            pos = eol + 1
+
+
+def _read_stream(fd, read_size):
+    # `read1` returns the data available without waiting for the
+    # whole block, so lines coming from a pipe are not delayed
+    read = getattr(fd, 'read1', fd.read)
+
+    # Pieces of the line that is not complete yet
+    pending = []
+
+    while True:
+        block = read(read_size)
+        if not block:
+            break
+
+        lines = block.split(b'\n')
+        if len(lines) == 1:
+            pending.append(block)
+            continue
+
+        if pending:
+            pending.append(lines[0])
+            lines[0] = b''.join(pending)
+
+        last = lines.pop()
+        pending = [last] if last else []
+
+        for line in lines:
+            if line:
+                yield line
+
+    line = b''.join(pending)
+    if line:
+        yield line
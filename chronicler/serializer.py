@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+from typing import TYPE_CHECKING
+
+from .codec import JSONCodec
+from .eventizer import Event
+
+if TYPE_CHECKING:
+    from cloudevents.abstract import CloudEvent
+
+
+_default_codec = JSONCodec()
+
+
+def to_json(event: 'Event | CloudEvent', json_line: bool = False, codec: JSONCodec | None = None) -> str:
+    """Serialize an event to JSON in CloudEvents structured mode.
+
+    The document is written straight from the attributes and the
+    data of the event, skipping `cloudevents.conversion.to_dict`.
+    Keys are sorted, so the output is the same as encoding the
+    result of `to_dict`. The data of the event must be serializable
+    to JSON.
+
+    :param event: event to serialize
+    :param json_line: write the document in a single line; otherwise,
+        it is indented with 4 spaces
+    :param codec: JSON codec used to encode the event; by default,
+        the standard library is used
+
+    :returns: a string with the JSON document
+    """
+    codec = codec or _default_codec
+
+    if isinstance(event, Event):
+        document = event.to_dict()
+    else:
+        # `_get_attributes` is part of the CloudEvent contract. Unlike
+        # `get_attributes`, it doesn't wrap the attributes in a read-only
+        # proxy, which is expensive to copy.
+        document = dict(event._get_attributes())
+        document['data'] = event.get_data()
+
+    return codec.dumps(document, json_line=json_line)
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import glob
+import io
+import os
+import threading
+import zlib
+
+from typing import Any
+
+from .compression import COMPRESSION_EXTENSIONS, open_output
+from .writer import DEFAULT_BUFFER_SIZE, DEFAULT_FLUSH_INTERVAL, EventWriter
+
+
+SHARD_KEYS = ['source', 'type', 'id-hash']
+
+DEFAULT_SHARD_PREFIX = 'events'
+
+_SHARD_ATTRIBUTES = {
+    'source': 'source',
+    'type': 'type',
+    'id-hash': 'id',
+}
+
+
+class ShardAssigner:
+    """Assign events to shards.
+
+    The shard of an event is the CRC-32 of one of its attributes,
+    modulo the number of shards: its `source`, its `type` or its
+    `id` (`id-hash`). The result doesn't depend on the process
+    or the run, so events with the same key always go to the
+    same shard. Objects of this class can be pickled and sent
+    to worker processes.
+
+    :param shard_by: attribute used to assign the shard; one of
+        'source', 'type' or 'id-hash'
+    :param shards: number of shards
+    """
+    def __init__(self, shard_by: str = 'id-hash', shards: int = 1):
+        if shard_by not in _SHARD_ATTRIBUTES:
+            raise ValueError(f"Invalid shard key '{shard_by}'; "
+                             f"valid keys are: {', '.join(SHARD_KEYS)}")
+        if shards < 1:
+            raise ValueError("'shards' must be greater than 0")
+
+        self.shard_by = shard_by
+        self.shards = shards
+        self._attribute = _SHARD_ATTRIBUTES[shard_by]
+        # Sources and types are few; their shards are cached
+        self._cache = {} if shard_by != 'id-hash' else None
+
+    def __call__(self, event: Any) -> int:
+        """Return the shard of an event."""
+
+        try:
+            key = getattr(event, self._attribute)
+        except AttributeError:
+            # `CloudEvent` attributes are only available as keys
+            key = event[self._attribute]
+
+        if self._cache is None:
+            return zlib.crc32(key.encode('utf-8')) % self.shards
+
+        try:
+            return self._cache[key]
+        except KeyError:
+            shard = self._cache[key] = zlib.crc32(key.encode('utf-8')) % self.shards
+            return shard
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if state['_cache'] is not None:
+            state['_cache'] = {}
+        return state
+
+
+class ShardedWriter:
+    """Write serialized events to several files, one or more per shard.
+
+    Each shard is written to its own buffered `EventWriter`. Files
+    are named `<prefix>-<shard>-<part><extension>` and created in
+    `directory` when the first event of the shard is written. When
+    `max_size` is set, a shard starts a new part once its current
+    file has received that number of bytes, before compressing
+    them. Files of previous parts are complete once a new part
+    is created.
+
+    A single background thread writes the pending data of all the
+    shards every `flush_interval` seconds. Its errors are raised
+    in the next call to `write`, `writeline`, `flush` or `close`.
+
+    :param directory: directory where files are created
+    :param shards: number of shards
+    :param extension: extension of the files, without the compression
+    :param compression: compression format of the files or `None`
+    :param level: compression level
+    :param buffer_size: number of bytes kept for each shard before
+        writing them
+    :param flush_interval: maximum number of seconds data is kept
+        in the buffers; 0 disables the background thread
+    :param max_size: number of bytes of a file before starting
+        a new part; 0 disables it
+    :param prefix: prefix of the names of the files
+
+    :raises ValueError: when the directory already has files with
+        the same prefix, or any of the parameters is not valid
+    """
+    def __init__(
+        self,
+        directory: str,
+        shards: int = 1,
+        extension: str = '.json',
+        compression: str | None = None,
+        level: int | None = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_size: int = 0,
+        prefix: str = DEFAULT_SHARD_PREFIX
+    ):
+        if shards < 1:
+            raise ValueError("'shards' must be greater than 0")
+        if max_size < 0:
+            raise ValueError("'max_size' must be greater than or equal to 0")
+        if flush_interval < 0:
+            raise ValueError("'flush_interval' must be greater than or equal to 0")
+
+        # Check the compression before creating any file
+        open_output(io.BytesIO(), compression=compression, level=level).close()
+
+        os.makedirs(directory, exist_ok=True)
+        if glob.glob(os.path.join(glob.escape(directory), f"{glob.escape(prefix)}-*")):
+            raise ValueError(f"'{directory}' already has files starting with '{prefix}-'")
+
+        if compression:
+            extension += next(ext for ext, name in COMPRESSION_EXTENSIONS.items()
+                              if name == compression)
+
+        self.directory = directory
+        self.shards = shards
+        self.extension = extension
+        self.compression = compression
+        self.level = level
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+        self.prefix = prefix
+        self.paths = []
+
+        self._writers = [None] * shards
+        self._parts = [0] * shards
+        self._files = {}
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._error = None
+        self._flusher = None
+
+        if buffer_size and flush_interval:
+            self._flusher = threading.Thread(target=self._run_flusher,
+                                             name='chronicler-shards-flusher',
+                                             daemon=True)
+            self._flusher.start()
+
+    def write(self, shard: int, data: str | bytes) -> None:
+        """Write a string or bytes to a shard.
+
+        :param shard: number of the shard
+        :param data: string or bytes to write
+        """
+        self._check_error()
+
+        writer = self._writers[shard] or self._open_part(shard)
+        writer.write(data)
+
+        if self.max_size and writer.size >= self.max_size:
+            self._close_part(shard)
+
+    def writeline(self, shard: int, data: str) -> None:
+        """Write a string followed by a new line to a shard.
+
+        :param shard: number of the shard
+        :param data: string to write, without the new line
+        """
+        self._check_error()
+
+        writer = self._writers[shard] or self._open_part(shard)
+        writer.writeline(data)
+
+        if self.max_size and writer.size >= self.max_size:
+            self._close_part(shard)
+
+    def flush(self) -> None:
+        """Write the pending data of all the shards to their files."""
+
+        self._check_error()
+        with self._lock:
+            for writer in self._writers:
+                if writer:
+                    writer.flush()
+
+    def close(self) -> None:
+        """Write the pending data and close all the files."""
+
+        self._closed.set()
+        if self._flusher:
+            self._flusher.join()
+
+        for shard in range(self.shards):
+            if self._writers[shard]:
+                self._close_part(shard)
+
+        self._check_error()
+
+    def __enter__(self) -> 'ShardedWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _open_part(self, shard: int) -> EventWriter:
+        name = f"{self.prefix}-{shard:05d}-{self._parts[shard]:05d}{self.extension}"
+        path = os.path.join(self.directory, name)
+
+        fd = open(path, 'wb')
+        stream = open_output(fd, compression=self.compression, level=self.level)
+        writer = EventWriter(stream, buffer_size=self.buffer_size, flush_interval=0)
+
+        with self._lock:
+            self._files[shard] = (fd, stream)
+            self._writers[shard] = writer
+        self.paths.append(path)
+
+        return writer
+
+    def _close_part(self, shard: int) -> None:
+        with self._lock:
+            writer = self._writers[shard]
+            fd, stream = self._files.pop(shard)
+            self._writers[shard] = None
+            self._parts[shard] += 1
+
+            try:
+                writer.close()
+                if stream is not fd:
+                    stream.close()
+            finally:
+                fd.close()
+
+    def _check_error(self) -> None:
+        if self._error:
+            error, self._error = self._error, None
+            raise error
+
+    def _run_flusher(self) -> None:
+        while not self._closed.wait(self.flush_interval):
+            with self._lock:
+                if self._error:
+                    continue
+                try:
+                    for writer in self._writers:
+                        if writer:
+                            writer.flush()
+                except Exception as e:
+                    self._error = e
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import heapq
+import threading
+import time
+
+from collections import Counter
+from collections.abc import Generator, Iterable, Mapping, Sequence
+from typing import Any, Callable
+
+
+DEFAULT_SLOWEST_ITEMS = 10
+
+
+class EventizerStats:
+    """Collect performance statistics of an eventization run.
+
+    The time spent on each stage of the run (e.g. reading the
+    items, eventizing or writing the events) is accumulated by
+    stage name. Eventizers add the items they process, with the
+    events generated and the time it took, when they receive an
+    instance of this class (see `Eventizer.eventize`).
+
+    Only the `slowest` items are kept, identified by their `uuid`.
+
+    Statistics can be read from another thread (e.g. a
+    `StatsReporter`) while they are collected.
+
+    :param slowest: number of slowest items to keep
+    """
+    def __init__(self, slowest: int = DEFAULT_SLOWEST_ITEMS):
+        if slowest < 0:
+            raise ValueError("'slowest' must be greater than or equal to 0")
+
+        self.slowest = slowest
+        self.items = 0
+        self.events = 0
+        self.events_by_type = Counter()
+        self.stages = {}
+        self.started = time.perf_counter()
+
+        # Min-heap of (seconds, uuid); the root is the fastest
+        # of the slowest items
+        self._slowest_items = []
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        """Add time to a stage.
+
+        :param stage: name of the stage
+        :param seconds: number of seconds to add
+        """
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def add_item(self, uuid: str | None, events: Sequence[Any], seconds: float) -> None:
+        """Add an eventized item.
+
+        Its time is added to the 'eventize' stage.
+
+        :param uuid: identifier of the item
+        :param events: events generated from the item
+        :param seconds: time spent eventizing the item
+        """
+        self.items += 1
+        self.events += len(events)
+        events_by_type = self.events_by_type
+        for event in events:
+            try:
+                events_by_type[event.type] += 1
+            except AttributeError:
+                # `CloudEvent` attributes are only available as keys
+                events_by_type[event['type']] += 1
+        self._add_item_time(uuid, seconds)
+
+    def add_item_counts(self, uuid: str | None, events_by_type: Mapping[str, int], seconds: float) -> None:
+        """Add an eventized item by the number of events of each type.
+
+        Like `add_item`, for items whose events are not kept
+        together (e.g. generated lazily).
+
+        :param uuid: identifier of the item
+        :param events_by_type: number of events generated of each type
+        :param seconds: time spent eventizing the item
+        """
+        self.items += 1
+        self.events += sum(events_by_type.values())
+        self.events_by_type.update(events_by_type)
+        self._add_item_time(uuid, seconds)
+
+    def _add_item_time(self, uuid: str | None, seconds: float) -> None:
+        self.add_time('eventize', seconds)
+
+        if not self.slowest:
+            return
+        if len(self._slowest_items) < self.slowest:
+            heapq.heappush(self._slowest_items, (seconds, uuid))
+        elif seconds > self._slowest_items[0][0]:
+            heapq.heapreplace(self._slowest_items, (seconds, uuid))
+
+    def timed(self, stage: str, iterable: Iterable[Any]) -> Generator[Any]:
+        """Add the time spent getting the elements of an iterable to a stage.
+
+        :param stage: name of the stage
+        :param iterable: elements to time
+
+        :returns: a generator of the same elements
+        """
+        perf_counter = time.perf_counter
+        iterator = iter(iterable)
+
+        while True:
+            start = perf_counter()
+            try:
+                element = next(iterator)
+            except StopIteration:
+                self.add_time(stage, perf_counter() - start)
+                return
+            self.add_time(stage, perf_counter() - start)
+            yield element
+
+    @property
+    def elapsed(self) -> float:
+        """Number of seconds since the statistics were created."""
+
+        return time.perf_counter() - self.started
+
+    def slowest_items(self) -> list[tuple[str | None, float]]:
+        """Return the slowest items, from slowest to fastest.
+
+        :returns: list of tuples with the uuid of the item and the
+            seconds it took to eventize it
+        """
+        return [(uuid, seconds)
+                for seconds, uuid in sorted(list(self._slowest_items), reverse=True)]
+
+    def summary(self) -> dict[str, Any]:
+        """Return the statistics as a dictionary."""
+
+        elapsed = self.elapsed
+
+        # Copies are made first; copying a dict or a list doesn't
+        # let other threads change them in the middle
+        stages = dict(self.stages)
+        events_by_type = dict(self.events_by_type)
+
+        return {
+            'elapsed': elapsed,
+            'items': self.items,
+            'events': self.events,
+            'items_per_second': self.items / elapsed if elapsed else 0.0,
+            'events_per_second': self.events / elapsed if elapsed else 0.0,
+            'stages': stages,
+            'events_by_type': dict(sorted(events_by_type.items(),
+                                          key=lambda kv: (-kv[1], kv[0]))),
+            'slowest_items': self.slowest_items(),
+        }
+
+    def format(self) -> str:
+        """Return a human readable report of the statistics."""
+
+        summary = self.summary()
+        elapsed = summary['elapsed']
+
+        lines = [
+            f"Elapsed: {elapsed:.3f}s",
+            f"Items: {summary['items']} ({summary['items_per_second']:.1f} items/s)",
+            f"Events: {summary['events']} ({summary['events_per_second']:.1f} events/s)",
+        ]
+
+        if summary['stages']:
+            lines.append("Stages:")
+            width = max(len(stage) for stage in summary['stages'])
+            for stage, seconds in summary['stages'].items():
+                share = 100 * seconds / elapsed if elapsed else 0.0
+                lines.append(f"  {stage:<{width}}  {seconds:.3f}s  {share:5.1f}%")
+
+        if summary['events_by_type']:
+            lines.append("Events by type:")
+            for event_type, count in summary['events_by_type'].items():
+                lines.append(f"  {event_type}: {count}")
+
+        if summary['slowest_items']:
+            lines.append("Slowest items:")
+            for uuid, seconds in summary['slowest_items']:
+                lines.append(f"  {uuid}: {seconds * 1000:.3f}ms")
+
+        return '\n'.join(lines)
+
+
+class StatsReporter:
+    """Report statistics periodically from a background thread.
+
+    Every `interval` seconds, the report of the statistics is
+    passed to `report`. When the reporter is closed, a last
+    report is made.
+
+    :param stats: statistics to report
+    :param report: function that receives the formatted statistics
+    :param interval: seconds between reports; when 0, the
+        statistics are only reported on close
+    """
+    def __init__(
+        self,
+        stats: EventizerStats,
+        report: Callable[[str], Any],
+        interval: float = 0
+    ):
+        if interval < 0:
+            raise ValueError("'interval' must be greater than or equal to 0")
+
+        self.stats = stats
+        self.report = report
+        self.interval = interval
+
+        self._closed = threading.Event()
+        self._thread = None
+
+        if interval:
+            self._thread = threading.Thread(target=self._run,
+                                            name='chronicler-stats',
+                                            daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        """Stop the background thread and make the last report."""
+
+        self._closed.set()
+        if self._thread:
+            self._thread.join()
+        self.report(self.stats.format())
+
+    def __enter__(self) -> 'StatsReporter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _run(self):
+        while not self._closed.wait(self.interval):
+            self.report(self.stats.format())
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+import threading
+
+from typing import BinaryIO
+
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+
+class EventWriter:
+    """Write serialized events to a binary file in large blocks.
+
+    Events are encoded in UTF-8, unless they are already bytes, and
+    kept in a buffer that is written to the file, with a single call,
+    when it reaches `buffer_size` bytes. To let consumers see the
+    events in a timely manner, a background thread also writes the
+    pending data every `flush_interval` seconds. When `buffer_size`
+    is 0, data is written as soon as it's received.
+
+    Errors writing the data from the background thread (e.g.
+    a closed pipe) are raised in the next call to `write`,
+    `writeline`, `flush` or `close`.
+
+    The number of bytes received, written or not, is available
+    in `size`.
+
+    :param fd: binary file where data will be written
+    :param buffer_size: number of bytes kept before writing them
+    :param flush_interval: maximum number of seconds data is kept
+        in the buffer; 0 disables the background thread
+    """
+    def __init__(
+        self,
+        fd: BinaryIO,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL
+    ):
+        if buffer_size < 0:
+            raise ValueError("'buffer_size' must be greater than or equal to 0")
+        if flush_interval < 0:
+            raise ValueError("'flush_interval' must be greater than or equal to 0")
+
+        self.fd = fd
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+
+        self._buffer = bytearray()
+        self._written = 0
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._error = None
+        self._flusher = None
+
+        if buffer_size and flush_interval:
+            self._flusher = threading.Thread(target=self._run_flusher,
+                                             name='chronicler-flusher',
+                                             daemon=True)
+            self._flusher.start()
+
+    def write(self, data: str | bytes) -> None:
+        """Write a string or bytes.
+
+        :param data: string or bytes to write
+        """
+        with self._lock:
+            self._check_error()
+            self._buffer += data if isinstance(data, bytes) else data.encode('utf-8')
+            if len(self._buffer) >= self.buffer_size:
+                self._write_buffer()
+
+    def writeline(self, data: str) -> None:
+        """Write a string followed by a new line.
+
+        :param data: string to write, without the new line
+        """
+        with self._lock:
+            self._check_error()
+            self._buffer += data.encode('utf-8')
+            self._buffer += b'\n'
+            if len(self._buffer) >= self.buffer_size:
+                self._write_buffer()
+
+    @property
+    def size(self) -> int:
+        """Number of bytes received by the writer."""
+
+        return self._written + len(self._buffer)
+
+    def flush(self) -> None:
+        """Write the pending data to the file."""
+
+        with self._lock:
+            self._check_error()
+            self._write_buffer()
+
+    def close(self) -> None:
+        """Write the pending data and stop the background thread.
+
+        The file is not closed.
+        """
+        self._closed.set()
+        if self._flusher:
+            self._flusher.join()
+        self.flush()
+
+    def __enter__(self) -> 'EventWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _write_buffer(self):
+        if self._buffer:
+            self.fd.write(self._buffer)
+            self._written += len(self._buffer)
+            self._buffer.clear()
+        self.fd.flush()
+
+    def _check_error(self):
+        if self._error:
+            error, self._error = self._error, None
+            raise error
+
+    def _run_flusher(self):
+        while not self._closed.wait(self.flush_interval):
+            with self._lock:
+                if not self._buffer or self._error:
+                    continue
+                try:
+                    self._write_buffer()
+                except Exception as e:
+                    self._error = e
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import asyncio
+import concurrent.futures
+import json
+import unittest
+
+from cloudevents.http import CloudEvent
+
+from chronicler.aio import aeventize
+from chronicler.eventizer import Event, eventize
+
+
+async def iterate(items, delay=0):
+    """Asynchronous iterator over a list of items"""
+
+    for item in items:
+        if delay:
+            await asyncio.sleep(delay)
+        yield item
+
+
+async def collect(async_events):
+    return [event async for event in async_events]
+
+
+class TestAEventize(unittest.IsolatedAsyncioTestCase):
+    """Unit tests for aeventize function"""
+
+    def setUp(self):
+        with open('data/git_commits.txt', 'r') as fd:
+            self.items = [json.loads(line) for line in fd]
+
+        self.expected = list(eventize('git', self.items, compact=True))
+
+    async def test_aeventize(self):
+        """Check if events are generated in the order of the items"""
+
+        for chunk_size in (1, 3, 100):
+            events = await collect(aeventize('git', iterate(self.items),
+                                             compact=True, chunk_size=chunk_size))
+            self.assertListEqual(events, self.expected)
+
+    async def test_cloudevents(self):
+        """Check if events are converted into CloudEvent objects by default"""
+
+        events = await collect(aeventize('git', iterate(self.items)))
+
+        self.assertEqual(len(events), len(self.expected))
+        for event, expected in zip(events, self.expected):
+            self.assertIsInstance(event, CloudEvent)
+            self.assertEqual(event['id'], expected.id)
+
+    async def test_concurrency(self):
+        """Check if the order is kept when several chunks are eventized at once"""
+
+        events = await collect(aeventize('git', iterate(self.items, delay=0.001), compact=True,
+                                         concurrency=4, chunk_size=2, max_pending=2))
+        self.assertListEqual(events, self.expected)
+
+    async def test_executor(self):
+        """Check if chunks are eventized in the given executor"""
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            events = await collect(aeventize('git', iterate(self.items), compact=True,
+                                             chunk_size=4, executor=executor))
+            self.assertListEqual(events, self.expected)
+
+            # The executor is not shut down
+            self.assertEqual(executor.submit(sum, [1, 2]).result(), 3)
+
+    async def test_types(self):
+        """Check if events are filtered by a list of types"""
+
+        events = await collect(aeventize('git', iterate(self.items), compact=True,
+                                         types=['*.commit', '*.merge']))
+        expected = [event for event in self.expected if event.type.endswith(('.commit', '.merge'))]
+
+        self.assertGreater(len(expected), 0)
+        self.assertListEqual(events, expected)
+
+    async def test_backpressure(self):
+        """Check if items are not read while chunks are not consumed"""
+
+        read = 0
+
+        async def counter():
+            nonlocal read
+            for item in self.items:
+                read += 1
+                yield item
+
+        async_events = aeventize('git', counter(), compact=True,
+                                 chunk_size=1, max_pending=2)
+        event = await anext(async_events)
+        self.assertIsInstance(event, Event)
+
+        # Let the producer run until the queue is full
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        # One chunk being consumed, two in the queue and
+        # one waiting to be queued
+        self.assertEqual(read, 4)
+
+        await async_events.aclose()
+
+    async def test_empty(self):
+        """Check if no events are generated when there are no items"""
+
+        events = await collect(aeventize('git', iterate([])))
+        self.assertListEqual(events, [])
+
+    async def test_input_error(self):
+        """Check if errors reading the input are raised after the previous events"""
+
+        async def failing():
+            for item in self.items[:2]:
+                yield item
+            raise RuntimeError("broker disconnected")
+
+        events = []
+        with self.assertRaisesRegex(RuntimeError, "broker disconnected"):
+            async for event in aeventize('git', failing(), compact=True, chunk_size=1):
+                events.append(event)
+
+        n_events = len(list(eventize('git', self.items[:2])))
+        self.assertEqual(len(events), n_events)
+
+    async def test_eventizer_error(self):
+        """Check if errors eventizing the items are raised"""
+
+        items = [dict(self.items[0], category='issue')]
+
+        with self.assertRaisesRegex(ValueError, "Invalid category"):
+            await collect(aeventize('git', iterate(items)))
+
+    async def test_unknown_eventizer(self):
+        """Check if an error is raised when the eventizer doesn't exist"""
+
+        with self.assertRaisesRegex(ValueError, "Unknown eventizer 'unknown'"):
+            await collect(aeventize('unknown', iterate(self.items)))
+
+    async def test_invalid_parameters(self):
+        """Check if an error is raised when the parameters are not valid"""
+
+        with self.assertRaisesRegex(ValueError, "'concurrency' must be greater than 0"):
+            await collect(aeventize('git', iterate(self.items), concurrency=0))
+
+        with self.assertRaisesRegex(ValueError, "'chunk_size' must be greater than 0"):
+            await collect(aeventize('git', iterate(self.items), chunk_size=0))
+
+        with self.assertRaisesRegex(ValueError, "'max_pending' must be greater than 0"):
+            await collect(aeventize('git', iterate(self.items), max_pending=0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import io
+import json
+import os
+import queue
+import struct
+import threading
+import unittest
+import unittest.mock
+
+from cloudevents.http import CloudEvent
+
+from chronicler.binary import (available_binary_formats,
+                               pack_event,
+                               pack_record,
+                               read_events,
+                               read_records,
+                               unpack_record)
+from chronicler.eventizer import Event, eventize
+from chronicler.serializer import to_json
+
+
+class ChunkedBytesIO(io.BytesIO):
+    """BytesIO that returns fewer bytes than requested, like a pipe"""
+
+    def read(self, size=-1):
+        return super().read(min(size, 3) if size > 0 else size)
+
+    def read1(self, size=-1):
+        return self.read(size)
+
+
+@unittest.skipUnless(available_binary_formats(), "msgpack is not installed")
+class TestRecords(unittest.TestCase):
+    """Unit tests for length-prefixed records"""
+
+    def test_pack_record(self):
+        """Check if records are the size of the payload followed by the payload"""
+
+        record = pack_record({'id': '1'})
+
+        self.assertEqual(record, b'\x00\x00\x00\x06\x81\xa2id\xa11')
+        self.assertEqual(struct.unpack('>I', record[:4])[0], len(record) - 4)
+
+    def test_surrogates(self):
+        """Check if text with lone surrogates is packed and read back"""
+
+        obj = {'message': 'invalid \udcff message', 'names': ['a\udc80b']}
+        record = pack_record(obj)
+
+        payloads = list(read_records(io.BytesIO(record)))
+        self.assertDictEqual(unpack_record(payloads[0]), obj)
+
+    def test_big_integers(self):
+        """Check if an error is raised when integers don't fit in 64 bits"""
+
+        self.assertEqual(unpack_record(pack_record({'n': 2 ** 64 - 1})[4:]), {'n': 2 ** 64 - 1})
+
+        with self.assertRaisesRegex(ValueError, "integers larger than 64 bits"):
+            pack_record({'data': {'big': 123456789012345678901234567890}})
+
+    def test_read_records(self):
+        """Check if the payloads of the records are read"""
+
+        objs = [{'n': n, 'text': 'x' * (n * 100)} for n in range(20)]
+        data = b''.join(pack_record(obj) for obj in objs)
+
+        for read_size in (1, 7, 150, 1024 * 1024):
+            payloads = list(read_records(io.BytesIO(data), read_size=read_size))
+            self.assertListEqual([unpack_record(payload) for payload in payloads], objs)
+
+        payloads = list(read_records(ChunkedBytesIO(data), read_size=64))
+        self.assertListEqual([unpack_record(payload) for payload in payloads], objs)
+
+    def test_read_from_pipe(self):
+        """Check if records are returned as soon as they are written to a pipe"""
+
+        read_fd, write_fd = os.pipe()
+        payloads = queue.Queue()
+
+        with open(read_fd, 'rb') as fd, open(write_fd, 'wb', buffering=0) as writer:
+            records = read_records(fd)
+            reader = threading.Thread(target=lambda: payloads.put(next(records)), daemon=True)
+            reader.start()
+
+            # The pipe is kept open, so the reader can't wait for more data
+            writer.write(pack_record({'id': '1'}))
+            self.assertDictEqual(unpack_record(payloads.get(timeout=10)), {'id': '1'})
+            reader.join()
+
+            writer.write(pack_record({'id': '2'}))
+            writer.close()
+            self.assertListEqual([unpack_record(payload) for payload in records], [{'id': '2'}])
+
+    def test_read_empty_file(self):
+        """Check if no records are returned from an empty file"""
+
+        self.assertListEqual(list(read_records(io.BytesIO(b''))), [])
+
+    def test_truncated_record(self):
+        """Check if an error is raised when the file ends in the middle of a record"""
+
+        data = pack_record({'id': '1'}) + pack_record({'id': '2'})
+
+        for size in (len(data) - 1, len(data) - 8, 2):
+            records = read_records(io.BytesIO(data[:size]), read_size=4)
+            with self.assertRaisesRegex(ValueError, "truncated record"):
+                list(records)
+
+    def test_invalid_read_size(self):
+        """Check if an error is raised when the read size is not valid"""
+
+        with self.assertRaisesRegex(ValueError, "'read_size' must be greater than 0"):
+            list(read_records(io.BytesIO(b''), read_size=0))
+
+
+@unittest.skipUnless(available_binary_formats(), "msgpack is not installed")
+class TestEvents(unittest.TestCase):
+    """Unit tests for binary events"""
+
+    def setUp(self):
+        with open('data/git_commits.txt', 'r') as fd:
+            self.items = [json.loads(line) for line in fd]
+
+    def test_pack_event(self):
+        """Check if events and CloudEvents are packed like their JSON documents"""
+
+        events = list(eventize('git', self.items, compact=True))
+        cloudevents = list(eventize('git', self.items))
+
+        for event, cloudevent in zip(events, cloudevents):
+            record = pack_event(event)
+            self.assertEqual(record, pack_event(cloudevent))
+            self.assertDictEqual(unpack_record(record[4:]), json.loads(to_json(event)))
+
+    def test_read_events(self):
+        """Check if CloudEvents are read back"""
+
+        events = list(eventize('git', self.items))
+        data = b''.join(pack_event(event) for event in events)
+
+        result = list(read_events(io.BytesIO(data)))
+
+        self.assertEqual(len(result), 45)
+        for event in result:
+            self.assertIsInstance(event, CloudEvent)
+        self.assertListEqual(result, events)
+
+        event = Event(id='1', type='type', source='src', time=0.0, linked_event='0')
+        result = list(read_events(io.BytesIO(pack_event(event))))
+        self.assertEqual(result[0]['linked_event'], '0')
+        self.assertIsNone(result[0].get_data())
+
+        event = Event(id='1', type='type', source='src', time=0.0, data={'message': 'invalid \udcff'})
+        result = list(read_events(io.BytesIO(pack_event(event))))
+        self.assertDictEqual(result[0].get_data(), {'message': 'invalid \udcff'})
+
+
+class TestNoMsgpack(unittest.TestCase):
+    """Unit tests for binary formats when msgpack is not installed"""
+
+    def test_not_available(self):
+        """Check if an error is raised when msgpack is not installed"""
+
+        with unittest.mock.patch('chronicler.binary.msgpack', None), \
+                unittest.mock.patch('chronicler.binary._import_msgpack', return_value=False):
+            self.assertListEqual(available_binary_formats(), [])
+
+            with self.assertRaisesRegex(ValueError, "install 'msgpack' package"):
+                pack_record({})
+            with self.assertRaisesRegex(ValueError, "install 'msgpack' package"):
+                list(read_events(io.BytesIO(b'')))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import json
+import os
+import tempfile
+import unittest
+
+from chronicler.checkpoint import CheckpointStore
+from chronicler.eventizer import eventize
+
+
+class TestCheckpointStore(unittest.TestCase):
+    """Unit tests for CheckpointStore class"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'checkpoint.db')
+
+        with open('data/git_commits.txt', 'r') as fd:
+            self.items = [json.loads(line) for line in fd]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_add_commit(self):
+        """Check if items are saved when they are committed"""
+
+        with CheckpointStore(self.path) as store:
+            store.add('https://example.git', 'abcd', 'offset-1')
+            self.assertFalse(store.contains('https://example.git', 'abcd'))
+
+            store.commit()
+            self.assertTrue(store.contains('https://example.git', 'abcd'))
+            self.assertFalse(store.contains('https://example.com/other.git', 'abcd'))
+
+        with CheckpointStore(self.path) as store:
+            self.assertTrue(store.contains('https://example.git', 'abcd'))
+            self.assertEqual(store.count(), 1)
+
+    def test_not_committed(self):
+        """Check if items not committed are discarded"""
+
+        with CheckpointStore(self.path) as store:
+            store.add('https://example.git', 'abcd', 'offset-1')
+
+        with CheckpointStore(self.path) as store:
+            self.assertFalse(store.contains('https://example.git', 'abcd'))
+            self.assertEqual(store.count(), 0)
+
+    def test_last_offset(self):
+        """Check if the offset of the last item of an origin is returned"""
+
+        with CheckpointStore(self.path) as store:
+            self.assertIsNone(store.last_offset('https://example.git'))
+
+            store.add('https://example.git', 'a', 'offset-1')
+            store.add('https://example.git', 'b', 'offset-2')
+            store.add('https://example.com/other.git', 'c', 'offset-3')
+            store.commit()
+
+            self.assertEqual(store.last_offset('https://example.git'), 'offset-2')
+            self.assertEqual(store.last_offset('https://example.com/other.git'), 'offset-3')
+            self.assertEqual(store.count('https://example.git'), 2)
+
+    def test_track(self):
+        """Check if items processed in previous runs are skipped"""
+
+        with CheckpointStore(self.path) as store:
+            items = list(store.track(self.items[:4]))
+            self.assertListEqual(items, self.items[:4])
+
+        with CheckpointStore(self.path) as store:
+            items = list(store.track(self.items))
+            self.assertListEqual(items, self.items[4:])
+            self.assertEqual(store.count('https://example.git'), len(self.items))
+            self.assertEqual(store.last_offset('https://example.git'), self.items[-1]['offset'])
+
+        with CheckpointStore(self.path) as store:
+            self.assertListEqual(list(store.track(self.items)), [])
+            self.assertListEqual(list(store.track(self.items, skip_processed=False)), self.items)
+
+    def test_track_commit_interval(self):
+        """Check if the store is committed every interval after calling the hook"""
+
+        commits = []
+
+        with CheckpointStore(self.path) as store:
+            def before_commit():
+                commits.append(store.count())
+
+            for _ in store.track(self.items, commit_interval=3, before_commit=before_commit):
+                pass
+
+        # Hook is called before each commit; the last one at the end
+        self.assertListEqual(commits, [0, 3, 6, 9])
+
+    def test_resume(self):
+        """Check if an interrupted stream resumes after the last committed item"""
+
+        with CheckpointStore(self.path) as store:
+            items = store.track(self.items, commit_interval=2)
+            for _ in range(5):
+                next(items)
+
+            # The fifth item was being processed; only four were
+            # recorded and committed when the stream was interrupted
+            items.close()
+            self.assertEqual(store.count(), 4)
+
+        with CheckpointStore(self.path) as store:
+            items = list(store.track(self.items))
+            self.assertListEqual(items, self.items[4:])
+
+    def test_track_eventize(self):
+        """Check if items are recorded once their events are generated"""
+
+        with CheckpointStore(self.path) as store:
+            events = eventize('git', store.track(self.items[:2]), compact=True)
+
+            event = next(events)
+            self.assertEqual(event.id, self.items[0]['uuid'])
+            self.assertEqual(len(store._pending), 0)
+
+            for event in events:
+                if event.id == self.items[1]['uuid']:
+                    break
+            self.assertEqual(len(store._pending), 1)
+
+            list(events)
+            self.assertEqual(store.count(), 2)
+
+    def test_items_without_uuid(self):
+        """Check if items without origin or uuid are not recorded"""
+
+        items = [{'uuid': 'a'}, {'origin': 'https://example.git'}]
+
+        with CheckpointStore(self.path) as store:
+            self.assertListEqual(list(store.track(items)), items)
+            self.assertEqual(store.count(), 0)
+
+    def test_invalid_commit_interval(self):
+        """Check if an error is raised when the commit interval is not valid"""
+
+        with CheckpointStore(self.path) as store:
+            with self.assertRaisesRegex(ValueError, "'commit_interval' must be greater than 0"):
+                list(store.track(self.items, commit_interval=0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,681 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import bz2
+import gzip
+import json
+import lzma
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import unittest.mock
+import zlib
+
+from click.testing import CliRunner
+
+from chronicler.binary import available_binary_formats, pack_record, read_records, unpack_record
+from chronicler.chronicler import chronicler
+from chronicler.codec import available_codecs
+from chronicler.columnar import available_columnar_formats
+
+
+class TestChronicler(unittest.TestCase):
+    """Unit tests for the chronicler command"""
+
+    def test_json_line(self):
+        """Check if an event per line is produced"""
+
+        runner = CliRunner()
+        result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                            '--json-line', 'git'])
+        self.assertEqual(result.exit_code, 0)
+
+        lines = result.output.splitlines()
+        self.assertEqual(len(lines), 45)
+
+        event = json.loads(lines[0])
+        self.assertEqual(event['id'], '2abc82e1fb2917e2fb2d7018dba6fb4b4a8c29f0')
+        self.assertEqual(event['type'], 'org.grimoirelab.events.git.merge')
+        self.assertEqual(event['specversion'], '1.0')
+        self.assertEqual(lines[0], json.dumps(event, separators=(',', ':'), sort_keys=True))
+
+    def test_indented_output(self):
+        """Check if events are written as indented JSON documents"""
+
+        runner = CliRunner()
+        result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt', 'git'])
+        self.assertEqual(result.exit_code, 0)
+
+        decoder = json.JSONDecoder()
+        output = result.output
+        pos = 0
+        events = []
+        while pos < len(output):
+            event, end = decoder.raw_decode(output, pos)
+            events.append(event)
+            self.assertEqual(output[pos:end], json.dumps(event, indent=4, sort_keys=True))
+            pos = end + 1
+
+        self.assertEqual(len(events), 45)
+
+    def test_codecs(self):
+        """Check if the output is the same for all the codecs"""
+
+        runner = CliRunner()
+
+        for json_line in (['--json-line'], []):
+            result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                                '--codec', 'stdlib', 'git'] + json_line)
+            self.assertEqual(result.exit_code, 0)
+            expected = result.output
+
+            for codec in available_codecs():
+                result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                                    '--codec', codec, 'git'] + json_line)
+                self.assertEqual(result.exit_code, 0)
+                self.assertEqual(result.output, expected)
+
+    def test_codecs_perceval_values(self):
+        """Check if big integers and lone surrogates are kept by all the codecs"""
+
+        with open('data/git_commits.txt', 'r') as fd:
+            item = json.loads(fd.readline())
+        item['data']['message'] = 'invalid \udcff message'
+        item['data']['big'] = 123456789012345678901234567890
+
+        runner = CliRunner()
+
+        with tempfile.TemporaryDirectory() as dirpath:
+            filepath = os.path.join(dirpath, 'items.json')
+            with open(filepath, 'w') as fd:
+                fd.write(json.dumps(item) + '\n')
+
+            for codec in ['auto'] + available_codecs():
+                result = runner.invoke(chronicler, ['--input', filepath, '--json-line',
+                                                    '--codec', codec, 'git'])
+                self.assertEqual(result.exit_code, 0)
+
+                event = json.loads(result.output.splitlines()[0])
+                self.assertEqual(event['data']['message'], 'invalid \udcff message')
+                self.assertEqual(event['data']['big'], 123456789012345678901234567890)
+                self.assertIn('"big":123456789012345678901234567890', result.output)
+
+    def test_codec_not_available(self):
+        """Check if an error is returned when the codec is not installed"""
+
+        runner = CliRunner()
+
+        with unittest.mock.patch('chronicler.codec.ujson', None), \
+                unittest.mock.patch('chronicler.codec._import_ujson', return_value=False):
+            result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                                '--codec', 'ujson', 'git'])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertIn("Codec 'ujson' is not available", result.output)
+
+    def test_workers(self):
+        """Check if the output is the same when several processes are used"""
+
+        runner = CliRunner()
+        result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                            '--json-line', 'git'])
+        expected = result.output
+
+        result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                            '--json-line', '--workers', '2',
+                                            '--chunk-size', '3', 'git'])
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(result.output, expected)
+
+        result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                            '--json-line', '--workers', '2',
+                                            '--chunk-size', '3', '--unordered', 'git'])
+        self.assertEqual(result.exit_code, 0)
+        self.assertListEqual(sorted(result.output.splitlines()),
+                             sorted(expected.splitlines()))
+
+        # Compressed input is read by a thread running alongside the workers
+        with tempfile.TemporaryDirectory() as dirpath:
+            filepath = os.path.join(dirpath, 'git_commits.txt.gz')
+            with open('data/git_commits.txt', 'rb') as fd, gzip.open(filepath, 'wb') as out:
+                out.write(fd.read())
+
+            result = runner.invoke(chronicler, ['--input', filepath,
+                                                '--json-line', '--workers', '2',
+                                                '--chunk-size', '3', 'git'])
+            self.assertEqual(result.exit_code, 0)
+            self.assertEqual(result.output, expected)
+
+    def test_unordered_without_workers(self):
+        """Check if an error is returned when the order is not kept with a single process"""
+
+        runner = CliRunner()
+        result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                            '--unordered', 'git'])
+        self.assertEqual(result.exit_code, 2)
+        self.assertIn("--unordered needs --workers", result.output)
+
+    def test_output_buffer(self):
+        """Check if the output is the same for any buffer size"""
+
+        runner = CliRunner()
+        result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                            '--json-line', 'git'])
+        expected = result.output
+
+        for buffer_size in ('0', '1', '100', '1000000'):
+            result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                                '--json-line', '--output-buffer', buffer_size,
+                                                '--flush-interval', '0', 'git'])
+            self.assertEqual(result.exit_code, 0)
+            self.assertEqual(result.output, expected)
+
+    def test_output_file(self):
+        """Check if events are written to the output file"""
+
+        runner = CliRunner()
+        result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                            '--json-line', 'git'])
+        expected = result.output
+
+        with tempfile.TemporaryDirectory() as dirpath:
+            filepath = os.path.join(dirpath, 'events.json')
+            result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                                '--output', filepath,
+                                                '--json-line', 'git'])
+            self.assertEqual(result.exit_code, 0)
+
+            with open(filepath, 'r') as fd:
+                self.assertEqual(fd.read(), expected)
+
+    def test_output_dir(self):
+        """Check if events are split in shards written to the output directory"""
+
+        runner = CliRunner()
+        result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                            '--json-line', 'git'])
+        expected = result.output.splitlines()
+
+        with tempfile.TemporaryDirectory() as dirpath:
+            for workers in ('1', '2'):
+                shards_dir = os.path.join(dirpath, f"workers-{workers}")
+                result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                                    '--output-dir', shards_dir,
+                                                    '--shards', '3', '--workers', workers,
+                                                    '--json-line', 'git'])
+                self.assertEqual(result.exit_code, 0)
+                self.assertEqual(result.output, '')
+                self.assertListEqual(sorted(os.listdir(shards_dir)),
+                                     ['events-00000-00000.jsonl',
+                                      'events-00001-00000.jsonl',
+                                      'events-00002-00000.jsonl'])
+
+                events = []
+                for shard, filename in enumerate(sorted(os.listdir(shards_dir))):
+                    with open(os.path.join(shards_dir, filename), 'r') as fd:
+                        lines = fd.read().splitlines()
+                    for line in lines:
+                        event_id = json.loads(line)['id']
+                        self.assertEqual(zlib.crc32(event_id.encode()) % 3, shard)
+                    events.extend(lines)
+
+                self.assertListEqual(sorted(events), sorted(expected))
+
+    def test_output_dir_shard_by_type(self):
+        """Check if events of the same type are written to the same shard"""
+
+        runner = CliRunner()
+
+        with tempfile.TemporaryDirectory() as dirpath:
+            result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                                '--output-dir', dirpath,
+                                                '--shard-by', 'type', '--shards', '4',
+                                                '--shard-size', '2000',
+                                                '--output-compression', 'gzip', 'git'])
+            self.assertEqual(result.exit_code, 0)
+
+            types = {}
+            for filename in os.listdir(dirpath):
+                self.assertRegex(filename, r'^events-\d{5}-\d{5}\.json\.gz$')
+                shard = int(filename.split('-')[1])
+                with gzip.open(os.path.join(dirpath, filename), 'rt') as fd:
+                    for line in fd:
+                        if line.startswith('    "type": '):
+                            types.setdefault(line, set()).add(shard)
+
+            self.assertEqual(len(types), 8)
+            for shards in types.values():
+                self.assertEqual(len(shards), 1)
+
+            # Shards of the same type are split in several parts
+            parts = [name for name in os.listdir(dirpath) if not name.endswith('-00000.json.gz')]
+            self.assertNotEqual(parts, [])
+
+    def test_output_dir_errors(self):
+        """Check if an error is returned when the output directory can't be used"""
+
+        runner = CliRunner()
+
+        with tempfile.TemporaryDirectory() as dirpath:
+            result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                                '--output-dir', dirpath,
+                                                '--output', os.path.join(dirpath, 'events.json'),
+                                                'git'])
+            self.assertEqual(result.exit_code, 2)
+            self.assertIn("--output can't be used with --output-dir", result.output)
+
+            result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                                '--output-dir', dirpath, 'git'])
+            self.assertEqual(result.exit_code, 0)
+
+            result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                                '--output-dir', dirpath, 'git'])
+            self.assertEqual(result.exit_code, 2)
+            self.assertIn("already has files starting with 'events-'", result.output)
+
+    @unittest.skipUnless(available_binary_formats(), "msgpack is not installed")
+    def test_msgpack_format(self):
+        """Check if items and events are read and written as MessagePack records"""
+
+        runner = CliRunner()
+        result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                            '--json-line', 'git'])
+        expected = [json.loads(line) for line in result.output.splitlines()]
+
+        with tempfile.TemporaryDirectory() as dirpath:
+            items_path = os.path.join(dirpath, 'items.msgpack')
+            with open('data/git_commits.txt', 'r') as fd, open(items_path, 'wb') as out:
+                for line in fd:
+                    out.write(pack_record(json.loads(line)))
+
+            for workers in ('1', '2'):
+                filepath = os.path.join(dirpath, f"events-{workers}.msgpack.gz")
+                result = runner.invoke(chronicler, ['--input', items_path,
+                                                    '--input-format', 'msgpack',
+                                                    '--output', filepath,
+                                                    '--format', 'msgpack',
+                                                    '--workers', workers, 'git'])
+                self.assertEqual(result.exit_code, 0)
+
+                with gzip.open(filepath, 'rb') as fd:
+                    events = [unpack_record(payload) for payload in read_records(fd)]
+                self.assertListEqual(events, expected)
+
+            # MessagePack input to JSON output
+            result = runner.invoke(chronicler, ['--input', items_path,
+                                                '--input-format', 'msgpack',
+                                                '--json-line', 'git'])
+            self.assertEqual(result.exit_code, 0)
+            self.assertListEqual([json.loads(line) for line in result.output.splitlines()], expected)
+
+            shards_dir = os.path.join(dirpath, 'shards')
+            result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                                '--output-dir', shards_dir, '--shards', '2',
+                                                '--format', 'msgpack', 'git'])
+            self.assertEqual(result.exit_code, 0)
+            self.assertListEqual(sorted(os.listdir(shards_dir)),
+                                 ['events-00000-00000.msgpack', 'events-00001-00000.msgpack'])
+
+    @unittest.skipUnless(available_binary_formats(), "msgpack is not installed")
+    def test_msgpack_surrogates(self):
+        """Check if events with text that is not valid UTF-8 are written as MessagePack records"""
+
+        with open('data/git_commits.txt', 'r') as fd:
+            item = json.loads(fd.readline())
+        item['data']['message'] = 'invalid \udcff message'
+
+        runner = CliRunner()
+
+        with tempfile.TemporaryDirectory() as dirpath:
+            items_path = os.path.join(dirpath, 'items.json')
+            with open(items_path, 'w') as fd:
+                fd.write(json.dumps(item) + '\n')
+
+            filepath = os.path.join(dirpath, 'events.msgpack')
+            result = runner.invoke(chronicler, ['--input', items_path, '--output', filepath,
+                                                '--format', 'msgpack', 'git'])
+            self.assertEqual(result.exit_code, 0)
+
+            with open(filepath, 'rb') as fd:
+                events = [unpack_record(payload) for payload in read_records(fd)]
+            self.assertEqual(events[0]['data']['message'], 'invalid \udcff message')
+
+    def test_msgpack_not_available(self):
+        """Check if an error is returned when msgpack is not installed"""
+
+        runner = CliRunner()
+
+        with unittest.mock.patch('chronicler.binary.msgpack', None), \
+                unittest.mock.patch('chronicler.binary._import_msgpack', return_value=False):
+            for args in (['--format', 'msgpack'], ['--input-format', 'msgpack']):
+                result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt', *args, 'git'])
+                self.assertEqual(result.exit_code, 2)
+                self.assertIn("install 'msgpack' package", result.output)
+
+    @unittest.skipUnless(available_columnar_formats(), "pyarrow is not installed")
+    def test_columnar_format(self):
+        """Check if events are written to Parquet and Arrow files"""
+
+        import pyarrow.ipc
+        import pyarrow.parquet
+
+        runner = CliRunner()
+
+        with tempfile.TemporaryDirectory() as dirpath:
+            result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                                '--output-dir', dirpath,
+                                                '--format', 'parquet', '--stats', 'git'])
+            self.assertEqual(result.exit_code, 0)
+            self.assertRegex(result.output, r'write +\d+\.\d+s')
+            self.assertListEqual(sorted(os.listdir(dirpath)),
+                                 ['commit.parquet', 'file_action.parquet', 'identity.parquet'])
+
+            rows = sum(pyarrow.parquet.read_metadata(os.path.join(dirpath, name)).num_rows
+                       for name in os.listdir(dirpath))
+            self.assertEqual(rows, 45)
+
+            result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                                '--output-dir', dirpath,
+                                                '--format', 'arrow', '--batch-size', '5',
+                                                '--types', '*.commit', 'git'])
+            self.assertEqual(result.exit_code, 0)
+            self.assertEqual(result.output, '')
+
+            with pyarrow.ipc.open_file(os.path.join(dirpath, 'commit.arrow')) as reader:
+                self.assertEqual(reader.num_record_batches, 2)
+                self.assertEqual(reader.read_all().num_rows, 9)
+
+            result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                                '--output-dir', dirpath,
+                                                '--format', 'arrow', 'git'])
+            self.assertEqual(result.exit_code, 2)
+            self.assertIn("already has '.arrow' files", result.output)
+
+    def test_columnar_format_errors(self):
+        """Check if an error is returned when columnar formats are used with incompatible options"""
+
+        runner = CliRunner()
+
+        with tempfile.TemporaryDirectory() as dirpath:
+            invalid = [
+                ([], "--format parquet needs --output-dir"),
+                (['--output-dir', dirpath, '--shards', '2'], "can't be used with --shards or --shard-size"),
+                (['--output-dir', dirpath, '--output-compression', 'gzip'],
+                 "can't be used with --output-compression"),
+                (['--output-dir', dirpath, '--workers', '2'], "can't be used with --workers"),
+                (['--output-dir', dirpath, '--since-checkpoint', os.path.join(dirpath, 'db')],
+                 "can't be used with --since-checkpoint"),
+            ]
+            for args, error in invalid:
+                result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                                    '--format', 'parquet', *args, 'git'])
+                self.assertEqual(result.exit_code, 2)
+                self.assertIn(error, result.output)
+
+            self.assertListEqual(os.listdir(dirpath), [])
+
+        with unittest.mock.patch('chronicler.columnar._import_pyarrow', return_value=False), \
+                tempfile.TemporaryDirectory() as dirpath:
+            result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                                '--output-dir', dirpath,
+                                                '--format', 'parquet', 'git'])
+            self.assertEqual(result.exit_code, 2)
+            self.assertIn("install 'pyarrow' package", result.output)
+
+    def test_import_loads_no_eventizers(self):
+        """Check if eventizers are not imported until a datasource is chosen"""
+
+        code = "import sys, chronicler.chronicler; print(sorted(m for m in sys.modules if '.events.' in m))"
+        output = subprocess.run([sys.executable, '-c', code], check=True,
+                                capture_output=True, text=True).stdout
+
+        self.assertEqual(output.strip(), '[]')
+
+    def test_import_loads_no_optional_modules(self):
+        """Check if the modules of optional features are not imported until they are used"""
+
+        modules = ['chronicler.checkpoint', 'chronicler.parallel', 'concurrent.futures', 'multiprocessing',
+                   'msgpack', 'orjson', 'pyarrow', 'sqlite3', 'ujson', 'zstandard']
+        code = f"import sys, chronicler.chronicler; print(sorted(m for m in {modules!r} if m in sys.modules))"
+        output = subprocess.run([sys.executable, '-c', code], check=True,
+                                capture_output=True, text=True).stdout
+
+        self.assertEqual(output.strip(), '[]')
+
+    def test_compressed_input(self):
+        """Check if compressed input is decompressed"""
+
+        runner = CliRunner()
+        result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                            '--json-line', 'git'])
+        expected = result.output
+
+        with open('data/git_commits.txt', 'rb') as fd:
+            data = gzip.compress(fd.read())
+
+        result = runner.invoke(chronicler, ['--json-line', 'git'], input=data)
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(result.output, expected)
+
+        with tempfile.TemporaryDirectory() as dirpath:
+            filepath = os.path.join(dirpath, 'items.json.xz')
+            with lzma.open(filepath, 'wb') as fd:
+                fd.write(gzip.decompress(data))
+
+            result = runner.invoke(chronicler, ['--input', filepath, '--json-line',
+                                                '--workers', '2', 'git'])
+            self.assertEqual(result.exit_code, 0)
+            self.assertEqual(result.output, expected)
+
+    def test_compressed_output(self):
+        """Check if output is compressed"""
+
+        runner = CliRunner()
+        result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                            '--json-line', 'git'])
+        expected = result.output.encode('utf-8')
+
+        with tempfile.TemporaryDirectory() as dirpath:
+            filepath = os.path.join(dirpath, 'events.json.gz')
+            result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                                '--output', filepath,
+                                                '--compression-level', '1',
+                                                '--json-line', 'git'])
+            self.assertEqual(result.exit_code, 0)
+
+            with open(filepath, 'rb') as fd:
+                self.assertEqual(gzip.decompress(fd.read()), expected)
+
+        result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                            '--output-compression', 'bz2',
+                                            '--json-line', 'git'])
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(bz2.decompress(result.stdout_bytes), expected)
+
+    def test_since_checkpoint(self):
+        """Check if items eventized in previous runs are skipped"""
+
+        runner = CliRunner()
+
+        with open('data/git_commits.txt', 'r') as fd:
+            lines = fd.readlines()
+
+        result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                            '--json-line', 'git'])
+        expected = result.output.splitlines()
+
+        with tempfile.TemporaryDirectory() as dirpath:
+            filepath = os.path.join(dirpath, 'checkpoint.db')
+
+            result = runner.invoke(chronicler, ['--since-checkpoint', filepath,
+                                                '--json-line', 'git'],
+                                   input=''.join(lines[:3]))
+            self.assertEqual(result.exit_code, 0)
+            first_run = result.output.splitlines()
+
+            result = runner.invoke(chronicler, ['--since-checkpoint', filepath,
+                                                '--input', 'data/git_commits.txt',
+                                                '--json-line', 'git'])
+            self.assertEqual(result.exit_code, 0)
+            second_run = result.output.splitlines()
+
+            self.assertListEqual(first_run + second_run, expected)
+
+            result = runner.invoke(chronicler, ['--since-checkpoint', filepath,
+                                                '--input', 'data/git_commits.txt',
+                                                '--json-line', 'git'])
+            self.assertEqual(result.exit_code, 0)
+            self.assertEqual(result.output, '')
+
+    def test_since_checkpoint_workers(self):
+        """Check if an error is returned when checkpoints are used with workers"""
+
+        runner = CliRunner()
+        result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                            '--since-checkpoint', 'checkpoint.db',
+                                            '--workers', '2', 'git'])
+        self.assertEqual(result.exit_code, 2)
+        self.assertIn("--since-checkpoint can't be used with --workers", result.output)
+
+    def test_dedup(self):
+        """Check if duplicated items are dropped and reported"""
+
+        runner = CliRunner()
+
+        with open('data/git_commits.txt', 'r') as fd:
+            data = fd.read()
+
+        result = runner.invoke(chronicler, ['--json-line', 'git'], input=data)
+        expected = result.stdout
+
+        result = runner.invoke(chronicler, ['--json-line', '--dedup', 'git'], input=data + data)
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(result.stdout, expected)
+        self.assertIn("10 duplicated items dropped", result.stderr)
+
+        result = runner.invoke(chronicler, ['--json-line', '--dedup', '--dedup-exact-size', '2',
+                                            'git'], input=data + data)
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(result.stdout, expected)
+        self.assertIn("10 duplicated items dropped", result.stderr)
+
+    def test_dedup_workers(self):
+        """Check if an error is returned when dedup is used with workers"""
+
+        runner = CliRunner()
+        result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                            '--dedup', '--workers', '2', 'git'])
+        self.assertEqual(result.exit_code, 2)
+        self.assertIn("--dedup can't be used with --workers", result.output)
+
+    def test_stats(self):
+        """Check if statistics are printed to stderr without changing the output"""
+
+        runner = CliRunner()
+        result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                            '--json-line', 'git'])
+        expected = result.stdout
+
+        result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                            '--json-line', '--stats', 'git'])
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(result.stdout, expected)
+        self.assertIn("Items: 10 (", result.stderr)
+        self.assertIn("Events: 45 (", result.stderr)
+        for stage in ('read', 'eventize', 'encode', 'write'):
+            self.assertRegex(result.stderr, rf"\n  {stage} +[\d.]+s")
+        self.assertIn("org.grimoirelab.events.git.commit.authored_by: 10", result.stderr)
+        self.assertIn("  2abc82e1fb2917e2fb2d7018dba6fb4b4a8c29f0: ", result.stderr)
+
+    def test_stats_workers(self):
+        """Check if an error is returned when stats are used with workers"""
+
+        runner = CliRunner()
+        for option in (['--stats'], ['--stats-interval', '1']):
+            result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                                '--workers', '2', *option, 'git'])
+            self.assertEqual(result.exit_code, 2)
+            self.assertIn("--stats can't be used with --workers", result.output)
+
+    def test_types(self):
+        """Check if only events of the selected types are written"""
+
+        runner = CliRunner()
+        result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                            '--json-line', 'git'])
+        expected = [line for line in result.output.splitlines()
+                    if json.loads(line)['type'].endswith('.authored_by')]
+        self.assertEqual(len(expected), 10)
+
+        for workers in ('1', '2'):
+            result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                                '--types', '*.authored_by', '--types', '!*.file.*',
+                                                '--workers', workers, '--json-line', 'git'])
+            self.assertEqual(result.exit_code, 0)
+            self.assertListEqual(result.output.splitlines(), expected)
+
+    def test_payload(self):
+        """Check if commit events are written with the selected payload profile"""
+
+        runner = CliRunner()
+        result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                            '--json-line', 'git'])
+        full = [json.loads(line) for line in result.output.splitlines()]
+
+        for workers in ('1', '2'):
+            result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                                '--payload', 'slim',
+                                                '--workers', workers, '--json-line', 'git'])
+            self.assertEqual(result.exit_code, 0)
+
+            events = [json.loads(line) for line in result.output.splitlines()]
+            self.assertEqual(len(events), len(full))
+
+            for event, expected in zip(events, full):
+                self.assertEqual(event['id'], expected['id'])
+                expected_data = expected['data']
+                if event['type'].endswith(('.git.commit', '.git.merge')):
+                    self.assertNotIn('files', event['data'])
+                    expected_data = {field: value for field, value in expected_data.items()
+                                     if field != 'files'}
+                self.assertDictEqual(event['data'], expected_data)
+
+    def test_invalid_payload(self):
+        """Check if an error is returned when the payload profile is not valid"""
+
+        runner = CliRunner()
+        result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                            '--payload', 'tiny', 'git'])
+        self.assertEqual(result.exit_code, 2)
+        self.assertIn("Invalid value for '--payload'", result.output)
+
+    def test_invalid_compression_level(self):
+        """Check if an error is returned when the compression level is not valid"""
+
+        runner = CliRunner()
+        result = runner.invoke(chronicler, ['--input', 'data/git_commits.txt',
+                                            '--output-compression', 'gzip',
+                                            '--compression-level', '12', 'git'])
+        self.assertEqual(result.exit_code, 2)
+        self.assertIn("'gzip' compression level must be between 0 and 9", result.output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import json
+import pickle
+import unittest
+import unittest.mock
+
+from chronicler.codec import (JSONCodec,
+                              OrjsonCodec,
+                              UjsonCodec,
+                              available_codecs,
+                              get_codec)
+
+
+SAMPLES = [
+    {"b": 1, "a": [1, 2, {"d": None, "c": True}]},
+    {"name": "Zhongpeng Lin (林中鹏)", "emoji": "\U0001F600", "del": "a\x7fb"},
+    {"escaped": "\"quoted\" \\ / \b\f\n\r\t \x01 \x1f"},
+    {"floats": [1344966351.0, 1748521396.234826, 0.1, -0.0, 5e-324]},
+    {"exponent": [1e16, 1.5e-7, 1e22, 123456789012345678.0, 1e-05, -2.5e-10, 10.00001]},
+    {"text": "ratio:1e5, 0.00001]", "number": 1e-05},
+    {"int": 2 ** 63, "negative": -12, "empty": [], "empty_obj": {}},
+    [1e16, "x"],
+    1e16,
+]
+
+
+class TestJSONCodec(unittest.TestCase):
+    """Unit tests for JSONCodec class"""
+
+    def test_loads(self):
+        """Check if JSON documents are decoded"""
+
+        codec = JSONCodec()
+
+        self.assertDictEqual(codec.loads('{"a": [1, 2.5, null]}'), {"a": [1, 2.5, None]})
+        self.assertDictEqual(codec.loads(b'{"a": "b"}'), {"a": "b"})
+
+    def test_dumps(self):
+        """Check if objects are encoded with sorted keys"""
+
+        codec = JSONCodec()
+
+        obj = {"b": 1, "a": {"d": 2, "c": 3}}
+
+        self.assertEqual(codec.dumps(obj, json_line=True),
+                         '{"a":{"c":3,"d":2},"b":1}')
+        self.assertEqual(codec.dumps(obj),
+                         '{\n    "a": {\n        "c": 3,\n        "d": 2\n    },\n    "b": 1\n}')
+
+
+class CodecOutputTestMixin:
+    """Tests to check a codec produces the same output as the standard library"""
+
+    codec_class = None
+
+    def setUp(self):
+        self.codec = self.codec_class()
+        self.stdlib = JSONCodec()
+
+    def test_loads(self):
+        """Check if JSON documents are decoded"""
+
+        for sample in SAMPLES:
+            doc = json.dumps(sample)
+            self.assertEqual(self.codec.loads(doc), sample)
+            self.assertEqual(self.codec.loads(doc.encode('utf-8')), sample)
+
+    def test_loads_perceval_values(self):
+        """Check if big integers and lone surrogates are decoded like the standard library"""
+
+        docs = [
+            '{"big": 123456789012345678901234567890, "negative": -123456789012345678901234567890}',
+            '{"message": "invalid \\udcff name", "pair": "\\ud83d\\ude00"}',
+        ]
+
+        for doc in docs:
+            expected = json.loads(doc)
+            self.assertEqual(self.codec.loads(doc), expected)
+            self.assertEqual(self.codec.loads(doc.encode('utf-8')), expected)
+            self.assertEqual(self.codec.dumps(self.codec.loads(doc), json_line=True),
+                             self.stdlib.dumps(expected, json_line=True))
+
+    def test_pickle(self):
+        """Check if codecs can be sent to other processes"""
+
+        codec = pickle.loads(pickle.dumps(self.codec))
+
+        self.assertIsInstance(codec, self.codec_class)
+        self.assertEqual(codec.dumps(SAMPLES[0], json_line=True),
+                         self.stdlib.dumps(SAMPLES[0], json_line=True))
+
+    def test_dumps_json_line(self):
+        """Check if the output is equal to the standard library output"""
+
+        for sample in SAMPLES:
+            self.assertEqual(self.codec.dumps(sample, json_line=True),
+                             self.stdlib.dumps(sample, json_line=True))
+
+    def test_dumps_indented(self):
+        """Check if the indented output is equal to the standard library output"""
+
+        for sample in SAMPLES:
+            self.assertEqual(self.codec.dumps(sample),
+                             self.stdlib.dumps(sample))
+
+    def test_dumps_lone_surrogates(self):
+        """Check if strings with lone surrogates are encoded"""
+
+        sample = {"name": "invalid \udc80 name"}
+
+        self.assertEqual(self.codec.dumps(sample, json_line=True),
+                         self.stdlib.dumps(sample, json_line=True))
+
+    def test_dumps_non_finite_floats(self):
+        """Check if NaN and infinite floats are encoded like the standard library"""
+
+        samples = [
+            {'value': float('nan')},
+            {'values': [1.5, None, float('inf')], 'empty': None},
+            {'data': {'ratios': (float('-inf'), 0.5)}, 'other': None},
+            {'value': None, 'ratio': 0.5},
+        ]
+
+        for sample in samples:
+            self.assertEqual(self.codec.dumps(sample, json_line=True),
+                             self.stdlib.dumps(sample, json_line=True))
+            self.assertEqual(self.codec.dumps(sample),
+                             self.stdlib.dumps(sample))
+
+    def test_dumps_git_items(self):
+        """Check if the output of Perceval items is the same"""
+
+        with open('data/git_commits.txt', 'r') as fd:
+            items = [json.loads(line) for line in fd]
+
+        for item in items:
+            self.assertEqual(self.codec.dumps(item, json_line=True),
+                             self.stdlib.dumps(item, json_line=True))
+
+
+@unittest.skipUnless('orjson' in available_codecs(), "orjson is not installed")
+class TestOrjsonCodec(CodecOutputTestMixin, unittest.TestCase):
+    """Unit tests for OrjsonCodec class"""
+
+    codec_class = OrjsonCodec
+
+
+@unittest.skipUnless('orjson' in available_codecs(), "orjson is not installed")
+class TestOrjsonCodecWithoutUjson(CodecOutputTestMixin, unittest.TestCase):
+    """Unit tests for OrjsonCodec class when ujson is not installed"""
+
+    codec_class = OrjsonCodec
+
+    def setUp(self):
+        for name, value in (('ujson', None), ('_import_ujson', lambda: False)):
+            patcher = unittest.mock.patch(f'chronicler.codec.{name}', value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        super().setUp()
+
+
+@unittest.skipUnless('ujson' in available_codecs(), "ujson is not installed")
+class TestUjsonCodec(CodecOutputTestMixin, unittest.TestCase):
+    """Unit tests for UjsonCodec class"""
+
+    codec_class = UjsonCodec
+
+
+class TestGetCodec(unittest.TestCase):
+    """Unit tests for get_codec function"""
+
+    def test_get_codec(self):
+        """Check if the codec is returned by name"""
+
+        codec = get_codec('stdlib')
+        self.assertIsInstance(codec, JSONCodec)
+        self.assertEqual(codec.name, 'stdlib')
+
+    def test_auto(self):
+        """Check if the fastest codec available is returned"""
+
+        codec = get_codec('auto')
+        self.assertEqual(codec.name, available_codecs()[0])
+
+        codec = get_codec()
+        self.assertEqual(codec.name, available_codecs()[0])
+
+    def test_available_codecs(self):
+        """Check if stdlib is always available and the last option"""
+
+        codecs = available_codecs()
+        self.assertEqual(codecs[-1], 'stdlib')
+
+    def test_unknown_codec(self):
+        """Check if an exception is raised when the codec does not exist"""
+
+        with self.assertRaisesRegex(ValueError, "Unknown codec 'fake'"):
+            get_codec('fake')
+
+    def test_codec_not_available(self):
+        """Check if an exception is raised when the library is not installed"""
+
+        with unittest.mock.patch('chronicler.codec.orjson', None), \
+                unittest.mock.patch('chronicler.codec._import_orjson', return_value=False):
+            with self.assertRaisesRegex(ValueError, "Codec 'orjson' is not available"):
+                get_codec('orjson')
+            self.assertNotIn('orjson', available_codecs())
+
+
+if __name__ == '__main__':
+    unittest.main()
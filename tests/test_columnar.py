@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import datetime
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+from chronicler.eventizer import Event, eventize
+from chronicler.columnar import (ColumnarWriter,
+                                 FAMILY_COMMIT,
+                                 available_columnar_formats,
+                                 event_families)
+
+if importlib.util.find_spec('pyarrow'):
+    import pyarrow.ipc
+    import pyarrow.parquet
+else:
+    pyarrow = None
+
+
+def read_items(filename):
+    with open(filename, 'r') as fd:
+        return [json.loads(line) for line in fd]
+
+
+@unittest.skipUnless(pyarrow, "pyarrow is not installed")
+class TestColumnarWriter(unittest.TestCase):
+    """Unit tests for ColumnarWriter class"""
+
+    def setUp(self):
+        self.events = list(eventize('git', read_items('data/git_commits.txt'), compact=True))
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.dirpath = self.tmpdir.name
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_events(self, events, **kwargs):
+        with ColumnarWriter(self.dirpath, **kwargs) as writer:
+            for event in events:
+                writer.write(event)
+        return writer
+
+    def test_available_formats(self):
+        """Check if the columnar formats are available when pyarrow is installed"""
+
+        self.assertListEqual(available_columnar_formats(), ['parquet', 'arrow'])
+
+    def test_families(self):
+        """Check if events are written to the file of their family"""
+
+        writer = self.write_events(self.events)
+
+        self.assertListEqual(sorted(os.listdir(self.dirpath)),
+                             ['commit.parquet', 'file_action.parquet', 'identity.parquet'])
+        self.assertListEqual(sorted(writer.paths),
+                             sorted(os.path.join(self.dirpath, name) for name in os.listdir(self.dirpath)))
+
+        ids = []
+        for path in writer.paths:
+            family = os.path.basename(path).split('.')[0]
+            table = pyarrow.parquet.read_table(path)
+            for event_type in table.column('type').to_pylist():
+                self.assertEqual(event_families()[event_type], family)
+            ids.extend(table.column('id').to_pylist())
+
+        self.assertListEqual(sorted(ids), sorted(event.id for event in self.events))
+
+    def test_typed_columns(self):
+        """Check if numbers and times are written with their types"""
+
+        self.write_events(self.events)
+
+        table = pyarrow.parquet.read_table(os.path.join(self.dirpath, 'file_action.parquet'))
+        self.assertEqual(table.schema.field('time').type, pyarrow.timestamp('us', tz='UTC'))
+        self.assertEqual(table.schema.field('added_lines').type, pyarrow.int64())
+        self.assertEqual(table.schema.field('similarity').type, pyarrow.int32())
+
+        row = table.slice(0, 1).to_pylist()[0]
+        self.assertEqual(row['id'], '1cfb8955e9bdab98dc4cf120985839683a01a310')
+        self.assertEqual(row['linked_event'], '2abc82e1fb2917e2fb2d7018dba6fb4b4a8c29f0')
+        self.assertEqual(row['time'], datetime.datetime(2014, 2, 12, 6, 10, 39, tzinfo=datetime.timezone.utc))
+        self.assertEqual(row['filename'], 'aaa/otherthing.renamed')
+        self.assertEqual(row['added_lines'], 1)
+        self.assertEqual(row['deleted_lines'], 0)
+        self.assertIsNone(row['similarity'])
+
+        table = pyarrow.parquet.read_table(os.path.join(self.dirpath, 'commit.parquet'))
+        row = table.slice(0, 1).to_pylist()[0]
+        self.assertEqual(row['commit'], '456a68ee1407a77f3e804a30dff245bb6c6b872f')
+        self.assertListEqual(row['parents'], ['ce8e0b86a1e9877f42fe9453ede418519115f367',
+                                              '51a3b654f252210572297f47597b31527c475fb8'])
+        self.assertIsNone(row['signed_off_by'])
+        self.assertDictEqual(row['files'][0], {
+            'action': 'MR',
+            'file': 'aaa/otherthing.renamed',
+            'new_file': None,
+            'added_lines': 1,
+            'deleted_lines': 0,
+            'modes': ['100644', '100644', '100644'],
+            'indexes': ['e69de29...', '58a6c75...', '58a6c75...'],
+        })
+
+        table = pyarrow.parquet.read_table(os.path.join(self.dirpath, 'identity.parquet'))
+        self.assertSetEqual(set(table.column('role').to_pylist()), {'authored_by', 'committed_by'})
+
+    def test_cloudevents(self):
+        """Check if CloudEvents are written like events"""
+
+        self.write_events(self.events)
+        expected = {name: pyarrow.parquet.read_table(os.path.join(self.dirpath, name))
+                    for name in os.listdir(self.dirpath)}
+
+        with tempfile.TemporaryDirectory() as dirpath:
+            with ColumnarWriter(dirpath) as writer:
+                for event in eventize('git', read_items('data/git_commits.txt')):
+                    writer.write(event)
+
+            for name, table in expected.items():
+                self.assertTrue(pyarrow.parquet.read_table(os.path.join(dirpath, name)).equals(table))
+
+    def test_binary_files(self):
+        """Check if the lines of binary files and commits without files are null"""
+
+        event = Event(id='1', type='org.grimoirelab.events.git.file.added',
+                      source='src', time=0.0, linked_event='0',
+                      data={'filename': 'image.png', 'new_filename': None,
+                            'modes': None, 'indexes': None, 'similarity': None,
+                            'added_lines': '-', 'deleted_lines': '-'})
+        commit = Event(id='0', type='org.grimoirelab.events.git.commit', source='src',
+                       time=0.0, data={'commit': 'abc'})
+
+        self.write_events([event, commit])
+
+        table = pyarrow.parquet.read_table(os.path.join(self.dirpath, 'file_action.parquet'))
+        row = table.to_pylist()[0]
+        self.assertIsNone(row['added_lines'])
+        self.assertIsNone(row['deleted_lines'])
+
+        table = pyarrow.parquet.read_table(os.path.join(self.dirpath, 'commit.parquet'))
+        row = table.to_pylist()[0]
+        self.assertIsNone(row['files'])
+        self.assertEqual(row['time'], datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc))
+
+    def test_other_events(self):
+        """Check if events of other types are written with their data as JSON"""
+
+        events = [
+            Event(id='1', type='org.example.event', source='src', time=1.5, data={'b': 1, 'a': [2]}),
+            Event(id='2', type='org.example.other', source='src', time=None, data=None),
+        ]
+
+        self.write_events(events)
+
+        self.assertListEqual(os.listdir(self.dirpath), ['other.parquet'])
+        rows = pyarrow.parquet.read_table(os.path.join(self.dirpath, 'other.parquet')).to_pylist()
+        self.assertEqual(rows[0]['data'], '{"a": [2], "b": 1}')
+        self.assertEqual(rows[0]['time'], datetime.datetime(1970, 1, 1, 0, 0, 1, 500000,
+                                                            tzinfo=datetime.timezone.utc))
+        self.assertIsNone(rows[1]['data'])
+        self.assertIsNone(rows[1]['time'])
+
+    def test_batch_size(self):
+        """Check if row groups have the size of the batches"""
+
+        self.write_events(self.events, batch_size=4)
+
+        metadata = pyarrow.parquet.ParquetFile(os.path.join(self.dirpath, 'identity.parquet')).metadata
+        self.assertListEqual([metadata.row_group(n).num_rows for n in range(metadata.num_row_groups)],
+                             [4, 4, 4, 4, 4])
+
+        metadata = pyarrow.parquet.ParquetFile(os.path.join(self.dirpath, 'commit.parquet')).metadata
+        self.assertListEqual([metadata.row_group(n).num_rows for n in range(metadata.num_row_groups)],
+                             [4, 4, 2])
+
+    def test_arrow(self):
+        """Check if events are written to Arrow IPC files"""
+
+        self.write_events(self.events, format='arrow', batch_size=4)
+
+        self.assertListEqual(sorted(os.listdir(self.dirpath)),
+                             ['commit.arrow', 'file_action.arrow', 'identity.arrow'])
+
+        with pyarrow.ipc.open_file(os.path.join(self.dirpath, 'commit.arrow')) as reader:
+            self.assertEqual(reader.num_record_batches, 3)
+            table = reader.read_all()
+
+        self.assertEqual(table.num_rows, 10)
+        self.assertEqual(table.schema.field('files').type.value_type.field('added_lines').type,
+                         pyarrow.int64())
+        self.assertListEqual(table.column('id').to_pylist(),
+                             [event.id for event in self.events if event_families()[event.type] == FAMILY_COMMIT])
+
+    def test_existing_files(self):
+        """Check if an error is raised when the directory already has files of the format"""
+
+        self.write_events(self.events[:1])
+
+        with self.assertRaisesRegex(ValueError, "already has '.parquet' files"):
+            ColumnarWriter(self.dirpath)
+
+        # Files of other formats don't matter
+        ColumnarWriter(self.dirpath, format='arrow').close()
+
+    def test_invalid_params(self):
+        """Check if an error is raised when the format or the batch size are not valid"""
+
+        with self.assertRaisesRegex(ValueError, "Unknown columnar format 'csv'"):
+            ColumnarWriter(self.dirpath, format='csv')
+
+        with self.assertRaisesRegex(ValueError, "'batch_size' must be greater than 0"):
+            ColumnarWriter(self.dirpath, batch_size=0)
+
+
+class TestColumnarWriterNoPyarrow(unittest.TestCase):
+    """Unit tests for ColumnarWriter class when pyarrow is not installed"""
+
+    def test_not_available(self):
+        """Check if an error is raised when pyarrow can't be imported"""
+
+        with tempfile.TemporaryDirectory() as dirpath, \
+                unittest.mock.patch('chronicler.columnar._import_pyarrow', return_value=False):
+            with self.assertRaisesRegex(ValueError, "install 'pyarrow' package"):
+                ColumnarWriter(dirpath, format='parquet')
+
+            self.assertListEqual(os.listdir(dirpath), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import tempfile
+import unittest
+
+from chronicler.compression import (BackgroundReader,
+                                    available_compressions,
+                                    detect_compression,
+                                    open_input,
+                                    open_output)
+from chronicler.reader import read_lines
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+COMPRESSORS = {
+    'gzip': gzip.compress,
+    'bz2': bz2.compress,
+    'xz': lzma.compress,
+    'zstd': zstandard.compress if zstandard else None,
+}
+
+DECOMPRESSORS = {
+    'gzip': gzip.decompress,
+    'bz2': bz2.decompress,
+    'xz': lzma.decompress,
+    'zstd': zstandard.decompress if zstandard else None,
+}
+
+
+class FailingReader(io.BytesIO):
+    """Stream that fails after the first read"""
+
+    def read(self, size=-1):
+        if self.tell() > 0:
+            raise EOFError("corrupted stream")
+        return super().read(size)
+
+
+class TestOpenInput(unittest.TestCase):
+    """Unit tests for open_input function"""
+
+    def setUp(self):
+        with open('data/git_commits.txt', 'rb') as fd:
+            self.data = fd.read()
+
+    def test_detect_compression(self):
+        """Check if the compression format is detected from the first bytes"""
+
+        for name in available_compressions():
+            fd = io.BufferedReader(io.BytesIO(COMPRESSORS[name](self.data)))
+            self.assertEqual(detect_compression(fd), name)
+            self.assertEqual(fd.tell(), 0)
+
+        fd = io.BufferedReader(io.BytesIO(self.data))
+        self.assertIsNone(detect_compression(fd))
+
+    def test_compressed(self):
+        """Check if compressed streams are decompressed"""
+
+        for name in available_compressions():
+            fd = io.BytesIO(COMPRESSORS[name](self.data))
+            with open_input(fd) as reader:
+                self.assertIsInstance(reader, BackgroundReader)
+                self.assertEqual(reader.read(), self.data)
+
+    def test_read_lines(self):
+        """Check if lines of compressed streams are read"""
+
+        expected = self.data.splitlines()
+
+        for name in available_compressions():
+            fd = io.BytesIO(COMPRESSORS[name](self.data))
+            with open_input(fd) as reader:
+                reader.block_size = 100
+                self.assertListEqual(list(read_lines(reader)), expected)
+
+    def test_multiple_streams(self):
+        """Check if concatenated gzip streams are read"""
+
+        data = gzip.compress(b'{"a": 1}\n') + gzip.compress(b'{"b": 2}\n')
+
+        with open_input(io.BytesIO(data)) as reader:
+            self.assertEqual(reader.read(), b'{"a": 1}\n{"b": 2}\n')
+
+    def test_uncompressed_file(self):
+        """Check if uncompressed files are returned as they are"""
+
+        with open('data/git_commits.txt', 'rb') as fd:
+            self.assertIs(open_input(fd), fd)
+
+    def test_empty(self):
+        """Check if an empty stream is not taken as compressed"""
+
+        fd = open_input(io.BytesIO(b''))
+        self.assertEqual(fd.read(), b'')
+
+    @unittest.skipIf(zstandard, "zstandard is installed")
+    def test_zstd_not_available(self):
+        """Check if an error is raised when zstd input can't be decompressed"""
+
+        with self.assertRaisesRegex(ValueError, "Input is compressed with 'zstd'"):
+            open_input(io.BytesIO(b'\x28\xb5\x2f\xfd\x00\x00'))
+
+
+class TestBackgroundReader(unittest.TestCase):
+    """Unit tests for BackgroundReader class"""
+
+    def test_read(self):
+        """Check if data is read in blocks"""
+
+        data = bytes(range(256)) * 10
+
+        with BackgroundReader(io.BytesIO(data), block_size=100, queue_size=2) as reader:
+            self.assertEqual(reader.read1(1000), data[:100])
+            self.assertEqual(reader.read1(10), data[100:110])
+            self.assertEqual(reader.read(500), data[110:610])
+            self.assertEqual(reader.read(), data[610:])
+            self.assertEqual(reader.read(), b'')
+            self.assertEqual(reader.read1(), b'')
+
+    def test_error(self):
+        """Check if errors are raised after the data read before"""
+
+        reader = BackgroundReader(FailingReader(b'abcdef'), block_size=3)
+
+        self.assertEqual(reader.read1(), b'abc')
+        with self.assertRaisesRegex(EOFError, "corrupted stream"):
+            reader.read1()
+        self.assertEqual(reader.read1(), b'')
+
+        reader.close()
+
+    def test_close(self):
+        """Check if the reader can be closed before reading all the data"""
+
+        reader = BackgroundReader(io.BytesIO(b'a' * 10000), block_size=1, queue_size=1)
+        self.assertEqual(reader.read1(), b'a')
+        reader.close()
+
+        self.assertFalse(reader._thread.is_alive())
+
+
+class TestOpenOutput(unittest.TestCase):
+    """Unit tests for open_output function"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_compressions(self):
+        """Check if data is compressed with the given format"""
+
+        for name in available_compressions():
+            fd = io.BytesIO()
+            with open_output(fd, compression=name) as output:
+                output.write(b'{"a": 1}\n')
+
+            self.assertFalse(fd.closed)
+            self.assertEqual(DECOMPRESSORS[name](fd.getvalue()), b'{"a": 1}\n')
+
+    def test_extension(self):
+        """Check if the format is chosen from the file extension"""
+
+        extensions = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz', '.zst': 'zstd'}
+
+        for extension, name in extensions.items():
+            if name not in available_compressions():
+                continue
+
+            filepath = os.path.join(self.tmpdir.name, 'events.json' + extension)
+            with open(filepath, 'wb') as fd:
+                with open_output(fd) as output:
+                    output.write(b'{"a": 1}\n')
+
+            with open(filepath, 'rb') as fd:
+                self.assertEqual(DECOMPRESSORS[name](fd.read()), b'{"a": 1}\n')
+
+    def test_not_compressed(self):
+        """Check if the stream is returned when data is not compressed"""
+
+        filepath = os.path.join(self.tmpdir.name, 'events.json')
+        with open(filepath, 'wb') as fd:
+            self.assertIs(open_output(fd), fd)
+            self.assertIs(open_output(fd, compression=None), fd)
+
+        fd = io.BytesIO()
+        self.assertIs(open_output(fd), fd)
+
+    def test_level(self):
+        """Check if the compression level is used"""
+
+        data = b''.join(b'{"id": %d}\n' % i for i in range(10000))
+
+        sizes = []
+        for level in (1, 9):
+            fd = io.BytesIO()
+            with open_output(fd, compression='gzip', level=level) as output:
+                output.write(data)
+            sizes.append(len(fd.getvalue()))
+            self.assertEqual(gzip.decompress(fd.getvalue()), data)
+
+        self.assertGreater(sizes[0], sizes[1])
+
+    def test_invalid_parameters(self):
+        """Check if an error is raised when the parameters are not valid"""
+
+        with self.assertRaisesRegex(ValueError, "Unknown compression 'zip'"):
+            open_output(io.BytesIO(), compression='zip')
+
+        with self.assertRaisesRegex(ValueError, "'gzip' compression level must be between 0 and 9"):
+            open_output(io.BytesIO(), compression='gzip', level=10)
+
+        with self.assertRaisesRegex(ValueError, "'bz2' compression level must be between 1 and 9"):
+            open_output(io.BytesIO(), compression='bz2', level=0)
+
+    @unittest.skipIf(zstandard, "zstandard is installed")
+    def test_zstd_not_available(self):
+        """Check if an error is raised when zstd is not installed"""
+
+        with self.assertRaisesRegex(ValueError, "Compression 'zstd' is not available"):
+            open_output(io.BytesIO(), compression='zstd')
+
+
+if __name__ == '__main__':
+    unittest.main()
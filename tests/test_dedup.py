@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import json
+import random
+import unittest
+
+from chronicler.dedup import BloomFilter, DuplicateFilter
+from chronicler.eventizer import eventize, get_eventizer, uuid
+
+
+class TestBloomFilter(unittest.TestCase):
+    """Unit tests for BloomFilter class"""
+
+    def test_add(self):
+        """Check if strings added are found"""
+
+        bloom = BloomFilter(1000, 0.001)
+
+        values = [uuid(str(i)) for i in range(1000)]
+        for value in values:
+            self.assertFalse(bloom.add(value))
+
+        for value in values:
+            self.assertIn(value, bloom)
+            self.assertTrue(bloom.add(value))
+
+        self.assertEqual(len(bloom), 1000)
+
+    def test_error_rate(self):
+        """Check if the rate of false positives is close to the expected one"""
+
+        bloom = BloomFilter(10000, 0.01)
+        for i in range(10000):
+            bloom.add(uuid('added', str(i)))
+
+        false_positives = sum(uuid('other', str(i)) in bloom for i in range(10000))
+        self.assertLess(false_positives, 200)
+
+    def test_size(self):
+        """Check if the size of the filter depends on capacity and error rate"""
+
+        bloom = BloomFilter(1000000, 1e-6)
+        self.assertEqual(bloom.n_bits, 28755176)
+        self.assertEqual(bloom.n_hashes, 20)
+
+    def test_invalid_parameters(self):
+        """Check if an error is raised when the parameters are not valid"""
+
+        with self.assertRaisesRegex(ValueError, "'capacity' must be greater than 0"):
+            BloomFilter(0, 0.1)
+
+        with self.assertRaisesRegex(ValueError, "'error_rate' must be between 0 and 1"):
+            BloomFilter(10, 1)
+
+
+class TestDuplicateFilter(unittest.TestCase):
+    """Unit tests for DuplicateFilter class"""
+
+    def setUp(self):
+        with open('data/git_commits.txt', 'r') as fd:
+            self.items = [json.loads(line) for line in fd]
+
+    def test_filter(self):
+        """Check if duplicated items are dropped"""
+
+        dedup = DuplicateFilter()
+
+        items = list(dedup.filter(self.items + self.items[2:5] + self.items))
+        self.assertListEqual(items, self.items)
+        self.assertEqual(dedup.duplicates, len(self.items) + 3)
+        self.assertTrue(dedup.is_exact)
+
+    def test_bloom_filter(self):
+        """Check if UUIDs are moved to a Bloom filter when the set is full"""
+
+        dedup = DuplicateFilter(exact_size=3, bloom_capacity=1000, bloom_error_rate=1e-6)
+
+        items = list(dedup.filter(self.items[:3]))
+        self.assertListEqual(items, self.items[:3])
+        self.assertTrue(dedup.is_exact)
+
+        items = list(dedup.filter(self.items + self.items))
+        self.assertFalse(dedup.is_exact)
+        self.assertListEqual(items, self.items[3:])
+        self.assertEqual(dedup.duplicates, 3 + len(self.items))
+
+    def test_random_stream(self):
+        """Check if the same items are dropped with the set and the Bloom filter"""
+
+        rnd = random.Random(0)
+        uuids = [uuid(str(rnd.randint(0, 5000))) for _ in range(10000)]
+        items = [{'uuid': value} for value in uuids]
+
+        exact = DuplicateFilter(exact_size=len(items))
+        bloom = DuplicateFilter(exact_size=100, bloom_capacity=10000)
+
+        self.assertListEqual(list(bloom.filter(items)), list(exact.filter(items)))
+        self.assertEqual(bloom.duplicates, exact.duplicates)
+        self.assertEqual(exact.duplicates, len(uuids) - len(set(uuids)))
+
+    def test_items_without_uuid(self):
+        """Check if items without uuid are not dropped"""
+
+        dedup = DuplicateFilter()
+        items = [{'id': 1}, {'id': 1}, {'uuid': None}]
+
+        self.assertListEqual(list(dedup.filter(items)), items)
+        self.assertEqual(dedup.duplicates, 0)
+
+    def test_eventize(self):
+        """Check if duplicated items don't generate events"""
+
+        expected = list(eventize('git', self.items, compact=True))
+
+        dedup = DuplicateFilter()
+        events = list(eventize('git', self.items + self.items, compact=True, dedup=dedup))
+        self.assertListEqual(events, expected)
+        self.assertEqual(dedup.duplicates, len(self.items))
+
+        dedup = DuplicateFilter()
+        events = list(get_eventizer('git').eventize(self.items[:1] * 3, dedup=dedup))
+        self.assertEqual(len(events), len(get_eventizer('git').eventize_item(self.items[0])))
+        self.assertEqual(dedup.duplicates, 2)
+
+    def test_invalid_parameters(self):
+        """Check if an error is raised when the parameters are not valid"""
+
+        with self.assertRaisesRegex(ValueError, "'exact_size' must be greater than or equal to 0"):
+            DuplicateFilter(exact_size=-1)
+
+        with self.assertRaisesRegex(ValueError, "'bloom_capacity' must be greater than 0"):
+            DuplicateFilter(bloom_capacity=0)
+
+        with self.assertRaisesRegex(ValueError, "'bloom_error_rate' must be between 0 and 1"):
+            DuplicateFilter(bloom_error_rate=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -16,15 +16,32 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 #
 
+import hashlib
+import json
 import os
+import random
 import unittest
+import unittest.mock
 
 from typing import Any
 
+import cloudevents.conversion
+
 from cloudevents.http import CloudEvent
 
-from chronicler.eventizer import (Eventizer,
-                                  eventize)
+import chronicler.eventizer as chronicler_eventizer
+
+from chronicler.eventizer import (Event,
+                                  EventTypeFilter,
+                                  Eventizer,
+                                  build_eventizers_manifest,
+                                  clear_eventizers_registry,
+                                  eventize,
+                                  get_eventizer,
+                                  to_cloudevent,
+                                  uuid,
+                                  uuids)
+from chronicler.stats import EventizerStats
 
 
 class EventizerTestingClass(Eventizer):
@@ -40,6 +57,162 @@ class EventizerTestingClass(Eventizer):
         return [CloudEvent(attributes, raw_item['data'])]
 
 
+class CompactEventizerTestingClass(Eventizer):
+    """Subclass of Eventizer producing compact events for testing"""
+
+    def eventize_item(self, raw_item: dict[str, Any]) -> list[Event]:
+        return [Event(id=raw_item['id'],
+                      type="test_event",
+                      source="test",
+                      time=raw_item['time'],
+                      data=raw_item['data'])]
+
+
+class TestEvent(unittest.TestCase):
+    """Unit tests for Event class"""
+
+    def test_attributes(self):
+        """Check if attributes can be read as keys and as attributes"""
+
+        event = Event(id='1', type='test_event', source='test',
+                      time='2024-06-24T12:00:00Z', data={'a': 1},
+                      linked_event='0')
+
+        self.assertEqual(event['id'], '1')
+        self.assertEqual(event['type'], 'test_event')
+        self.assertEqual(event['source'], 'test')
+        self.assertEqual(event['time'], '2024-06-24T12:00:00Z')
+        self.assertEqual(event['specversion'], '1.0')
+        self.assertEqual(event['linked_event'], '0')
+        self.assertEqual(event.id, '1')
+        self.assertEqual(event.linked_event, '0')
+        self.assertDictEqual(event.data, {'a': 1})
+        self.assertDictEqual(event.get_data(), {'a': 1})
+        self.assertEqual(len(event), 6)
+        self.assertIn('linked_event', event)
+        self.assertIsNone(event.get('fake'))
+
+    def test_no_linked_event(self):
+        """Check if linked_event is not an attribute when it is not set"""
+
+        event = Event(id='1', type='test_event', source='test',
+                      time='2024-06-24T12:00:00Z')
+
+        self.assertNotIn('linked_event', event)
+        self.assertListEqual(sorted(event), ['id', 'source', 'specversion', 'time', 'type'])
+        self.assertIsNone(event.data)
+
+        with self.assertRaises(KeyError):
+            _ = event['linked_event']
+        self.assertEqual(event.get('linked_event', '0'), '0')
+
+    def test_unknown_keys(self):
+        """Check if keys that are not attributes of the event are not found"""
+
+        event = Event(id='1', type='test_event', source='test',
+                      time='2024-06-24T12:00:00Z', data={'a': 1})
+
+        for key in ('data', 'fake', '__slots__', '_get_attributes'):
+            with self.assertRaises(KeyError):
+                _ = event[key]
+            self.assertNotIn(key, event)
+            self.assertEqual(event.get(key, 'default'), 'default')
+
+        self.assertIn('specversion', event)
+        self.assertEqual(event.get('specversion'), '1.0')
+
+    def test_slots(self):
+        """Check if events don't have a dict of attributes"""
+
+        event = Event(id='1', type='test_event', source='test',
+                      time='2024-06-24T12:00:00Z')
+
+        with self.assertRaises(AttributeError):
+            event.category = 'test'
+
+    def test_to_cloudevent(self):
+        """Check if the event is converted into a CloudEvent"""
+
+        event = Event(id='1', type='test_event', source='test',
+                      time='2024-06-24T12:00:00Z', data={'a': 1},
+                      linked_event='0')
+
+        attributes = {
+            'id': '1',
+            'type': 'test_event',
+            'source': 'test',
+            'time': '2024-06-24T12:00:00Z',
+            'linked_event': '0',
+        }
+        expected = CloudEvent(attributes, {'a': 1})
+
+        cloudevent = event.to_cloudevent()
+        self.assertIsInstance(cloudevent, CloudEvent)
+        self.assertEqual(cloudevent, expected)
+        self.assertEqual(event, expected)
+        self.assertIs(to_cloudevent(expected), expected)
+        self.assertEqual(to_cloudevent(event), expected)
+
+    def test_to_dict(self):
+        """Check if the dict is the same as the one of the CloudEvent"""
+
+        event = Event(id='1', type='test_event', source='test',
+                      time='2024-06-24T12:00:00Z', data={'a': 1},
+                      linked_event='0')
+
+        self.assertDictEqual(event.to_dict(),
+                             cloudevents.conversion.to_dict(event.to_cloudevent()))
+
+
+class TypedEventizerTestingClass(Eventizer):
+    """Subclass of Eventizer producing events of several types for testing"""
+
+    def eventize_item(self, raw_item: dict[str, Any]) -> list[Event]:
+        return [Event(id=f"{raw_item['id']}-{event_type}",
+                      type=event_type,
+                      source="test",
+                      time=raw_item['time'])
+                for event_type in ('test.item', 'test.item.created', 'test.user.created')]
+
+
+class TestEventTypeFilter(unittest.TestCase):
+    """Unit tests for EventTypeFilter class"""
+
+    def test_include(self):
+        """Check if types matching any include pattern are selected"""
+
+        type_filter = EventTypeFilter(['*.created', 'test.item'])
+
+        self.assertTrue(type_filter('test.item'))
+        self.assertTrue(type_filter('test.item.created'))
+        self.assertTrue(type_filter('test.user.created'))
+        self.assertFalse(type_filter('test.item.deleted'))
+        self.assertFalse(type_filter('other.test.item'))
+
+    def test_exclude(self):
+        """Check if types matching any exclude pattern are not selected"""
+
+        type_filter = EventTypeFilter(['!test.user.*'])
+
+        self.assertTrue(type_filter('test.item'))
+        self.assertFalse(type_filter('test.user.created'))
+
+        type_filter = EventTypeFilter(['test.*', '!*.created'])
+
+        self.assertTrue(type_filter('test.item'))
+        self.assertFalse(type_filter('test.item.created'))
+        self.assertFalse(type_filter('other.item'))
+
+    def test_any(self):
+        """Check if it's checked whether any of the types is selected"""
+
+        type_filter = EventTypeFilter(['*.created'])
+
+        self.assertTrue(type_filter.any(['test.item', 'test.item.created']))
+        self.assertFalse(type_filter.any(['test.item', 'test.item.deleted']))
+        self.assertFalse(type_filter.any([]))
+
+
 class TestEventizer(unittest.TestCase):
     """Unit tests for Eventizer class"""
 
@@ -95,6 +268,62 @@ class TestEventizer(unittest.TestCase):
 
         self.assertEqual(len(events), 0)
 
+    def test_eventize_batch(self):
+        """Check if a batch of items generates the same events as eventize"""
+
+        eventizer = CompactEventizerTestingClass()
+
+        raw_items = [
+            {'id': 1, 'time': '2024-06-24T12:00:00Z', 'data': 'item1 data'},
+            {'id': 2, 'time': '2024-06-24T13:00:00Z', 'data': 'item2 data'}
+        ]
+        events = eventizer.eventize_batch(iter(raw_items))
+
+        self.assertIsInstance(events, list)
+        self.assertListEqual(events, list(eventizer.eventize(raw_items)))
+        self.assertListEqual(eventizer.eventize_batch([]), [])
+
+    def test_types(self):
+        """Check if only the events of the selected types are generated"""
+
+        raw_items = [
+            {'id': 1, 'time': '2024-06-24T12:00:00Z'},
+            {'id': 2, 'time': '2024-06-24T13:00:00Z'}
+        ]
+
+        eventizer = TypedEventizerTestingClass()
+        self.assertIsNone(eventizer.type_filter)
+        self.assertEqual(len(list(eventizer.eventize(raw_items))), 6)
+
+        eventizer = TypedEventizerTestingClass(types=['*.created', '!test.user.*'])
+
+        events = list(eventizer.eventize(raw_items))
+        self.assertListEqual([event.id for event in events],
+                             ['1-test.item.created', '2-test.item.created'])
+        self.assertListEqual(eventizer.eventize_batch(raw_items), events)
+
+    def test_stats(self):
+        """Check if items and events are added to the statistics"""
+
+        raw_items = [
+            {'id': 1, 'uuid': 'a', 'time': '2024-06-24T12:00:00Z'},
+            {'id': 2, 'uuid': 'b', 'time': '2024-06-24T13:00:00Z'}
+        ]
+
+        eventizer = TypedEventizerTestingClass(types=['!test.user.*'])
+        expected = list(eventizer.eventize(raw_items))
+
+        stats = EventizerStats()
+        events = list(eventizer.eventize(raw_items, stats=stats))
+
+        self.assertListEqual(events, expected)
+        self.assertEqual(stats.items, 2)
+        self.assertEqual(stats.events, 4)
+        self.assertDictEqual(dict(stats.events_by_type),
+                             {'test.item': 2, 'test.item.created': 2})
+        self.assertListEqual(sorted(uuid for uuid, _ in stats.slowest_items()), ['a', 'b'])
+        self.assertListEqual(list(stats.stages), ['eventize'])
+
 
 class TestEventize(unittest.TestCase):
     """Unit tests for eventize function"""
@@ -128,6 +357,59 @@ class TestEventize(unittest.TestCase):
         self.assertEqual(events[1]['time'], '2024-06-24T13:00:00Z')
         self.assertEqual(events[1].data, 'item2 data')
 
+    def test_eventize_cloudevents(self):
+        """Check if compact events are converted into CloudEvents"""
+
+        raw_items = [
+            {'id': 1, 'time': '2024-06-24T12:00:00Z', 'data': 'item1 data'},
+        ]
+
+        with unittest.mock.patch('chronicler.eventizer.get_eventizer',
+                                 return_value=CompactEventizerTestingClass()):
+            events = list(eventize('eventizer_test', iter(raw_items)))
+            self.assertEqual(len(events), 1)
+            self.assertIsInstance(events[0], CloudEvent)
+            self.assertEqual(events[0]['id'], 1)
+
+            events = list(eventize('eventizer_test', iter(raw_items), compact=True))
+            self.assertEqual(len(events), 1)
+            self.assertIsInstance(events[0], Event)
+            self.assertEqual(events[0]['id'], 1)
+
+    def test_eventize_stats(self):
+        """Check if the conversion into CloudEvents is added to the statistics"""
+
+        raw_items = [
+            {'id': 1, 'time': '2024-06-24T12:00:00Z', 'data': 'item1 data'},
+        ]
+
+        with unittest.mock.patch('chronicler.eventizer.get_eventizer',
+                                 return_value=CompactEventizerTestingClass()):
+            stats = EventizerStats()
+            events = list(eventize('eventizer_test', iter(raw_items), stats=stats))
+            self.assertIsInstance(events[0], CloudEvent)
+            self.assertEqual(stats.items, 1)
+            self.assertListEqual(list(stats.stages), ['eventize', 'convert'])
+
+            stats = EventizerStats()
+            events = list(eventize('eventizer_test', iter(raw_items), compact=True, stats=stats))
+            self.assertIsInstance(events[0], Event)
+            self.assertListEqual(list(stats.stages), ['eventize'])
+
+    def test_eventize_types(self):
+        """Check if events are filtered by a list of types"""
+
+        raw_items = [
+            {'id': 1, 'time': '2024-06-24T12:00:00Z', 'data': 'item1 data'},
+            {'id': 2, 'time': '2024-06-24T13:00:00Z', 'data': 'item2 data'}
+        ]
+
+        events = list(eventize('eventizer_test', iter(raw_items), types=['test_*']))
+        self.assertListEqual([event['id'] for event in events], [1, 2])
+
+        events = list(eventize('eventizer_test', iter(raw_items), types=['other_*']))
+        self.assertListEqual(events, [])
+
     def test_eventizer_not_found(self):
         """Check if an exception is raised when an eventizer is not found"""
 
@@ -140,5 +422,251 @@ class TestEventize(unittest.TestCase):
             _ = list(eventize('fake_eventizer', raw_items))
 
 
+class TestGetEventizer(unittest.TestCase):
+    """Unit tests for get_eventizer function"""
+
+    def setUp(self) -> None:
+        os.environ['CHRONICLER_EVENTIZERS'] = 'events_test_pck'
+        clear_eventizers_registry()
+
+    def tearDown(self) -> None:
+        os.environ['CHRONICLER_EVENTIZERS'] = 'chronicler.events'
+        clear_eventizers_registry()
+
+    def test_get_eventizer(self):
+        """Check if the eventizer is found by its name"""
+
+        eventizer = get_eventizer('eventizer_test')
+
+        self.assertIsInstance(eventizer, Eventizer)
+        self.assertEqual(type(eventizer).__module__, 'events_test_pck.eventizer_test')
+
+    def test_instance_reused(self):
+        """Check if the same instance is returned in consecutive calls"""
+
+        eventizer = get_eventizer('eventizer_test')
+        self.assertIs(get_eventizer('eventizer_test'), eventizer)
+
+    def test_instance_reused_with_lists(self):
+        """Check if instances are reused when options are lists or sets"""
+
+        eventizer = get_eventizer('eventizer_test', types=['test_*', 'other_*'])
+        self.assertIs(get_eventizer('eventizer_test', types=['test_*', 'other_*']), eventizer)
+
+        eventizer = get_eventizer('eventizer_test', types={'test_*'})
+        self.assertIs(get_eventizer('eventizer_test', types={'test_*'}), eventizer)
+
+    def test_packages_walked_once(self):
+        """Check if packages are only walked the first time"""
+
+        with unittest.mock.patch('chronicler.eventizer._find_eventizers',
+                                 wraps=chronicler_eventizer._find_eventizers) as mock_find:
+            get_eventizer('eventizer_test')
+            get_eventizer('eventizer_test')
+
+            raw_items = iter([
+                {'id': 1, 'time': '2024-06-24T12:00:00Z', 'data': 'item1 data'}
+            ])
+            events = list(eventize('eventizer_test', raw_items))
+            self.assertEqual(len(events), 1)
+
+            self.assertEqual(mock_find.call_count, 1)
+
+    def test_registry_by_package(self):
+        """Check if eventizers are registered by top package name"""
+
+        get_eventizer('eventizer_test')
+
+        os.environ['CHRONICLER_EVENTIZERS'] = 'chronicler.events'
+
+        eventizer = get_eventizer('git')
+        self.assertEqual(type(eventizer).__name__, 'GitEventizer')
+
+        with self.assertRaisesRegex(ValueError, 'eventizer_test'):
+            get_eventizer('eventizer_test')
+
+    def test_clear_registry(self):
+        """Check if the registry is invalidated"""
+
+        eventizer = get_eventizer('eventizer_test')
+
+        clear_eventizers_registry('events_test_pck')
+
+        with unittest.mock.patch('chronicler.eventizer._find_eventizers',
+                                 wraps=chronicler_eventizer._find_eventizers) as mock_find:
+            new_eventizer = get_eventizer('eventizer_test')
+            self.assertEqual(mock_find.call_count, 1)
+
+        self.assertIsNot(new_eventizer, eventizer)
+
+    def test_get_eventizer_from_manifest(self):
+        """Check if packages are not walked when the eventizer is in the manifest"""
+
+        os.environ['CHRONICLER_EVENTIZERS'] = 'chronicler.events'
+
+        with unittest.mock.patch('chronicler.eventizer._find_eventizers') as mock_find:
+            eventizer = get_eventizer('git')
+            self.assertEqual(mock_find.call_count, 0)
+
+        self.assertEqual(type(eventizer).__name__, 'GitEventizer')
+
+    def test_instances_by_options(self):
+        """Check if an instance is created for each set of options"""
+
+        os.environ['CHRONICLER_EVENTIZERS'] = 'chronicler.events'
+
+        eventizer = get_eventizer('git')
+        eventizer_with_options = get_eventizer('git', identity_cache_size=10)
+
+        self.assertIsNot(eventizer, eventizer_with_options)
+        self.assertIs(get_eventizer('git', identity_cache_size=10), eventizer_with_options)
+        self.assertEqual(eventizer_with_options.identity_cache_info().maxsize, 10)
+
+    def test_eventizer_not_found(self):
+        """Check if an exception is raised when an eventizer is not found"""
+
+        with self.assertRaisesRegex(ValueError, "Unknown eventizer 'fake_eventizer'"):
+            get_eventizer('fake_eventizer')
+
+
+class TestEventizersManifest(unittest.TestCase):
+    """Unit tests for the manifest of eventizers"""
+
+    def test_build_manifest(self):
+        """Check if the manifest is built from the eventizers of a package"""
+
+        manifest = build_eventizers_manifest('events_test_pck')
+
+        expected = {
+            'eventizer_test': 'events_test_pck.eventizer_test:EventizerTestingClass'
+        }
+        self.assertDictEqual(manifest, expected)
+
+    def test_manifest_up_to_date(self):
+        """Check if the manifest of chronicler.events includes all the eventizers"""
+
+        import chronicler.events
+
+        manifest_path = os.path.join(chronicler.events.__path__[0], 'eventizers.json')
+
+        with open(manifest_path, 'r') as fd:
+            manifest = json.load(fd)
+
+        self.assertDictEqual(manifest, build_eventizers_manifest('chronicler.events'))
+
+
+def reference_uuid(*args):
+    """Original implementation of `uuid`, used to compare the results"""
+
+    def check_value(v):
+        if not isinstance(v, str):
+            raise ValueError("%s value is not a string instance" % str(v))
+        elif not v:
+            raise ValueError("value cannot be None or empty")
+        else:
+            return v
+
+    s = ':'.join(map(check_value, args))
+
+    sha1 = hashlib.sha1(s.encode('utf-8', errors='surrogateescape'))
+    return sha1.hexdigest()
+
+
+class TestUUID(unittest.TestCase):
+    """Unit tests for uuid and uuids functions"""
+
+    ALPHABET = 'abcXYZ019:-_ \t\nñéü€中文😀\udc80\udcff'
+
+    def random_args(self, rnd):
+        """Generate a random tuple of arguments, some of them invalid"""
+
+        args = []
+        for _ in range(rnd.randint(0, 5)):
+            kind = rnd.random()
+            if kind < 0.9:
+                value = ''.join(rnd.choice(self.ALPHABET) for _ in range(rnd.randint(1, 20)))
+            elif kind < 0.95:
+                value = ''
+            else:
+                value = rnd.choice([None, 1, 1.5, b'bytes', ['list']])
+            args.append(value)
+        return tuple(args)
+
+    def assertSameResult(self, args):
+        try:
+            expected = reference_uuid(*args)
+        except ValueError as e:
+            with self.assertRaises(ValueError) as context:
+                uuid(*args)
+            self.assertEqual(str(context.exception), str(e))
+            with self.assertRaises(ValueError) as context:
+                uuids([args])
+            self.assertEqual(str(context.exception), str(e))
+        else:
+            self.assertEqual(uuid(*args), expected)
+            self.assertListEqual(uuids([args]), [expected])
+
+    def test_uuid(self):
+        """Check whether the function returns the expected UUID"""
+
+        result = uuid('1', '2', '3', '4')
+        self.assertEqual(result, 'e7b71c81f5a0723e2237f157dba81777ce7c6c21')
+
+        result = uuid('http://example.com/', '1234567')
+        self.assertEqual(result, '47509b2f0d4ffc513ca9230838a69aa841d7f055')
+
+        result = uuid()
+        self.assertEqual(result, 'da39a3ee5e6b4b0d3255bfef95601890afd80709')
+
+    def test_surrogate_escape(self):
+        """Check if lone surrogates are encoded using surrogateescape"""
+
+        self.assertEqual(uuid('\udc80'), hashlib.sha1(b'\x80').hexdigest())
+
+    def test_none_value(self):
+        """Check whether the function fails when one of the values is None"""
+
+        self.assertRaisesRegex(ValueError, "value is not a string", uuid, 'X', None, 'Z')
+        self.assertRaisesRegex(ValueError, "value is not a string", uuids, [('X', None, 'Z')])
+
+    def test_empty_value(self):
+        """Check whether the function fails when one of the values is empty"""
+
+        self.assertRaisesRegex(ValueError, "cannot be None or empty", uuid, 'X', '', 'Z')
+        self.assertRaisesRegex(ValueError, "cannot be None or empty", uuids, [('X', '', 'Z')])
+
+    def test_first_invalid_value(self):
+        """Check whether the error is raised for the first invalid value"""
+
+        self.assertRaisesRegex(ValueError, "cannot be None or empty", uuid, '', 1)
+        self.assertRaisesRegex(ValueError, "1 value is not a string", uuid, 1, '')
+
+    def test_uuids(self):
+        """Check whether the batch function returns the same UUIDs in order"""
+
+        args_list = [('1', '2', '3', '4'), ['http://example.com/', '1234567'], ('a',)]
+        expected = [uuid(*args) for args in args_list]
+
+        self.assertListEqual(uuids(args_list), expected)
+        self.assertListEqual(uuids(iter(args_list)), expected)
+        self.assertListEqual(uuids([]), [])
+
+    def test_same_as_reference(self):
+        """Check with random arguments that results match the original implementation"""
+
+        rnd = random.Random(0)
+        for _ in range(5000):
+            self.assertSameResult(self.random_args(rnd))
+
+    def test_str_subclass(self):
+        """Check whether subclasses of str are accepted"""
+
+        class Text(str):
+            pass
+
+        self.assertSameResult((Text('a'), 'b'))
+        self.assertSameResult((Text(''), 'b'))
+
+
 if __name__ == '__main__':
     unittest.main()
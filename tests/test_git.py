@@ -16,7 +16,10 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 #
 
+import copy
 import json
+import tracemalloc
+import types
 import unittest
 
 from chronicler.events.core.git import (GitEventizer,
@@ -26,10 +29,13 @@ from chronicler.events.core.git import (GitEventizer,
                                         GIT_EVENT_ACTION_MODIFIED,
                                         GIT_EVENT_ACTION_REPLACED,
                                         GIT_EVENT_ACTION_COPIED,
+                                        GIT_EVENT_ACTION_DELETED,
+                                        GIT_EVENT_ACTION_TYPE_CHANGED,
                                         GIT_EVENT_COMMIT_AUTHORED_BY,
                                         GIT_EVENT_COMMIT_COMMITTED_BY,
                                         GIT_EVENT_COMMIT_SIGNED_OFF_BY,
                                         GIT_EVENT_COMMIT_CO_AUTHORED_BY)
+from chronicler.stats import EventizerStats
 
 
 class GitEventizerTestCase(unittest.TestCase):
@@ -674,5 +680,511 @@ class GitEventizerTestCase(unittest.TestCase):
         self.assertEqual(identity_event.data['role'], 'committed_by')
 
 
+class GitEventizerIdentityCacheTestCase(unittest.TestCase):
+    """Unit tests for the identity cache of GitEventizer"""
+
+    def setUp(self):
+        with open('data/git_commits.txt', 'r') as file:
+            self.commits = [json.loads(line) for line in file]
+
+    def test_cache_hits(self):
+        """Check if identities are only resolved the first time they are found"""
+
+        eventizer = GitEventizer()
+
+        events = list(eventizer.eventize(self.commits))
+        self.assertEqual(len(events), 45)
+
+        info = eventizer.identity_cache_info()
+        self.assertEqual(info.misses, 2)
+        self.assertEqual(info.hits, 18)
+        self.assertEqual(info.currsize, 2)
+        self.assertEqual(info.maxsize, 4096)
+
+    def test_same_events(self):
+        """Check if events are the same with and without cache"""
+
+        expected = list(GitEventizer(identity_cache_size=0).eventize(self.commits))
+
+        eventizer = GitEventizer(identity_cache_size=1)
+        events = list(eventizer.eventize(self.commits))
+        self.assertListEqual(events, expected)
+
+        events = list(eventizer.eventize(self.commits))
+        self.assertListEqual(events, expected)
+
+    def test_cache_disabled(self):
+        """Check if identities are not cached when the size is 0"""
+
+        eventizer = GitEventizer(identity_cache_size=0)
+        _ = list(eventizer.eventize(self.commits))
+
+        info = eventizer.identity_cache_info()
+        self.assertEqual(info.hits, 0)
+        self.assertEqual(info.misses, 20)
+        self.assertEqual(info.currsize, 0)
+
+    def test_clear_cache(self):
+        """Check if the cache is emptied"""
+
+        eventizer = GitEventizer()
+        _ = list(eventizer.eventize(self.commits))
+
+        eventizer.clear_identity_cache()
+
+        info = eventizer.identity_cache_info()
+        self.assertEqual(info.hits, 0)
+        self.assertEqual(info.misses, 0)
+        self.assertEqual(info.currsize, 0)
+
+    def test_invalid_cache_size(self):
+        """Check if an exception is raised when the size is negative"""
+
+        with self.assertRaisesRegex(ValueError, "'identity_cache_size' must be greater"):
+            GitEventizer(identity_cache_size=-1)
+
+    def test_invalid_identity_logged_once(self):
+        """Check if invalid identities are logged once"""
+
+        commit = self.commits[1]
+        commit['data']['Signed-off-by'] = ['<>']
+
+        other_commit = copy.deepcopy(commit)
+        other_commit['uuid'] = 'ffffffffffffffffffffffffffffffffffffffff'
+
+        eventizer = GitEventizer()
+
+        with self.assertLogs('chronicler.events.core.git', level='WARNING') as logs:
+            events = list(eventizer.eventize([commit, other_commit]))
+
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("Cannot generate UUID for identity '<>'", logs.output[0])
+
+        signers = [event for event in events if event['type'] == GIT_EVENT_COMMIT_SIGNED_OFF_BY]
+        self.assertListEqual(signers, [])
+
+
 if __name__ == '__main__':
     unittest.main()
+
+
+class GitEventizerBatchTestCase(unittest.TestCase):
+    """Unit tests for eventize_batch method of GitEventizer"""
+
+    def setUp(self):
+        with open('data/git_commits.txt', 'r') as file:
+            self.commits = [json.loads(line) for line in file]
+
+    def test_same_events(self):
+        """Check if the batch generates the same events in the same order"""
+
+        expected = list(GitEventizer().eventize(self.commits))
+
+        events = GitEventizer().eventize_batch(iter(self.commits))
+        self.assertIsInstance(events, list)
+        self.assertListEqual(events, expected)
+
+    def test_merge_actions(self):
+        """Check if duplicated actions of merge commits are skipped"""
+
+        commit = copy.deepcopy(self.commits[0])
+        commit['data']['Merge'] = 'ce8e0b8 51a3b65'
+        commit['data']['files'] = [
+            {'action': 'MM', 'file': 'a.txt', 'modes': [], 'indexes': []},
+            {'action': 'AM', 'file': 'b.txt', 'modes': [], 'indexes': []},
+            {'file': 'c.txt', 'modes': [], 'indexes': []},
+        ]
+
+        expected = GitEventizer().eventize_item(commit)
+        events = GitEventizer().eventize_batch([commit])
+        self.assertListEqual(events, expected)
+
+        types = [event.type for event in events[1:4]]
+        self.assertListEqual(types, [GIT_EVENT_ACTION_MODIFIED,
+                                     GIT_EVENT_ACTION_ADDED,
+                                     GIT_EVENT_ACTION_MODIFIED])
+
+    def test_empty_batch(self):
+        """Check if an empty batch produces no events"""
+
+        self.assertListEqual(GitEventizer().eventize_batch([]), [])
+
+    def test_invalid_item(self):
+        """Check if invalid items in the batch raise an exception"""
+
+        commit = copy.deepcopy(self.commits[0])
+        commit['category'] = 'issue'
+
+        with self.assertRaisesRegex(ValueError, "Invalid category 'issue'"):
+            GitEventizer().eventize_batch([self.commits[1], commit])
+
+        commit = copy.deepcopy(self.commits[1])
+        commit['data']['files'][0]['action'] = None
+
+        with self.assertRaisesRegex(ValueError, "No action for commit event"):
+            GitEventizer().eventize_batch([commit])
+
+
+class GitEventizerActionsTestCase(unittest.TestCase):
+    """Unit tests for the file actions of GitEventizer"""
+
+    def setUp(self):
+        with open('data/git_commits.txt', 'r') as file:
+            self.commit = json.loads(file.readline())
+        del self.commit['data']['Merge']
+
+    def eventize_actions(self, actions, merge=False):
+        commit = copy.deepcopy(self.commit)
+        if merge:
+            commit['data']['Merge'] = 'ce8e0b8 51a3b65'
+        commit['data']['files'] = [
+            {'action': action, 'file': f"file-{n}", 'modes': [], 'indexes': []}
+            for n, action in enumerate(actions)
+        ]
+        events = GitEventizer(types=['*.file.*']).eventize([commit])
+        return [(event.type, event.data['similarity']) for event in events]
+
+    def test_action_codes(self):
+        """Check the event type and the similarity of each action code"""
+
+        events = self.eventize_actions(['A', 'M', 'D', 'R', 'C', 'T', 'R100', 'C075', 'T050', 'Rx'])
+
+        self.assertListEqual(events, [
+            (GIT_EVENT_ACTION_ADDED, None),
+            (GIT_EVENT_ACTION_MODIFIED, None),
+            (GIT_EVENT_ACTION_DELETED, None),
+            (GIT_EVENT_ACTION_REPLACED, ''),
+            (GIT_EVENT_ACTION_COPIED, ''),
+            (GIT_EVENT_ACTION_TYPE_CHANGED, None),
+            (GIT_EVENT_ACTION_REPLACED, None),
+            (GIT_EVENT_ACTION_COPIED, None),
+            (GIT_EVENT_ACTION_TYPE_CHANGED, None),
+            (GIT_EVENT_ACTION_REPLACED, None),
+        ])
+
+    def test_invalid_action(self):
+        """Check if an error is raised for unknown action codes"""
+
+        for action in ('X', 'Z100', 'MM', 'a'):
+            with self.assertRaisesRegex(ValueError, f"No valid action: {action}"):
+                self.eventize_actions(['M', action])
+
+    def test_merge_actions(self):
+        """Check if consecutive duplicated actions of merge commits are skipped"""
+
+        events = self.eventize_actions(['MMM', 'MRM', 'AAD', 'M', 'DM'], merge=True)
+
+        self.assertListEqual([event_type for event_type, _ in events], [
+            GIT_EVENT_ACTION_MODIFIED,
+            GIT_EVENT_ACTION_MODIFIED,
+            GIT_EVENT_ACTION_REPLACED,
+            GIT_EVENT_ACTION_MODIFIED,
+            GIT_EVENT_ACTION_ADDED,
+            GIT_EVENT_ACTION_DELETED,
+            GIT_EVENT_ACTION_MODIFIED,
+            GIT_EVENT_ACTION_DELETED,
+            GIT_EVENT_ACTION_MODIFIED,
+        ])
+
+
+class GitEventizerLargeCommitTestCase(unittest.TestCase):
+    """Unit tests for commits with many files in GitEventizer"""
+
+    def setUp(self):
+        with open('data/git_commits.txt', 'r') as file:
+            self.commits = [json.loads(line) for line in file]
+
+    @staticmethod
+    def large_commit(commit, files):
+        """Copy a commit replacing its files with `files` modified files"""
+
+        commit = copy.deepcopy(commit)
+        modes = ['100644', '100644']
+        indexes = ['e69de29...', '58a6c75...']
+        commit['data']['files'] = [
+            {'action': 'M', 'file': f"src/module-{n}.py", 'modes': modes, 'indexes': indexes,
+             'added': '1', 'removed': '0'}
+            for n in range(files)
+        ]
+        return commit
+
+    def test_same_events(self):
+        """Check if events of large commits are the same, generated lazily"""
+
+        expected = list(GitEventizer().eventize(self.commits))
+
+        eventizer = GitEventizer(large_commit_files=0)
+        events = eventizer.eventize_item(self.commits[1])
+        self.assertIsInstance(events, types.GeneratorType)
+
+        events = list(eventizer.eventize(self.commits))
+        self.assertListEqual(events, expected)
+
+        for commit in self.commits:
+            self.assertListEqual(list(eventizer.eventize_item(commit)),
+                                 GitEventizer().eventize_item(commit))
+
+    def test_threshold(self):
+        """Check if only commits with more files than the threshold are generated lazily"""
+
+        eventizer = GitEventizer(large_commit_files=10)
+
+        self.assertIsInstance(eventizer.eventize_item(self.large_commit(self.commits[1], 10)), list)
+        events = eventizer.eventize_item(self.large_commit(self.commits[1], 11))
+        self.assertIsInstance(events, types.GeneratorType)
+        self.assertEqual(len(list(events)), 1 + 11 + 2)
+
+        # Nothing to stream when file actions are not selected
+        eventizer = GitEventizer(large_commit_files=10, types=['*.commit', '*.authored_by'])
+        self.assertIsInstance(eventizer.eventize_item(self.large_commit(self.commits[1], 11)), list)
+
+    def test_stats(self):
+        """Check if large commits are added to the statistics"""
+
+        commit = self.large_commit(self.commits[1], 20)
+
+        eventizer = GitEventizer(large_commit_files=10, types=['!*.committed_by'])
+        expected = list(eventizer.eventize([self.commits[1]]))
+
+        stats = EventizerStats()
+        events = list(eventizer.eventize([self.commits[1], commit], stats=stats))
+
+        self.assertEqual(len(events), len(expected) + 1 + 20 + 1)
+        self.assertEqual(stats.items, 2)
+        self.assertEqual(stats.events, len(events))
+        self.assertEqual(stats.events_by_type[GIT_EVENT_ACTION_MODIFIED], 21)
+        self.assertNotIn(GIT_EVENT_COMMIT_COMMITTED_BY, stats.events_by_type)
+        self.assertIn(commit['uuid'], [uuid for uuid, _ in stats.slowest_items()])
+
+    def test_memory(self):
+        """Check if memory doesn't grow with the number of files of a commit"""
+
+        commit = self.large_commit(self.commits[1], 200000)
+        eventizer = GitEventizer()
+
+        tracemalloc.start()
+        try:
+            count = 0
+            for event in eventizer.eventize([commit]):
+                count += 1
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(count, 1 + 200000 + 2)
+        # A list with the events of the files would take more than 100 MB
+        self.assertLess(peak, 1024 * 1024)
+
+    def test_invalid_file_raised_lazily(self):
+        """Check if errors in the files of large commits are raised while generating their events"""
+
+        commit = self.large_commit(self.commits[1], 20)
+        commit['data']['files'][10]['action'] = None
+
+        events = GitEventizer(large_commit_files=10).eventize_item(commit)
+
+        self.assertEqual(next(events).type, GIT_EVENT_COMMIT)
+        with self.assertRaisesRegex(ValueError, "No action for commit event"):
+            list(events)
+
+    def test_invalid_large_commit_files(self):
+        """Check if an error is raised when the threshold is negative"""
+
+        with self.assertRaisesRegex(ValueError, "'large_commit_files' must be greater than or equal to 0"):
+            GitEventizer(large_commit_files=-1)
+
+
+class GitEventizerTypesTestCase(unittest.TestCase):
+    """Unit tests for the selection of event types of GitEventizer"""
+
+    def setUp(self):
+        with open('data/git_commits.txt', 'r') as file:
+            self.commits = [json.loads(line) for line in file]
+
+        self.all_events = list(GitEventizer().eventize(self.commits))
+
+    def assertSelectedEvents(self, eventizer, selected):
+        expected = [event for event in self.all_events if selected(event.type)]
+
+        self.assertListEqual(list(eventizer.eventize(self.commits)), expected)
+        self.assertListEqual(eventizer.eventize_batch(self.commits), expected)
+
+    def test_identities(self):
+        """Check if only identity events are generated and files are not processed"""
+
+        eventizer = GitEventizer(types=['*.authored_by', '*.committed_by', '*.signed_off_by'])
+        self.assertFalse(eventizer._actions_selected)
+
+        self.assertSelectedEvents(eventizer, lambda t: t in (GIT_EVENT_COMMIT_AUTHORED_BY,
+                                                             GIT_EVENT_COMMIT_COMMITTED_BY,
+                                                             GIT_EVENT_COMMIT_SIGNED_OFF_BY))
+
+        # Files are not read, so commits without actions are not rejected
+        commit = copy.deepcopy(self.commits[1])
+        commit['data']['files'][0]['action'] = None
+        events = eventizer.eventize_item(commit)
+        self.assertNotIn(GIT_EVENT_ACTION_MODIFIED, [event.type for event in events])
+
+    def test_actions(self):
+        """Check if only file action events are generated and identities are not processed"""
+
+        eventizer = GitEventizer(types=['org.grimoirelab.events.git.file.*'])
+        self.assertTrue(eventizer._actions_selected)
+        self.assertFalse(eventizer._authors_selected)
+        self.assertFalse(eventizer._committers_selected)
+        self.assertDictEqual(eventizer._trailers_selected, {})
+
+        self.assertSelectedEvents(eventizer, lambda t: '.file.' in t)
+
+        info = eventizer.identity_cache_info()
+        self.assertEqual(info.hits + info.misses, 0)
+
+    def test_exclude(self):
+        """Check if excluded types are not generated"""
+
+        eventizer = GitEventizer(types=['!*.file.*', '!*.committed_by'])
+
+        self.assertSelectedEvents(eventizer, lambda t: '.file.' not in t and t != GIT_EVENT_COMMIT_COMMITTED_BY)
+
+    def test_commits(self):
+        """Check if commit events can be excluded"""
+
+        eventizer = GitEventizer(types=['!' + GIT_EVENT_COMMIT, '!' + GIT_EVENT_MERGE_COMMIT])
+
+        self.assertSelectedEvents(eventizer, lambda t: t not in (GIT_EVENT_COMMIT, GIT_EVENT_MERGE_COMMIT))
+
+
+class GitEventizerPayloadTestCase(unittest.TestCase):
+    """Unit tests for the payload profiles of GitEventizer"""
+
+    def setUp(self):
+        with open('data/git_commits.txt', 'r') as file:
+            self.commits = [json.loads(line) for line in file]
+
+        self.commits[0]['data']['Signed-off-by'] = ["John Smith <jsmith@example.com>"]
+        self.all_events = list(GitEventizer().eventize(copy.deepcopy(self.commits)))
+
+    def assertSameLinkedEvents(self, events):
+        """Check if only the data of the commit events is different"""
+
+        self.assertEqual(len(events), len(self.all_events))
+
+        for event, expected in zip(events, self.all_events):
+            self.assertEqual(event.id, expected.id)
+            self.assertEqual(event.type, expected.type)
+            if event.type not in (GIT_EVENT_COMMIT, GIT_EVENT_MERGE_COMMIT):
+                self.assertDictEqual(event.data, expected.data)
+
+    def test_full(self):
+        """Check if the data of the items is kept with the full profile"""
+
+        eventizer = GitEventizer(payload='full')
+        events = list(eventizer.eventize(self.commits))
+
+        self.assertListEqual(events, self.all_events)
+        self.assertIs(events[0].data, self.commits[0]['data'])
+
+    def test_slim(self):
+        """Check if files and trailers are removed with the slim profile"""
+
+        eventizer = GitEventizer(payload='slim')
+
+        for events in (list(eventizer.eventize(self.commits)), eventizer.eventize_batch(self.commits)):
+            self.assertSameLinkedEvents(events)
+
+            commits = [event for event in events if event.type in (GIT_EVENT_COMMIT, GIT_EVENT_MERGE_COMMIT)]
+            self.assertEqual(len(commits), len(self.commits))
+
+            for event, commit in zip(commits, self.commits):
+                expected = {field: value for field, value in commit['data'].items()
+                            if field not in ('files', 'Signed-off-by')}
+                self.assertDictEqual(event.data, expected)
+                self.assertIn('message', event.data)
+
+            # Items are not modified
+            self.assertIn('files', self.commits[0]['data'])
+            self.assertIn('Signed-off-by', self.commits[0]['data'])
+
+    def test_minimal(self):
+        """Check if only the fields that identify a commit are kept with the minimal profile"""
+
+        eventizer = GitEventizer(payload='minimal')
+
+        for events in (list(eventizer.eventize(self.commits)), eventizer.eventize_batch(self.commits)):
+            self.assertSameLinkedEvents(events)
+
+            for event in events:
+                if event.type == GIT_EVENT_COMMIT:
+                    self.assertListEqual(sorted(event.data),
+                                         ['Author', 'AuthorDate', 'Commit', 'CommitDate',
+                                          'commit', 'parents'])
+                elif event.type == GIT_EVENT_MERGE_COMMIT:
+                    self.assertListEqual(sorted(event.data),
+                                         ['Author', 'AuthorDate', 'Commit', 'CommitDate',
+                                          'Merge', 'commit', 'parents'])
+
+    def test_invalid_payload(self):
+        """Check if an error is raised when the payload profile is not valid"""
+
+        with self.assertRaisesRegex(ValueError, "Invalid payload profile 'tiny'"):
+            GitEventizer(payload='tiny')
+
+
+class GitEventizerParseAuthorsTestCase(unittest.TestCase):
+    """Unit tests for the parsing and caching of authors strings"""
+
+    def test_parse_pair_programming(self):
+        """Check if pair programming authors are split"""
+
+        for separator in ['and', 'AND', '&', '+']:
+            authors = GitEventizer._parse_authors(f"John Smith, Jane Doe {separator} Jo Roe <pair@example.com>")
+            self.assertTupleEqual(authors, ('John Smith', 'Jane Doe', 'Jo Roe', '<pair@example.com>'))
+
+    def test_parse_single_author(self):
+        """Check if strings without several authors are not split"""
+
+        strings = [
+            "John Smith <jsmith@example.com>",
+            "Alexander Anderson <aanderson@example.com>",
+            "John Smith and Jane Doe",
+            "Standalone & Co",
+            "",
+        ]
+        for string in strings:
+            self.assertTupleEqual(GitEventizer._parse_authors(string), (string,))
+
+    def test_authors_cache(self):
+        """Check if authors strings are only parsed the first time they are found"""
+
+        with open('data/git_commits.txt', 'r') as file:
+            commits = [json.loads(line) for line in file]
+
+        eventizer = GitEventizer()
+        _ = list(eventizer.eventize(commits))
+
+        info = eventizer.authors_cache_info()
+        self.assertEqual(info.misses, 2)
+        self.assertEqual(info.hits, 2 * len(commits) - 2)
+        self.assertEqual(info.currsize, 2)
+
+        eventizer.clear_identity_cache()
+
+        info = eventizer.authors_cache_info()
+        self.assertEqual(info.hits, 0)
+        self.assertEqual(info.misses, 0)
+        self.assertEqual(info.currsize, 0)
+
+    def test_pair_programming_events(self):
+        """Check if pair programming commits generate an event per author"""
+
+        with open('data/git_commits.txt', 'r') as file:
+            commit = json.loads(file.readline())
+        commit['data']['Author'] = "John Smith and Jane Doe <pair@example.com>"
+
+        eventizer = GitEventizer()
+        for _ in range(2):
+            events = list(eventizer.eventize([commit]))
+            authors = [event for event in events if event['type'] == GIT_EVENT_COMMIT_AUTHORED_BY]
+            names = [event.data['name'] for event in authors]
+            self.assertListEqual(names, ['John Smith', 'Jane Doe', None])
+            self.assertEqual(authors[2].data['email'], 'pair@example.com')
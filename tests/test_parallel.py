@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import concurrent.futures
+import functools
+import io
+import json
+import os
+import unittest
+import unittest.mock
+
+from chronicler.binary import (available_binary_formats,
+                               pack_event,
+                               pack_record,
+                               read_records,
+                               unpack_record)
+from chronicler.eventizer import eventize
+from chronicler.parallel import eventize_parallel
+from chronicler.serializer import to_json
+from chronicler.sharding import ShardAssigner
+
+
+class TestEventizeParallel(unittest.TestCase):
+    """Unit tests for eventize_parallel function"""
+
+    def setUp(self):
+        with open('data/git_commits.txt', 'r') as fd:
+            self.lines = fd.readlines()
+
+        self.encode = functools.partial(to_json, json_line=True)
+
+        events = eventize('git', map(json.loads, self.lines))
+        self.expected = [self.encode(event) for event in events]
+
+    def test_ordered(self):
+        """Check if events are returned in the same order as the input"""
+
+        chunks = eventize_parallel('git', self.lines, json.loads, self.encode,
+                                   workers=3, chunk_size=2)
+        events = ''.join(chunks).splitlines()
+
+        self.assertEqual(len(events), 45)
+        self.assertListEqual(events, self.expected)
+
+    def test_unordered(self):
+        """Check if all the events are returned when the order is not kept"""
+
+        chunks = eventize_parallel('git', self.lines, json.loads, self.encode,
+                                   workers=3, chunk_size=1, ordered=False)
+        events = ''.join(chunks).splitlines()
+
+        self.assertEqual(len(events), 45)
+        self.assertListEqual(sorted(events), sorted(self.expected))
+
+    def test_shards(self):
+        """Check if the events of each chunk are grouped by shard"""
+
+        events = list(eventize('git', map(json.loads, self.lines), compact=True))
+        shard = ShardAssigner('id-hash', 3)
+
+        expected = {}
+        for event in events:
+            expected.setdefault(shard(event), []).append(self.encode(event))
+
+        chunks = list(eventize_parallel('git', self.lines, json.loads, self.encode,
+                                        workers=2, chunk_size=4, shard=shard))
+        self.assertEqual(len(chunks), 3)
+
+        result = {}
+        for chunk in chunks:
+            self.assertIsInstance(chunk, dict)
+            for number, data in chunk.items():
+                result.setdefault(number, []).extend(data.splitlines())
+
+        self.assertDictEqual(result, expected)
+
+    @unittest.skipUnless(available_binary_formats(), "msgpack is not installed")
+    def test_binary_records(self):
+        """Check if events encoded as bytes are joined without line breaks"""
+
+        events = eventize('git', map(json.loads, self.lines))
+        expected = b''.join(pack_event(event) for event in events)
+
+        records = [pack_record(json.loads(line)) for line in self.lines]
+        payloads = list(read_records(io.BytesIO(b''.join(records))))
+
+        chunks = list(eventize_parallel('git', payloads, unpack_record, pack_event,
+                                        workers=2, chunk_size=3, terminator=b''))
+        for chunk in chunks:
+            self.assertIsInstance(chunk, bytes)
+        self.assertEqual(b''.join(chunks), expected)
+
+    def test_workers_not_forked(self):
+        """Check if workers are not forked from the calling process"""
+
+        with unittest.mock.patch('concurrent.futures.ProcessPoolExecutor',
+                                 wraps=concurrent.futures.ProcessPoolExecutor) as mock_executor:
+            chunks = eventize_parallel('git', self.lines, json.loads, self.encode, workers=2)
+            self.assertListEqual(''.join(chunks).splitlines(), self.expected)
+
+        mp_context = mock_executor.call_args.kwargs['mp_context']
+        self.assertIn(mp_context.get_start_method(), ('forkserver', 'spawn'))
+
+    def test_eventizers_package(self):
+        """Check if workers look up eventizers in the package of the calling process"""
+
+        lines = [json.dumps({'id': str(n), 'time': '2024-06-24T12:00:00Z', 'data': n}) for n in range(5)]
+
+        os.environ['CHRONICLER_EVENTIZERS'] = 'events_test_pck'
+        try:
+            chunks = eventize_parallel('eventizer_test', lines, json.loads, self.encode,
+                                       workers=2, chunk_size=2)
+            events = [json.loads(event) for event in ''.join(chunks).splitlines()]
+        finally:
+            os.environ['CHRONICLER_EVENTIZERS'] = 'chronicler.events'
+
+        self.assertListEqual([event['id'] for event in events], ['0', '1', '2', '3', '4'])
+        self.assertListEqual([event['type'] for event in events], ['test_event'] * 5)
+
+    def test_empty_input(self):
+        """Check there's no failure when there are no items"""
+
+        chunks = eventize_parallel('git', [], json.loads, self.encode, workers=2)
+        self.assertListEqual(list(chunks), [])
+
+    def test_worker_error(self):
+        """Check if errors raised by the workers are propagated"""
+
+        lines = ['{"uuid": "1234", "backend_name": "GitHub", "category": "commit"}']
+
+        with self.assertRaisesRegex(ValueError, "Item 1234 is not a 'git' item."):
+            _ = list(eventize_parallel('git', lines, json.loads, self.encode, workers=2))
+
+    def test_unknown_eventizer(self):
+        """Check if an exception is raised when the eventizer is not found"""
+
+        with self.assertRaisesRegex(ValueError, "Unknown eventizer 'fake_eventizer'"):
+            _ = list(eventize_parallel('fake_eventizer', self.lines, json.loads, self.encode))
+
+    def test_invalid_chunk_size(self):
+        """Check if an exception is raised when the chunk size is not valid"""
+
+        with self.assertRaisesRegex(ValueError, "'chunk_size' must be greater than 0"):
+            _ = list(eventize_parallel('git', self.lines, json.loads, self.encode, chunk_size=0))
+
+
+if __name__ == '__main__':
+    unittest.main()
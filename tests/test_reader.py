@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from chronicler.reader import read_lines, split_offsets
+
+
+class NonSeekableBytesIO(io.BytesIO):
+    """Stream without file descriptor that returns a few bytes on each read"""
+
+    def read1(self, size=-1):
+        return super().read1(min(size, 7))
+
+
+class TestReadLines(unittest.TestCase):
+    """Unit tests for read_lines function"""
+
+    def setUp(self):
+        with open('data/git_commits.txt', 'rb') as fd:
+            self.data = fd.read()
+        self.expected = self.data.splitlines()
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_file(self, data):
+        filepath = os.path.join(self.tmpdir.name, 'items.json')
+        with open(filepath, 'wb') as fd:
+            fd.write(data)
+        return filepath
+
+    def test_regular_file(self):
+        """Check if the lines of a regular file are read"""
+
+        with open('data/git_commits.txt', 'rb') as fd:
+            lines = list(read_lines(fd))
+
+        self.assertListEqual(lines, self.expected)
+        for line in lines:
+            self.assertIsInstance(line, bytes)
+            json.loads(line)
+
+    def test_stream(self):
+        """Check if the lines of a stream are read in blocks"""
+
+        for read_size in (1, 5, 100, 1024 * 1024):
+            lines = list(read_lines(io.BytesIO(self.data), read_size=read_size))
+            self.assertListEqual(lines, self.expected)
+
+        lines = list(read_lines(NonSeekableBytesIO(self.data)))
+        self.assertListEqual(lines, self.expected)
+
+    def test_pipe(self):
+        """Check if pipes are read as streams"""
+
+        rfd, wfd = os.pipe()
+        with os.fdopen(wfd, 'wb') as writer:
+            writer.write(b'{"a": 1}\n{"b": 2}')
+
+        with os.fdopen(rfd, 'rb') as reader:
+            lines = list(read_lines(reader))
+
+        self.assertListEqual(lines, [b'{"a": 1}', b'{"b": 2}'])
+
+    def test_empty_lines(self):
+        """Check if empty lines are skipped and the last line is read without line break"""
+
+        data = b'\n{"a": 1}\n\n{"b": 2}'
+        expected = [b'{"a": 1}', b'{"b": 2}']
+
+        with open(self.write_file(data), 'rb') as fd:
+            self.assertListEqual(list(read_lines(fd)), expected)
+
+        self.assertListEqual(list(read_lines(io.BytesIO(data), read_size=3)), expected)
+
+    def test_empty_file(self):
+        """Check if no lines are read from an empty file"""
+
+        with open(self.write_file(b''), 'rb') as fd:
+            self.assertListEqual(list(read_lines(fd)), [])
+
+        self.assertListEqual(list(read_lines(io.BytesIO(b''))), [])
+
+    def test_ranges_not_supported(self):
+        """Check if an error is raised reading a range of a stream"""
+
+        with self.assertRaisesRegex(ValueError, "byte ranges can only be read from regular files"):
+            list(read_lines(io.BytesIO(self.data), start=10))
+
+    def test_invalid_read_size(self):
+        """Check if an error is raised when the read size is not valid"""
+
+        with self.assertRaisesRegex(ValueError, "'read_size' must be greater than 0"):
+            list(read_lines(io.BytesIO(self.data), read_size=0))
+
+
+class TestSplitOffsets(unittest.TestCase):
+    """Unit tests for split_offsets function"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_file(self, data):
+        filepath = os.path.join(self.tmpdir.name, 'items.json')
+        with open(filepath, 'wb') as fd:
+            fd.write(data)
+        return filepath
+
+    def test_split(self):
+        """Check if the ranges cover all the lines of the file"""
+
+        with open('data/git_commits.txt', 'rb') as fd:
+            expected = list(read_lines(fd))
+
+            for parts in (1, 2, 3, 7, 10, 50):
+                offsets = split_offsets(fd, parts)
+                self.assertLessEqual(len(offsets), parts)
+                self.assertEqual(offsets[0][0], 0)
+                self.assertEqual(offsets[-1][1], os.fstat(fd.fileno()).st_size)
+
+                lines = []
+                for start, end in offsets:
+                    self.assertLess(start, end)
+                    lines.extend(read_lines(fd, start=start, end=end))
+                self.assertListEqual(lines, expected)
+
+    def test_line_boundaries(self):
+        """Check if ranges start at the beginning of a line"""
+
+        data = b'aaaa\nbb\nc\nddddddddd\ne'
+        with open(self.write_file(data), 'rb') as fd:
+            offsets = split_offsets(fd, 4)
+
+            for start, _ in offsets:
+                self.assertTrue(start == 0 or data[start - 1:start] == b'\n')
+
+            lines = [line for start, end in offsets for line in read_lines(fd, start, end)]
+            self.assertListEqual(lines, [b'aaaa', b'bb', b'c', b'ddddddddd', b'e'])
+
+    def test_single_line(self):
+        """Check if a file with a single line is not split"""
+
+        with open(self.write_file(b'{"a": 1}\n'), 'rb') as fd:
+            self.assertListEqual(split_offsets(fd, 4), [(0, 9)])
+
+        with open(self.write_file(b''), 'rb') as fd:
+            self.assertListEqual(split_offsets(fd, 4), [])
+
+    def test_invalid_parameters(self):
+        """Check if an error is raised when the file can't be split"""
+
+        with self.assertRaisesRegex(ValueError, "only regular files can be split"):
+            split_offsets(io.BytesIO(b'{}\n{}\n'), 2)
+
+        with open(self.write_file(b'{}\n'), 'rb') as fd:
+            with self.assertRaisesRegex(ValueError, "'parts' must be greater than 0"):
+                split_offsets(fd, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
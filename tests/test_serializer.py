@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import json
+import unittest
+
+import cloudevents.conversion
+
+from cloudevents.http import CloudEvent
+
+from chronicler.codec import available_codecs, get_codec
+from chronicler.events.core.git import GitEventizer
+from chronicler.serializer import to_json
+
+
+class TestToJSON(unittest.TestCase):
+    """Unit tests for to_json function"""
+
+    def setUp(self):
+        with open('data/git_commits.txt', 'r') as fd:
+            items = [json.loads(line) for line in fd]
+
+        self.events = list(GitEventizer().eventize(items))
+
+    def test_json_line(self):
+        """Check if the output is the same as encoding the dict of the event"""
+
+        for event in self.events:
+            expected = json.dumps(cloudevents.conversion.to_dict(event),
+                                  separators=(',', ':'), sort_keys=True)
+            self.assertEqual(to_json(event, json_line=True), expected)
+
+    def test_indented(self):
+        """Check if the indented output is the same as encoding the dict of the event"""
+
+        for event in self.events:
+            expected = json.dumps(cloudevents.conversion.to_dict(event),
+                                  indent=4, sort_keys=True)
+            self.assertEqual(to_json(event), expected)
+
+    def test_codecs(self):
+        """Check if the output is the same for all the codecs"""
+
+        for name in available_codecs():
+            codec = get_codec(name)
+
+            for event in self.events:
+                for json_line in (True, False):
+                    self.assertEqual(to_json(event, json_line=json_line, codec=codec),
+                                     to_json(event, json_line=json_line))
+
+    def test_cloudevents(self):
+        """Check if the output is the same for compact events and CloudEvents"""
+
+        for event in self.events:
+            cloudevent = event.to_cloudevent()
+
+            for json_line in (True, False):
+                self.assertEqual(to_json(event, json_line=json_line),
+                                 to_json(cloudevent, json_line=json_line))
+
+    def test_attributes_order(self):
+        """Check if attributes are sorted around the data field"""
+
+        attributes = {
+            "id": "1",
+            "type": "test_event",
+            "source": "test",
+            "time": "2024-06-24T12:00:00Z",
+            "category": "test",
+        }
+        event = CloudEvent(attributes, {"b": [1, 2], "a": None})
+
+        expected = (
+            '{"category":"test","data":{"a":null,"b":[1,2]},"id":"1",'
+            '"source":"test","specversion":"1.0","time":"2024-06-24T12:00:00Z",'
+            '"type":"test_event"}'
+        )
+        self.assertEqual(to_json(event, json_line=True), expected)
+
+    def test_no_data(self):
+        """Check if events without data are serialized"""
+
+        attributes = {
+            "id": "1",
+            "type": "test_event",
+            "source": "test",
+            "time": "2024-06-24T12:00:00Z",
+        }
+        event = CloudEvent(attributes)
+
+        expected = (
+            '{"data":null,"id":"1","source":"test","specversion":"1.0",'
+            '"time":"2024-06-24T12:00:00Z","type":"test_event"}'
+        )
+        self.assertEqual(to_json(event, json_line=True), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
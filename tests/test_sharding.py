@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import gzip
+import os
+import pickle
+import tempfile
+import time
+import unittest
+import zlib
+
+from chronicler.eventizer import Event
+from chronicler.sharding import ShardAssigner, ShardedWriter
+
+
+class TestShardAssigner(unittest.TestCase):
+    """Unit tests for ShardAssigner class"""
+
+    def setUp(self):
+        self.events = [
+            Event(id=f"id-{n}", type=f"type-{n % 3}", source=f"source-{n % 2}", time=0)
+            for n in range(50)
+        ]
+
+    def test_id_hash(self):
+        """Check if events are assigned using the CRC-32 of their id"""
+
+        shard = ShardAssigner('id-hash', 4)
+
+        shards = [shard(event) for event in self.events]
+        self.assertListEqual(shards, [zlib.crc32(event.id.encode()) % 4 for event in self.events])
+        self.assertSetEqual(set(shards), {0, 1, 2, 3})
+
+    def test_source_and_type(self):
+        """Check if events with the same source or type go to the same shard"""
+
+        for shard_by, attribute in (('source', 'source'), ('type', 'type')):
+            shard = ShardAssigner(shard_by, 16)
+
+            for event in self.events:
+                self.assertEqual(shard(event), zlib.crc32(event[attribute].encode()) % 16)
+
+    def test_single_shard(self):
+        """Check if all the events go to the shard 0 when there's only one"""
+
+        shard = ShardAssigner()
+        self.assertSetEqual({shard(event) for event in self.events}, {0})
+
+    def test_pickle(self):
+        """Check if the assigner can be sent to other processes"""
+
+        shard = ShardAssigner('type', 4)
+        expected = [shard(event) for event in self.events]
+
+        shard = pickle.loads(pickle.dumps(shard))
+        self.assertDictEqual(shard._cache, {})
+        self.assertListEqual([shard(event) for event in self.events], expected)
+
+    def test_invalid_parameters(self):
+        """Check if an error is raised when the parameters are not valid"""
+
+        with self.assertRaisesRegex(ValueError, "Invalid shard key 'origin'"):
+            ShardAssigner('origin', 2)
+        with self.assertRaisesRegex(ValueError, "'shards' must be greater than 0"):
+            ShardAssigner('id-hash', 0)
+
+
+class TestShardedWriter(unittest.TestCase):
+    """Unit tests for ShardedWriter class"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.dirpath = self.tmpdir.name
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def read(self, name, opener=open):
+        with opener(os.path.join(self.dirpath, name), 'rb') as fd:
+            return fd.read()
+
+    def test_writeline(self):
+        """Check if each shard is written to its own file"""
+
+        with ShardedWriter(self.dirpath, shards=3, extension='.jsonl', flush_interval=0) as writer:
+            writer.writeline(0, 'a')
+            writer.writeline(2, 'b')
+            writer.writeline(0, 'ñ')
+            writer.write(2, 'c\nd\n')
+
+        self.assertListEqual(sorted(os.listdir(self.dirpath)),
+                             ['events-00000-00000.jsonl', 'events-00002-00000.jsonl'])
+        self.assertListEqual(writer.paths,
+                             [os.path.join(self.dirpath, 'events-00000-00000.jsonl'),
+                              os.path.join(self.dirpath, 'events-00002-00000.jsonl')])
+        self.assertEqual(self.read('events-00000-00000.jsonl'), 'a\nñ\n'.encode('utf-8'))
+        self.assertEqual(self.read('events-00002-00000.jsonl'), b'b\nc\nd\n')
+
+    def test_max_size(self):
+        """Check if a shard continues in a new part when a file reaches the maximum size"""
+
+        with ShardedWriter(self.dirpath, shards=2, max_size=10, flush_interval=0) as writer:
+            for n in range(5):
+                writer.writeline(1, f"event-{n}")
+            writer.writeline(0, 'x')
+
+        self.assertListEqual(sorted(os.listdir(self.dirpath)),
+                             ['events-00000-00000.json',
+                              'events-00001-00000.json',
+                              'events-00001-00001.json',
+                              'events-00001-00002.json'])
+        self.assertEqual(self.read('events-00001-00000.json'), b'event-0\nevent-1\n')
+        self.assertEqual(self.read('events-00001-00001.json'), b'event-2\nevent-3\n')
+        self.assertEqual(self.read('events-00001-00002.json'), b'event-4\n')
+        self.assertEqual(self.read('events-00000-00000.json'), b'x\n')
+
+    def test_compression(self):
+        """Check if files are compressed and named after the compression"""
+
+        with ShardedWriter(self.dirpath, shards=2, extension='.jsonl',
+                           compression='gzip', max_size=4) as writer:
+            writer.writeline(1, 'abc')
+            writer.writeline(1, 'def')
+
+        self.assertListEqual(sorted(os.listdir(self.dirpath)),
+                             ['events-00001-00000.jsonl.gz', 'events-00001-00001.jsonl.gz'])
+        self.assertEqual(self.read('events-00001-00000.jsonl.gz', gzip.open), b'abc\n')
+        self.assertEqual(self.read('events-00001-00001.jsonl.gz', gzip.open), b'def\n')
+
+    def test_flush_interval(self):
+        """Check if pending events of all the shards are written after the flush interval"""
+
+        with ShardedWriter(self.dirpath, shards=2, flush_interval=0.01) as writer:
+            writer.writeline(0, 'a')
+            writer.writeline(1, 'b')
+
+            deadline = time.monotonic() + 5
+            while not all(os.path.getsize(path) for path in writer.paths) and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            self.assertEqual(self.read('events-00000-00000.json'), b'a\n')
+            self.assertEqual(self.read('events-00001-00000.json'), b'b\n')
+
+    def test_flush(self):
+        """Check if pending events are written on flush"""
+
+        writer = ShardedWriter(self.dirpath, shards=2, flush_interval=0)
+        writer.writeline(1, 'a')
+        self.assertEqual(self.read('events-00001-00000.json'), b'')
+
+        writer.flush()
+        self.assertEqual(self.read('events-00001-00000.json'), b'a\n')
+        writer.close()
+
+    def test_existing_files(self):
+        """Check if an error is raised when the directory has files of a previous run"""
+
+        with ShardedWriter(self.dirpath, flush_interval=0) as writer:
+            writer.writeline(0, 'a')
+
+        with self.assertRaisesRegex(ValueError, "already has files starting with 'events-'"):
+            ShardedWriter(self.dirpath)
+
+        with ShardedWriter(self.dirpath, prefix='other', flush_interval=0) as writer:
+            writer.writeline(0, 'a')
+        self.assertIn('other-00000-00000.json', os.listdir(self.dirpath))
+
+    def test_create_directory(self):
+        """Check if the directory is created when it doesn't exist"""
+
+        dirpath = os.path.join(self.dirpath, 'a', 'b')
+
+        with ShardedWriter(dirpath, flush_interval=0) as writer:
+            writer.writeline(0, 'a')
+
+        self.assertListEqual(os.listdir(dirpath), ['events-00000-00000.json'])
+
+    def test_invalid_parameters(self):
+        """Check if an error is raised when the parameters are not valid"""
+
+        with self.assertRaisesRegex(ValueError, "'shards' must be greater than 0"):
+            ShardedWriter(self.dirpath, shards=0)
+        with self.assertRaisesRegex(ValueError, "'max_size' must be greater than or equal to 0"):
+            ShardedWriter(self.dirpath, max_size=-1)
+        with self.assertRaisesRegex(ValueError, "'flush_interval' must be greater than or equal to 0"):
+            ShardedWriter(self.dirpath, flush_interval=-1)
+        with self.assertRaisesRegex(ValueError, "Unknown compression 'rar'"):
+            ShardedWriter(self.dirpath, compression='rar')
+
+        self.assertListEqual(os.listdir(self.dirpath), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
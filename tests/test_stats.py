@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+import threading
+import time
+import unittest
+
+from chronicler.eventizer import Event
+from chronicler.stats import EventizerStats, StatsReporter
+
+
+def make_events(*event_types):
+    return [Event(id=str(n), type=event_type, source='test', time=0)
+            for n, event_type in enumerate(event_types)]
+
+
+class TestEventizerStats(unittest.TestCase):
+    """Unit tests for EventizerStats class"""
+
+    def test_add_item(self):
+        """Check if items, events and their types are counted"""
+
+        stats = EventizerStats()
+        stats.add_item('a', make_events('commit', 'file', 'file'), 0.5)
+        stats.add_item('b', make_events('commit'), 0.25)
+        stats.add_item('c', [], 0.25)
+
+        self.assertEqual(stats.items, 3)
+        self.assertEqual(stats.events, 4)
+        self.assertDictEqual(dict(stats.events_by_type), {'commit': 2, 'file': 2})
+        self.assertDictEqual(stats.stages, {'eventize': 1.0})
+
+    def test_add_item_counts(self):
+        """Check if items are added by the number of events of each type"""
+
+        stats = EventizerStats(slowest=1)
+        stats.add_item('a', make_events('commit', 'file'), 0.25)
+        stats.add_item_counts('b', {'commit': 1, 'file': 200000}, 2.0)
+
+        self.assertEqual(stats.items, 2)
+        self.assertEqual(stats.events, 200003)
+        self.assertDictEqual(dict(stats.events_by_type), {'commit': 2, 'file': 200001})
+        self.assertDictEqual(stats.stages, {'eventize': 2.25})
+        self.assertListEqual(stats.slowest_items(), [('b', 2.0)])
+
+    def test_slowest_items(self):
+        """Check if only the slowest items are kept, from slowest to fastest"""
+
+        stats = EventizerStats(slowest=3)
+        for n, seconds in enumerate([0.1, 0.5, 0.2, 0.9, 0.05, 0.3]):
+            stats.add_item(f"item-{n}", [], seconds)
+
+        self.assertListEqual(stats.slowest_items(),
+                             [('item-3', 0.9), ('item-1', 0.5), ('item-5', 0.3)])
+
+        stats = EventizerStats(slowest=0)
+        stats.add_item('a', [], 1.0)
+        self.assertListEqual(stats.slowest_items(), [])
+
+    def test_invalid_slowest(self):
+        """Check if an error is raised when the number of slowest items is not valid"""
+
+        with self.assertRaisesRegex(ValueError, "'slowest' must be greater than or equal to 0"):
+            EventizerStats(slowest=-1)
+
+    def test_timed(self):
+        """Check if the time getting the elements of an iterable is added to a stage"""
+
+        def slow_numbers():
+            for n in range(3):
+                time.sleep(0.01)
+                yield n
+
+        stats = EventizerStats()
+        self.assertListEqual(list(stats.timed('read', slow_numbers())), [0, 1, 2])
+        self.assertGreaterEqual(stats.stages['read'], 0.03)
+
+        stats.add_time('read', 1.0)
+        self.assertGreaterEqual(stats.stages['read'], 1.03)
+
+    def test_summary(self):
+        """Check if the summary includes all the statistics"""
+
+        stats = EventizerStats()
+        stats.add_time('read', 0.5)
+        stats.add_item('a', make_events('file', 'commit', 'file'), 0.25)
+
+        summary = stats.summary()
+
+        self.assertEqual(summary['items'], 1)
+        self.assertEqual(summary['events'], 3)
+        self.assertGreater(summary['elapsed'], 0)
+        self.assertGreater(summary['items_per_second'], 0)
+        self.assertGreater(summary['events_per_second'], 0)
+        self.assertDictEqual(summary['stages'], {'read': 0.5, 'eventize': 0.25})
+        self.assertListEqual(list(summary['events_by_type'].items()), [('file', 2), ('commit', 1)])
+        self.assertListEqual(summary['slowest_items'], [('a', 0.25)])
+
+    def test_format(self):
+        """Check if the report includes all the statistics"""
+
+        stats = EventizerStats()
+        stats.add_time('read', 0.5)
+        stats.add_item('a', make_events('commit', 'file'), 0.25)
+
+        text = stats.format()
+
+        self.assertRegex(text, r"Items: 1 \([\d.]+ items/s\)")
+        self.assertRegex(text, r"Events: 2 \([\d.]+ events/s\)")
+        self.assertRegex(text, r"read +0\.500s")
+        self.assertRegex(text, r"eventize +0\.250s")
+        self.assertIn("  commit: 1", text)
+        self.assertIn("  a: 250.000ms", text)
+
+
+class TestStatsReporter(unittest.TestCase):
+    """Unit tests for StatsReporter class"""
+
+    def test_report_on_close(self):
+        """Check if statistics are reported once when they are closed"""
+
+        reports = []
+        stats = EventizerStats()
+
+        with StatsReporter(stats, reports.append) as reporter:
+            stats.add_item('a', make_events('commit'), 0.1)
+            self.assertIsNone(reporter._thread)
+            self.assertListEqual(reports, [])
+
+        self.assertEqual(len(reports), 1)
+        self.assertIn("Items: 1", reports[0])
+
+    def test_periodic_report(self):
+        """Check if statistics are reported periodically"""
+
+        reported = threading.Event()
+        reports = []
+
+        def report(text):
+            reports.append(text)
+            reported.set()
+
+        stats = EventizerStats()
+        reporter = StatsReporter(stats, report, interval=0.01)
+
+        self.assertTrue(reported.wait(5))
+        reporter.close()
+
+        self.assertGreaterEqual(len(reports), 2)
+        self.assertFalse(reporter._thread.is_alive())
+
+    def test_invalid_interval(self):
+        """Check if an error is raised when the interval is not valid"""
+
+        with self.assertRaisesRegex(ValueError, "'interval' must be greater than or equal to 0"):
+            StatsReporter(EventizerStats(), print, interval=-1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import io
+import time
+import unittest
+
+from chronicler.writer import EventWriter
+
+
+class CountingBytesIO(io.BytesIO):
+    """BytesIO that counts the number of writes"""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        return super().write(data)
+
+
+class FailingBytesIO(io.BytesIO):
+    """BytesIO that fails on every write"""
+
+    def write(self, data):
+        raise BrokenPipeError("pipe closed")
+
+
+class TestEventWriter(unittest.TestCase):
+    """Unit tests for EventWriter class"""
+
+    def test_writeline(self):
+        """Check if events are written followed by a new line"""
+
+        fd = CountingBytesIO()
+
+        with EventWriter(fd, buffer_size=1024, flush_interval=0) as writer:
+            writer.writeline('{"id":"1"}')
+            writer.writeline('{"id":"ñ"}')
+            writer.write('{"id":"2"}\n')
+
+            self.assertEqual(fd.writes, 0)
+
+        self.assertEqual(fd.getvalue(), '{"id":"1"}\n{"id":"ñ"}\n{"id":"2"}\n'.encode('utf-8'))
+        self.assertEqual(fd.writes, 1)
+
+    def test_write_bytes(self):
+        """Check if bytes are written as they are"""
+
+        fd = io.BytesIO()
+
+        with EventWriter(fd, buffer_size=1024, flush_interval=0) as writer:
+            writer.write(b'\x00\x00\x00\x01\xc0')
+            writer.writeline('ñ')
+            self.assertEqual(writer.size, 8)
+
+        self.assertEqual(fd.getvalue(), b'\x00\x00\x00\x01\xc0\xc3\xb1\n')
+
+    def test_buffer_size(self):
+        """Check if the buffer is written when it reaches its size"""
+
+        fd = CountingBytesIO()
+        writer = EventWriter(fd, buffer_size=20, flush_interval=0)
+
+        writer.writeline('0123456789')
+        self.assertEqual(fd.writes, 0)
+
+        writer.writeline('0123456789')
+        self.assertEqual(fd.writes, 1)
+        self.assertEqual(fd.getvalue(), b'0123456789\n0123456789\n')
+
+        writer.writeline('abc')
+        writer.close()
+        self.assertEqual(fd.writes, 2)
+        self.assertEqual(fd.getvalue(), b'0123456789\n0123456789\nabc\n')
+
+    def test_size(self):
+        """Check if the size counts the bytes received, written or not"""
+
+        fd = io.BytesIO()
+        writer = EventWriter(fd, buffer_size=20, flush_interval=0)
+        self.assertEqual(writer.size, 0)
+
+        writer.writeline('ñ')
+        self.assertEqual(writer.size, 3)
+
+        writer.write('0123456789' * 2)
+        self.assertEqual(len(fd.getvalue()), 23)
+        self.assertEqual(writer.size, 23)
+
+        writer.writeline('abc')
+        writer.close()
+        self.assertEqual(writer.size, 27)
+
+    def test_unbuffered(self):
+        """Check if each event is written at once when the buffer size is 0"""
+
+        fd = CountingBytesIO()
+        writer = EventWriter(fd, buffer_size=0)
+
+        writer.writeline('a')
+        writer.writeline('b')
+        self.assertEqual(fd.writes, 2)
+        self.assertEqual(fd.getvalue(), b'a\nb\n')
+
+        writer.close()
+
+    def test_flush_interval(self):
+        """Check if pending events are written after the flush interval"""
+
+        fd = CountingBytesIO()
+
+        with EventWriter(fd, buffer_size=1024, flush_interval=0.01) as writer:
+            writer.writeline('a')
+
+            deadline = time.monotonic() + 5
+            while fd.writes == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            self.assertEqual(fd.getvalue(), b'a\n')
+
+    def test_background_error(self):
+        """Check if errors of the background thread are raised on the next write"""
+
+        writer = EventWriter(FailingBytesIO(), buffer_size=1024, flush_interval=0.01)
+        writer.writeline('a')
+
+        deadline = time.monotonic() + 5
+        while writer._error is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        with self.assertRaisesRegex(BrokenPipeError, "pipe closed"):
+            writer.writeline('b')
+
+        writer._buffer.clear()
+        writer.close()
+
+    def test_invalid_parameters(self):
+        """Check if an error is raised when the parameters are not valid"""
+
+        with self.assertRaisesRegex(ValueError, "'buffer_size' must be greater"):
+            EventWriter(io.BytesIO(), buffer_size=-1)
+
+        with self.assertRaisesRegex(ValueError, "'flush_interval' must be greater"):
+            EventWriter(io.BytesIO(), flush_interval=-1)
+
+
+if __name__ == '__main__':
+    unittest.main()